@@ -8,6 +8,8 @@
 
 import datetime
 import os
+import subprocess
+import sys
 
 from os.path import (
     dirname,
@@ -157,6 +159,60 @@ class BuildManPage(Command):
                     f.write(formatted)
 
 
+class BuildWithWriter(Command):
+    """Base class of commands that write a file with a function of a package
+
+    The function is given as the 'writer' option. It is called with the
+    'output' path, if one is given, and must return the path it wrote to. It
+    runs in a fresh interpreter, such that no module of the package is
+    imported already, and commands can be combined in a single setup.py
+    call.
+    """
+    # what the writer writes, for messages
+    artifact = None
+
+    user_options = [
+        ('writer=', None, 'module path to a function that writes the output '
+         'and returns its path (e.g. mymod:write_manifest)'),
+        ('output=', None, 'path to write to, by default the one of the '
+         'writer'),
+    ]
+
+    def initialize_options(self):
+        self.writer = None
+        self.output = None
+
+    def finalize_options(self):
+        if self.writer is None:
+            raise OptionError('\'writer\' option is required')
+
+    def run(self):
+        mod_name, func_name = self.writer.split(':')
+        args = [] if self.output is None else [self.output]
+        path = subprocess.run(
+            [sys.executable, '-c',
+             'import sys; from {} import {} as f; print(f(*sys.argv[1:]))'
+             .format(mod_name, func_name)] + args,
+            check=True, stdout=subprocess.PIPE,
+            universal_newlines=True).stdout.strip()
+        self.announce('Wrote %s to %s' % (self.artifact, path), level=2)
+
+
+class BuildDocstrings(BuildWithWriter):
+    description = 'Pre-render the docstrings of the commands of an extension.'
+    artifact = 'docstrings'
+
+
+class BuildCommandManifest(BuildWithWriter):
+    description = 'Generate a static manifest of the commands of an extension.'
+    artifact = 'command manifest'
+
+
+class BuildCatalogs(BuildWithWriter):
+    description = 'Compile the message catalogs of an extension.'
+    artifact = 'message catalogs'
+
+
 class BuildConfigInfo(Command):
     description = 'Generate RST documentation for all config items.'
 
@@ -0,0 +1,51 @@
+"""Benchmarks for many concurrent invocations of the command"""
+
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
+
+
+class ConcurrentCalls:
+    """Concurrent calls on one event loop, compared to a thread per call"""
+
+    params = [1000, 5000]
+    param_names = ['ncalls']
+    timeout = 300
+
+    def setup(self, ncalls):
+        self.tmpdir = tempfile.mkdtemp()
+        # every call processes a small batch read from a file
+        self.input_file = os.path.join(self.tmpdir, 'input')
+        with open(self.input_file, 'w') as f:
+            f.write('en\nde\n' * 5)
+
+    def teardown(self, ncalls):
+        shutil.rmtree(self.tmpdir)
+
+    def time_async(self, ncalls):
+        from datalad_helloworld.hello_async import hello_cmd_async
+
+        async def one(limit):
+            return [r async for r in hello_cmd_async(
+                input_file=self.input_file, limit=limit)]
+
+        async def main():
+            limit = asyncio.Semaphore(32)
+            await asyncio.gather(*(one(limit) for _ in range(ncalls)))
+
+        asyncio.run(main())
+
+    def time_thread_per_call(self, ncalls):
+        # like hello_cmd_async, without the overhead of eval_results
+        from datalad_helloworld.hello_cmd import hello_cmd_raw
+
+        def one():
+            list(hello_cmd_raw(input_file=self.input_file))
+
+        threads = [threading.Thread(target=one) for _ in range(ncalls)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
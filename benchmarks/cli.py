@@ -0,0 +1,44 @@
+"""Benchmarks for the wall-clock time of command line calls"""
+
+from datalad_helloworld.tests.utils import (
+    get_datalad_cmd,
+    get_script,
+    time_command,
+)
+
+
+class HelloCmd:
+
+    def setup(self):
+        self.datalad = get_datalad_cmd()
+
+    def track_help(self):
+        return time_command([self.datalad, 'hello-cmd', '--help'])
+    track_help.unit = 'seconds'
+
+    def track_run(self):
+        return time_command([self.datalad, 'hello-cmd'])
+    track_run.unit = 'seconds'
+
+
+class DedicatedEntryPoint:
+    """'datalad hello-cmd' compared to 'datalad-hello'
+
+    With '-l', datalad cannot tell the command from the global option, and
+    builds the parsers of all commands.
+    """
+
+    params = ['datalad hello-cmd', 'datalad-hello']
+    param_names = ['cmd']
+
+    def setup(self, cmd):
+        self.cmd = [get_datalad_cmd(), 'hello-cmd'] \
+            if cmd == 'datalad hello-cmd' else [get_script('datalad-hello')]
+
+    def track_run(self, cmd):
+        return time_command(self.cmd + ['--language', 'de'])
+    track_run.unit = 'seconds'
+
+    def track_run_short_option(self, cmd):
+        return time_command(self.cmd + ['-l', 'de'])
+    track_run_short_option.unit = 'seconds'
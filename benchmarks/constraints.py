@@ -0,0 +1,51 @@
+"""Benchmarks for validating many languages"""
+
+import os
+import shutil
+import tempfile
+
+
+class LanguageValidation:
+    """Validation against hundreds of languages"""
+
+    params = [100, 1000]
+    param_names = ['nlanguages']
+    nvalues = 10000
+
+    def setup(self, nlanguages):
+        from datalad.support.constraints import EnsureChoice
+
+        from datalad_helloworld import catalog
+
+        self.catalog = catalog
+        self.locale_dir = catalog.LOCALE_DIR
+        self.tmpdir = tempfile.mkdtemp()
+        languages = ['l{}'.format(i) for i in range(nlanguages)]
+        for language in languages:
+            os.mkdir(os.path.join(self.tmpdir, language))
+        catalog.LOCALE_DIR = self.tmpdir
+        self._clear_caches()
+        self.choice = EnsureChoice(*languages)
+        self.constraint = catalog.EnsureLanguage()
+        # mostly the last languages, like many requests of a few languages
+        self.values = [languages[-1 - i % 10] for i in range(self.nvalues)]
+
+    def teardown(self, nlanguages):
+        self.catalog.LOCALE_DIR = self.locale_dir
+        self._clear_caches()
+        shutil.rmtree(self.tmpdir)
+
+    def _clear_caches(self):
+        self.catalog.get_languages.cache_clear()
+        self.catalog.negotiate_language.cache_clear()
+        self.catalog._get_language_trie.cache_clear()
+
+    def time_ensure_choice(self, nlanguages):
+        for v in self.values:
+            self.choice(v)
+            self.choice.long_description()
+
+    def time_ensure_language(self, nlanguages):
+        for v in self.values:
+            self.constraint(v)
+            self.constraint.long_description()
@@ -0,0 +1,55 @@
+"""Benchmarks for the latency of command line calls served by a daemon"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from datalad_helloworld.tests.utils import (
+    get_datalad_cmd,
+    time_command,
+)
+
+
+class DaemonLatency:
+    """Cold 'datalad hello-cmd' calls, and calls served by a warm daemon"""
+
+    params = ['cold', 'daemon']
+    param_names = ['call']
+    timeout = 300
+
+    def setup(self, call):
+        self.tmpdir = tempfile.mkdtemp()
+        self.socket = os.path.join(self.tmpdir, 'daemon.sock')
+        self.server = None
+        if call == 'cold':
+            self.cmd = [get_datalad_cmd()]
+            return
+        self.cmd = [sys.executable, '-m', 'datalad_helloworld.daemon',
+                    '--socket', self.socket, 'run']
+        self.server = subprocess.Popen(
+            [sys.executable, '-m', 'datalad_helloworld.daemon',
+             '--socket', self.socket, 'serve'],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        from datalad_helloworld.daemon import connect
+        while True:
+            try:
+                connect(self.socket).close()
+                break
+            except OSError:
+                if self.server.poll() is not None:
+                    raise RuntimeError('daemon failed to start')
+                time.sleep(0.1)
+
+    def teardown(self, call):
+        if self.server is not None:
+            self.server.terminate()
+            self.server.wait()
+        shutil.rmtree(self.tmpdir)
+
+    def track_latency(self, call):
+        return time_command(self.cmd + ['hello-cmd', '--language', 'de'],
+                            repeat=10)
+    track_latency.unit = 'seconds'
@@ -0,0 +1,35 @@
+"""Benchmarks for the cost of loading the extension"""
+
+from datalad_helloworld.tests.utils import LOAD_COMMAND_SUITE
+
+
+class EntrypointLoad:
+
+    def timeraw_load_command_suite(self):
+        return LOAD_COMMAND_SUITE
+
+    def timeraw_load_command_suite_and_version(self):
+        return LOAD_COMMAND_SUITE + """
+import datalad_helloworld
+datalad_helloworld.__version__
+"""
+
+
+class ImportTime:
+    """Import cost as reported by ``python -X importtime``"""
+
+    params = ['datalad_helloworld', 'datalad_helloworld.hello_cmd']
+    param_names = ['module']
+
+    def setup(self, module):
+        from datalad_helloworld.tests.utils import get_import_times
+        self.times = get_import_times(module)
+
+    def track_cumulative(self, module):
+        return self.times[module][1]
+    track_cumulative.unit = 'microseconds'
+
+    def track_extension_modules(self, module):
+        from datalad_helloworld.tests.utils import get_extension_import_time
+        return get_extension_import_time(self.times)
+    track_extension_modules.unit = 'microseconds'
@@ -0,0 +1,53 @@
+"""Benchmarks for the expansion of result messages"""
+
+import os
+import shutil
+import tempfile
+
+
+class ErrorMessages:
+    """Error results whose messages are expanded lazily or eagerly
+
+    With 'eager', every message is converted to a string when its result is
+    created, like a command that formats messages up front would. With
+    'lazy', messages are never emitted (results are filtered, or only
+    counted), and expansion is skipped.
+    """
+
+    params = ['lazy', 'eager']
+    param_names = ['expansion']
+    nresults = 100000
+    timeout = 300
+
+    def setup(self, expansion):
+        self.tmpdir = tempfile.mkdtemp()
+        self.input_file = os.path.join(self.tmpdir, 'input')
+        with open(self.input_file, 'w') as f:
+            # unknown languages and invalid records
+            f.write('fr\n{"language": 1}\n' * (self.nresults // 2))
+
+    def teardown(self, expansion):
+        shutil.rmtree(self.tmpdir)
+
+    def time_raw(self, expansion):
+        from datalad_helloworld.hello_cmd import hello_cmd_raw
+
+        if expansion == 'eager':
+            for res in hello_cmd_raw(input_file=self.input_file):
+                str(res['message'])
+        else:
+            for res in hello_cmd_raw(input_file=self.input_file):
+                pass
+
+    def time_filtered(self, expansion):
+        from datalad.api import hello_cmd
+
+        if expansion == 'eager':
+            def result_filter(res):
+                str(res['message'])
+                return res['status'] == 'ok'
+        else:
+            def result_filter(res):
+                return res['status'] == 'ok'
+        hello_cmd(input_file=self.input_file, on_failure='ignore',
+                  result_renderer='disabled', result_filter=result_filter)
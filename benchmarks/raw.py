@@ -0,0 +1,47 @@
+"""Benchmarks for the throughput of results"""
+
+import os
+import shutil
+import tempfile
+import time
+
+
+class ResultThroughput:
+    """Results per second, with and without eval_results, and in chunks"""
+
+    params = ['eval_results', 'raw', 'chunks']
+    param_names = ['path']
+    nresults = 10 ** 6
+    timeout = 600
+
+    def setup(self, path):
+        self.tmpdir = tempfile.mkdtemp()
+        self.input_file = os.path.join(self.tmpdir, 'input')
+        with open(self.input_file, 'w') as f:
+            f.write('en\nde\n' * (self.nresults // 2))
+
+    def teardown(self, path):
+        shutil.rmtree(self.tmpdir)
+
+    def track_results_per_second(self, path):
+        from datalad.api import hello_cmd
+
+        from datalad_helloworld.hello_cmd import (
+            hello_cmd_chunks,
+            hello_cmd_raw,
+        )
+
+        start = time.perf_counter()
+        if path == 'raw':
+            results = hello_cmd_raw(input_file=self.input_file)
+        elif path == 'chunks':
+            results = hello_cmd_chunks(input_file=self.input_file)
+        else:
+            results = hello_cmd(input_file=self.input_file,
+                                return_type='generator',
+                                result_renderer='disabled')
+        for _ in results:
+            pass
+        return self.nresults / (time.perf_counter() - start)
+
+    track_results_per_second.unit = 'results/s'
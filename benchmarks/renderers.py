@@ -0,0 +1,32 @@
+"""Benchmarks for rendering many results on the command line"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+
+
+class RenderJSON:
+    """JSON lines rendered by 'datalad -f json' and '--jsonl'"""
+
+    params = ['json', 'jsonl']
+    param_names = ['renderer']
+    nresults = 100000
+    timeout = 300
+
+    def setup(self, renderer):
+        self.tmpdir = tempfile.mkdtemp()
+        self.input_file = os.path.join(self.tmpdir, 'input')
+        with open(self.input_file, 'w') as f:
+            f.write('en\nde\n' * (self.nresults // 2))
+
+    def teardown(self, renderer):
+        shutil.rmtree(self.tmpdir)
+
+    def time_render(self, renderer):
+        if renderer == 'json':
+            cmd = ['datalad', '-f', 'json', 'hello-cmd']
+        else:
+            cmd = ['datalad', 'hello-cmd', '--jsonl']
+        subprocess.run(cmd + ['-i', self.input_file],
+                       check=True, stdout=subprocess.DEVNULL)
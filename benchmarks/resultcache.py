@@ -0,0 +1,54 @@
+"""Benchmarks for the result cache"""
+
+import os
+import shutil
+import tempfile
+
+
+class CachedResults:
+    """Recursive calls on a dataset hierarchy, computed or from a cache tier
+
+    With 'memory', results are taken from the in-process LRU tier, with
+    'disk' from the on-disk tier of a cache with an empty memory tier.
+    """
+
+    params = ['uncached', 'memory', 'disk']
+    param_names = ['tier']
+    nsubdatasets = 10
+    timeout = 300
+
+    def setup_cache(self):
+        from datalad.api import Dataset
+
+        tmpdir = tempfile.mkdtemp()
+        ds = Dataset(os.path.join(tmpdir, 'ds')).create(
+            annex=False, result_renderer='disabled')
+        for i in range(self.nsubdatasets):
+            ds.create('sub{}'.format(i), annex=False,
+                      result_renderer='disabled')
+        return tmpdir
+
+    def setup(self, tmpdir, tier):
+        from datalad_helloworld import resultcache
+        from datalad_helloworld.hello_cmd import hello_cmd_raw
+
+        self.path = os.path.join(tmpdir, 'ds')
+        self.cachedir = tempfile.mkdtemp()
+        self.cache = resultcache.ResultCache(
+            os.path.join(self.cachedir, 'results.sqlite'),
+            memory_entries=0 if tier == 'disk' else 1)
+        resultcache._cache = self.cache
+        # populate the cache
+        list(hello_cmd_raw(dataset=self.path, recursive=True, cache=True))
+
+    def teardown(self, tmpdir, tier):
+        from datalad_helloworld import resultcache
+
+        resultcache._cache = None
+        shutil.rmtree(self.cachedir)
+
+    def time_hello_cmd_raw(self, tmpdir, tier):
+        from datalad_helloworld.hello_cmd import hello_cmd_raw
+
+        list(hello_cmd_raw(dataset=self.path, recursive=True,
+                           cache=tier != 'uncached'))
@@ -0,0 +1,48 @@
+"""Benchmarks for results that are kept in memory by a caller"""
+
+import gc
+import os
+import shutil
+import tempfile
+import tracemalloc
+
+
+class ResultMemory:
+    """Results as dicts, compared to compact records"""
+
+    params = ['dict', 'compact']
+    param_names = ['kind']
+    nresults = 100000
+
+    def setup(self, kind):
+        self.tmpdir = tempfile.mkdtemp()
+        self.input_file = os.path.join(self.tmpdir, 'input')
+        with open(self.input_file, 'w') as f:
+            f.write('en\nde\n' * (self.nresults // 2))
+
+    def teardown(self, kind):
+        shutil.rmtree(self.tmpdir)
+
+    def track_bytes_per_result(self, kind):
+        from datalad_helloworld.hello_cmd import _greet
+
+        compact = kind == 'compact'
+        path = os.getcwd()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            results = [_greet('en', path, compact=compact)
+                       for _ in range(self.nresults)]
+            size = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        del results
+        return size / self.nresults
+
+    track_bytes_per_result.unit = 'bytes'
+
+    def time_batch(self, kind):
+        from datalad.api import hello_cmd
+
+        hello_cmd(input_file=self.input_file, compact=kind == 'compact',
+                  result_renderer='disabled')
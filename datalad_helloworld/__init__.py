@@ -14,8 +14,12 @@ command_suite = (
     [
         # specification of a command, any number of commands can be defined
         (
-            # importable module that contains the command implementation
-            'datalad_helloworld.hello_cmd',
+            # importable module that contains the command implementation.
+            # Here, a module providing lightweight stand-ins built from a
+            # static manifest, such that the implementation in
+            # 'datalad_helloworld.hello_cmd' is only imported when the
+            # command is executed (see datalad_helloworld/_manifest.py)
+            'datalad_helloworld._manifest',
             # name of the command class implementation in above module
             'HelloWorld',
             # optional name of the command in the cmdline API
@@ -23,8 +27,23 @@ command_suite = (
             # optional name of the command in the Python API
             'hello_cmd'
         ),
+        (
+            'datalad_helloworld._manifest',
+            'HelloCache',
+            'hello-cache',
+            'hello_cache'
+        ),
     ]
 )
 
-from . import _version
-__version__ = _version.get_versions()['version']
+
+def __getattr__(name):
+    # the version is rarely needed, but expensive to determine. Compute it on
+    # first access only (PEP 562), such that loading the command suite via
+    # the 'datalad.extensions' entrypoint does not import '_version'
+    if name == '__version__':
+        from ._versioncache import get_versions
+        version = globals()['__version__'] = get_versions()['version']
+        return version
+    raise AttributeError(
+        'module {!r} has no attribute {!r}'.format(__name__, name))
@@ -0,0 +1,154 @@
+"""Precomputed docstrings for the command implementations
+
+datalad's ``build_doc`` decorator assembles the docstring of a command from
+its parameter specifications and constraints, each time the command module
+is imported. The :func:`build_doc` decorator of this module instead uses
+docstrings that are rendered at build time (``python setup.py
+build_docstrings``) into the generated module ``_docstrings``.
+
+A precomputed docstring is keyed on the sources of the modules that
+determine it (``_manifest.get_source_modules()``): the command's module, the
+modules of this package with its constraints, and datalad's module of the
+generic parameters. Whenever the key does not match anymore, e.g. after
+modifying a command in an editable install, the docstring is assembled by
+datalad as usual. The docstrings are regenerated whenever the package is
+built, and are shipped with it.
+"""
+
+__docformat__ = 'restructuredtext'
+
+import logging
+import os.path as op
+import sys
+from importlib import import_module
+
+lgr = logging.getLogger('datalad.helloworld.docs')
+
+DOCSTRINGS_PATH = op.join(op.dirname(__file__), '_docstrings.py')
+
+# whether to use precomputed docstrings at all
+use_precomputed = True
+
+
+def build_doc(cls):
+    """Class decorator like datalad's ``build_doc``
+
+    The docstring of the command's ``__call__`` is taken from the
+    precomputed docstrings if possible, and assembled otherwise.
+    """
+    import datalad
+    from datalad.interface.base import build_doc as assemble_doc
+
+    name = _get_name(cls)
+    doc = None
+    if use_precomputed and not datalad.in_librarymode():
+        doc = _get_precomputed(name, get_doc_key(cls))
+    if doc is None:
+        lgr.debug('No current precomputed docstring for %s', name)
+        return assemble_doc(cls)
+
+    from datalad.interface.common_opts import eval_params
+
+    # the same modifications that datalad's build_doc performs
+    getattr(cls, '_params_', dict()).update(eval_params)
+    cls.__call__.__doc__ = doc
+    if hasattr(cls.__call__, '_dataset_method'):
+        cls.__call__._dataset_method.__doc__ = doc
+    return cls
+
+
+def get_doc_key(cls):
+    """Return the key of the docstring of a command class
+
+    Returns None if the source of any module that determines the docstring
+    is not available.
+    """
+    from ._manifest import (
+        get_source_hash,
+        get_source_modules,
+    )
+    return get_source_hash(get_source_modules(cls))
+
+
+def render_docstrings(interfaces):
+    """Return the docstrings assembled by datalad for the given commands
+
+    This must be called before any of the command modules is imported.
+
+    Parameters
+    ----------
+    interfaces : dict
+      Mapping of command class names to their modules.
+
+    Returns
+    -------
+    dict
+      Mapping of the qualified class names to tuples of key and docstring.
+    """
+    global use_precomputed
+
+    loaded = [m for m in interfaces.values() if m in sys.modules]
+    if loaded:
+        raise RuntimeError(
+            'Cannot render docstrings of already imported modules: {}'.format(
+                ', '.join(sorted(loaded))))
+    use_precomputed = False
+    try:
+        docstrings = {}
+        for name, module in interfaces.items():
+            cls = getattr(import_module(module), name)
+            docstrings[_get_name(cls)] = (
+                get_doc_key(cls), cls.__call__.__doc__)
+    finally:
+        use_precomputed = True
+    return docstrings
+
+
+def write_docstrings(path=DOCSTRINGS_PATH):
+    """Render the docstrings of all commands into a Python module at `path`
+
+    Returns
+    -------
+    str
+      The path of the written module.
+    """
+    from ._manifest import IMPLEMENTATIONS
+
+    lines = [
+        "# generated by 'python setup.py build_docstrings', do not edit",
+        '',
+        '# docstrings of the command implementations by class, with the '
+        'key of the',
+        '# module sources they were assembled from',
+        'DOCSTRINGS = {',
+    ]
+    for name, (key, doc) in sorted(
+            render_docstrings(IMPLEMENTATIONS).items()):
+        lines.append('    {!r}: ('.format(name))
+        lines.append('        {!r},'.format(key))
+        lines.append('        (')
+        lines.extend('            {!r}'.format(l)
+                     for l in doc.splitlines(keepends=True))
+        lines.append('        ),')
+        lines.append('    ),')
+    lines.append('}')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+    return path
+
+
+def _get_name(cls):
+    return '{}.{}'.format(cls.__module__, cls.__qualname__)
+
+
+def _get_precomputed(name, key):
+    if key is None:
+        return None
+    try:
+        from ._docstrings import DOCSTRINGS
+    except ImportError:
+        return None
+    precomputed = DOCSTRINGS.get(name)
+    if precomputed is None or precomputed[0] != key:
+        return None
+    return precomputed[1]
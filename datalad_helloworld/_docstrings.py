@@ -0,0 +1,210 @@
+# generated by 'python setup.py build_docstrings', do not edit
+
+# docstrings of the command implementations by class, with the key of the
+# module sources they were assembled from
+DOCSTRINGS = {
+    'datalad_helloworld.cache_cmd.HelloCache': (
+        '2518f74d210268d4c917fbc30f3974207340b8a9',
+        (
+            'Show, prune, and prime the caches of the extension\n'
+            '\n'
+            'The caches are namespaces of a database in the cache directory of the\n'
+            'extension, which is set with the DATALAD_HELLOWORLD_CACHE_DIR\n'
+            'environment variable. Each namespace has a size limit, and an optional\n'
+            'time to live of its entries, that are set with\n'
+            'DATALAD_HELLOWORLD_CACHE_<NAMESPACE>_SIZE (in bytes) and\n'
+            'DATALAD_HELLOWORLD_CACHE_<NAMESPACE>_TTL (in seconds) environment\n'
+            "variables. Namespaces are pruned to their limit on every write, 'prune'\n"
+            'also removes expired entries, and can shrink them further.\n'
+            '\n'
+            "One result is reported per namespace, with its number of 'entries', their\n"
+            "total 'size', its size 'limit' and 'ttl', and the numbers of 'hits',\n"
+            "'misses', and 'evictions' since it was last cleared.\n"
+            '\n'
+            'Parameters\n'
+            '----------\n'
+            "action : {'show', 'prune', 'clear', 'prime'}, optional\n"
+            "  'show' reports the statistics of the caches. 'prune' removes expired\n"
+            '  entries, and evicts least recently used entries until every cache\n'
+            "  fits its size limit (or --max-size). 'clear' removes all entries and\n"
+            "  statistics. 'prime' fills the caches: the version of the extension,\n"
+            '  if it is computed from a source tree, and the results of hello-cmd\n'
+            "  for a dataset in every available language. [Default: 'show']\n"
+            "namespace : {'results', 'versions'} or None, optional\n"
+            '  only act on this cache, instead of all of them. [Default: None]\n'
+            'max_size : int or None, optional\n'
+            "  with 'prune', shrink each cache to at most this size, if it is\n"
+            '  smaller than the size limit. [Default: None]\n'
+            'dataset : Dataset or None, optional\n'
+            "  with 'prime', dataset to cache the results of hello-cmd for.\n"
+            '  [Default: None]\n'
+            'recursive : bool, optional\n'
+            '  if set, recurse into potential subdatasets. [Default: False]\n'
+            'recursion_limit : int or None, optional\n'
+            '  limit recursion into subdatasets to the given number of levels.\n'
+            '  [Default: None]\n'
+            "on_failure : {'ignore', 'continue', 'stop'}, optional\n"
+            "  behavior to perform on failure: 'ignore' any failure is reported,\n"
+            "  but does not cause an exception; 'continue' if any failure occurs an\n"
+            '  exception will be raised at the end, but processing other actions\n'
+            "  will continue for as long as possible; 'stop': processing will stop\n"
+            '  on first failure and an exception is raised. A failure is any result\n'
+            "  with status 'impossible' or 'error'. Raised exception is an\n"
+            '  IncompleteResultsError that carries the result dictionaries of the\n'
+            "  failures in its `failed` attribute. [Default: 'continue']\n"
+            'result_filter : callable or None, optional\n'
+            '  if given, each to-be-returned status dictionary is passed to this\n'
+            "  callable, and is only returned if the callable's return value does\n"
+            '  not evaluate to False or a ValueError exception is raised. If the\n'
+            '  given callable supports `**kwargs` it will additionally be passed\n'
+            '  the keyword arguments of the original API call. [Default: None]\n'
+            'result_renderer\n'
+            "  select rendering mode command results. 'tailored' enables a command-\n"
+            '  specific rendering style that is typically tailored to human\n'
+            '  consumption, if there is one for a specific command, or otherwise\n'
+            "  falls back on the the 'generic' result renderer; 'generic' renders\n"
+            '  each result in one line  with key info like action, status, path,\n'
+            "  and an optional message); 'json' a complete JSON line serialization\n"
+            "  of the full result record; 'json_pp' like 'json', but pretty-printed\n"
+            "  spanning multiple lines; 'disabled' turns off result rendering\n"
+            "  entirely; '<template>' reports any value(s) of any result properties\n"
+            "  in any format indicated by the template (e.g. '{path}', compare with\n"
+            '  JSON output for all key-value choices). The template syntax follows\n'
+            '  the Python "format() language". It is possible to report individual\n'
+            "  dictionary values, e.g. '{metadata[name]}'. If a 2nd-level key\n"
+            "  contains a colon, e.g. 'music:Genre', ':' must be substituted by '#'\n"
+            "  in the template, like so: '{metadata[music#Genre]}'. [Default:\n"
+            "  'tailored']\n"
+            "result_xfm : {'datasets', 'successdatasets-or-none', 'paths', 'relpaths', 'metadata'} or callable or None, optional\n"
+            '  if given, each to-be-returned result status dictionary is passed to\n'
+            '  this callable, and its return value becomes the result instead. This\n'
+            '  is different from `result_filter`, as it can perform arbitrary\n'
+            '  transformation of the result value. This is mostly useful for top-\n'
+            '  level command invocations that need to provide the results in a\n'
+            '  particular format. Instead of a callable, a label for a pre-crafted\n'
+            '  result transformation can be given. [Default: None]\n'
+            "return_type : {'generator', 'list', 'item-or-list'}, optional\n"
+            "  return value behavior switch. If 'item-or-list' a single value is\n"
+            '  returned instead of a one-item return value list, or a list in case\n'
+            '  of multiple return values. `None` is return in case of an empty\n'
+            "  list. [Default: 'list']\n"
+        ),
+    ),
+    'datalad_helloworld.hello_cmd.HelloWorld': (
+        'f8e320602390cd30ac6ec38ebfc6fdc69e3a8d16',
+        (
+            'Short description of the command\n'
+            '\n'
+            'Long description of arbitrary volume.\n'
+            '\n'
+            'Parameters\n'
+            '----------\n'
+            'language : LANGUAGE, optional\n'
+            '  language to say "hello" in. Can be a priority list of languages,\n'
+            "  like in an HTTP Accept-Language header, e.g. 'de-AT, de;q=0.8,\n"
+            "  en;q=0.5'. [Default: 'en']\n"
+            'input_file : str or None, optional\n'
+            '  process a batch of requests read from this file, or from stdin if\n'
+            "  '-' is given, instead of a single one. Each line is either a\n"
+            "  language, or a JSON object with a 'language' and an optional 'path'\n"
+            '  property, e.g. {"language": "de", "path": "sub"}. One result is\n'
+            '  reported per request, and requests are processed as they are read.\n'
+            '  [Default: None]\n'
+            'dataset : Dataset or None, optional\n'
+            '  dataset to say "hello" to, instead of the current directory. Each\n'
+            '  request without an explicit path is processed for this dataset (and\n'
+            '  its subdatasets, if recursive). [Default: None]\n'
+            'recursive : bool, optional\n'
+            '  if set, recurse into potential subdatasets. [Default: False]\n'
+            'recursion_limit : int or None, optional\n'
+            '  limit recursion into subdatasets to the given number of levels.\n'
+            '  [Default: None]\n'
+            "jobs : int or None or {'auto'}, optional\n"
+            '  how many datasets to process in parallel. "auto" corresponds to the\n'
+            "  number defined by the 'datalad.runtime.max-jobs' configuration item.\n"
+            '  [Default: None]\n'
+            "order : {'completion', 'path'}, optional\n"
+            '  order in which results are reported when processing datasets:\n'
+            "  'completion' reports each result as soon as it is available, 'path'\n"
+            '  reports results sorted by dataset path, regardless of the number of\n'
+            "  parallel jobs. [Default: 'path']\n"
+            'compact : bool, optional\n'
+            '  report results as compact, read-only mappings instead of dicts. This\n'
+            '  considerably reduces the memory footprint of callers that keep many\n'
+            '  results. [Default: False]\n'
+            'jsonl : bool, optional\n'
+            "  render results as JSON lines, like the 'json' result renderer, but\n"
+            '  with a fast encoder (orjson, if installed) and buffered output, for\n'
+            '  piping many results into other tools. Output is written when the\n'
+            '  buffer is full, when a second has passed since the last write, and\n'
+            "  when the command completes. Applies to the 'tailored' result\n"
+            '  renderer, i.e. the default. [Default: False]\n'
+            'export : str or None, optional\n'
+            '  also write all results to this file, in a columnar layout for\n'
+            '  analysis with dataframe libraries. The format is determined by the\n'
+            "  file name extension: '.npz' (NumPy arrays, requires numpy) or\n"
+            "  '.parquet' (requires pyarrow). Results are written in row groups as\n"
+            '  they are reported, and the file can be loaded with\n'
+            '  datalad_helloworld.columnar.load_results(). [Default: None]\n'
+            'count_only : bool, optional\n'
+            '  only count the results by action and status, and keep a few failed\n'
+            '  results as samples, rather than reporting every result. A single\n'
+            "  result of type 'summary' is reported, with the 'counts' by action\n"
+            "  and status, the number of 'failures', and the failed results kept as\n"
+            "  'samples'. Its status is 'error' if any result failed. [Default:\n"
+            '  False]\n'
+            'cache : bool, optional\n'
+            '  reuse the results of an earlier call with the same parameters on a\n'
+            "  dataset, as long as the dataset's HEAD points to the same commit,\n"
+            '  and cache the results of this call otherwise. Uncommitted changes,\n'
+            '  like installed subdatasets, are not detected. Batches, and calls\n'
+            '  that are neither given a dataset nor recursive, are not cached.\n'
+            '  [Default: False]\n'
+            "on_failure : {'ignore', 'continue', 'stop'}, optional\n"
+            "  behavior to perform on failure: 'ignore' any failure is reported,\n"
+            "  but does not cause an exception; 'continue' if any failure occurs an\n"
+            '  exception will be raised at the end, but processing other actions\n'
+            "  will continue for as long as possible; 'stop': processing will stop\n"
+            '  on first failure and an exception is raised. A failure is any result\n'
+            "  with status 'impossible' or 'error'. Raised exception is an\n"
+            '  IncompleteResultsError that carries the result dictionaries of the\n'
+            "  failures in its `failed` attribute. [Default: 'continue']\n"
+            'result_filter : callable or None, optional\n'
+            '  if given, each to-be-returned status dictionary is passed to this\n'
+            "  callable, and is only returned if the callable's return value does\n"
+            '  not evaluate to False or a ValueError exception is raised. If the\n'
+            '  given callable supports `**kwargs` it will additionally be passed\n'
+            '  the keyword arguments of the original API call. [Default: None]\n'
+            'result_renderer\n'
+            "  select rendering mode command results. 'tailored' enables a command-\n"
+            '  specific rendering style that is typically tailored to human\n'
+            '  consumption, if there is one for a specific command, or otherwise\n'
+            "  falls back on the the 'generic' result renderer; 'generic' renders\n"
+            '  each result in one line  with key info like action, status, path,\n'
+            "  and an optional message); 'json' a complete JSON line serialization\n"
+            "  of the full result record; 'json_pp' like 'json', but pretty-printed\n"
+            "  spanning multiple lines; 'disabled' turns off result rendering\n"
+            "  entirely; '<template>' reports any value(s) of any result properties\n"
+            "  in any format indicated by the template (e.g. '{path}', compare with\n"
+            '  JSON output for all key-value choices). The template syntax follows\n'
+            '  the Python "format() language". It is possible to report individual\n'
+            "  dictionary values, e.g. '{metadata[name]}'. If a 2nd-level key\n"
+            "  contains a colon, e.g. 'music:Genre', ':' must be substituted by '#'\n"
+            "  in the template, like so: '{metadata[music#Genre]}'. [Default:\n"
+            "  'tailored']\n"
+            "result_xfm : {'datasets', 'successdatasets-or-none', 'paths', 'relpaths', 'metadata'} or callable or None, optional\n"
+            '  if given, each to-be-returned result status dictionary is passed to\n'
+            '  this callable, and its return value becomes the result instead. This\n'
+            '  is different from `result_filter`, as it can perform arbitrary\n'
+            '  transformation of the result value. This is mostly useful for top-\n'
+            '  level command invocations that need to provide the results in a\n'
+            '  particular format. Instead of a callable, a label for a pre-crafted\n'
+            '  result transformation can be given. [Default: None]\n'
+            "return_type : {'generator', 'list', 'item-or-list'}, optional\n"
+            "  return value behavior switch. If 'item-or-list' a single value is\n"
+            '  returned instead of a one-item return value list, or a list in case\n'
+            '  of multiple return values. `None` is return in case of an empty\n'
+            "  list. [Default: 'list']\n"
+        ),
+    ),
+}
@@ -0,0 +1,315 @@
+"""In-process implementation of ``git describe``
+
+This module reproduces the output of ``git describe --tags --long --always
+[--dirty] [--match <pattern>]``, which versioneer uses to determine the
+closest tag and the distance to it. The ancestry walk mirrors git's own
+algorithm (candidate tags, date-ordered traversal, depth computation), so
+that ties and merge-heavy histories are resolved identically. Commit parents
+and dates are taken from the commit-graph file where available, with a
+fallback on pack indices and loose objects (see :class:`GitReader`).
+
+Dirtiness is determined from the index: its cached tree must match the tree
+of HEAD, and the stat information of all tracked files must match the work
+tree. Whenever git would need to look at file content to decide, this
+module gives up with :class:`UnsupportedRepo`.
+"""
+
+__docformat__ = 'restructuredtext'
+
+import os
+import os.path as op
+import re
+import stat
+import struct
+from bisect import bisect_left
+from collections import namedtuple
+from fnmatch import fnmatchcase
+
+from ._gitreader import UnsupportedRepo
+
+# number of candidate tags considered by git describe by default
+DEFAULT_CANDIDATES = 10
+
+_SEEN = 1
+
+_TagName = namedtuple('_TagName', ('path', 'prio', 'tag'))
+
+_POSIX_CLASSES = {
+    'alnum': 'a-zA-Z0-9',
+    'alpha': 'a-zA-Z',
+    'digit': '0-9',
+    'lower': 'a-z',
+    'upper': 'A-Z',
+    'xdigit': '0-9a-fA-F',
+}
+
+
+def describe(reader, sha, match=None, candidates=DEFAULT_CANDIDATES):
+    """Describe a commit like ``git describe --tags --long --always``
+
+    Parameters
+    ----------
+    reader : GitReader
+    sha : str
+      The commit to describe.
+    match : str, optional
+      Only consider tags matching this glob pattern (``--match``).
+    candidates : int, optional
+      Number of candidate tags to consider (``--candidates``).
+
+    Returns
+    -------
+    str
+      'TAG-DISTANCE-gABBREV', or just the abbreviated SHA if no tag
+      describes the commit.
+    """
+    names = _get_names(reader, match)
+    name = names.get(sha)
+    if name is not None:
+        # exact match
+        if name.prio == 2:
+            # git reports the object the annotated tag points to
+            sha = reader.read_object(name.tag)[1][7:47].decode('ascii')
+        return '{}-0-g{}'.format(name.path, reader.find_unique_abbrev(sha))
+
+    get_parents = reader.get_parents
+    get_time = reader.get_commit_time
+    flags = {sha: _SEEN}
+    queue = _DateQueue()
+    queue.push(sha, get_time(sha))
+    # candidate tags as [name, depth, flag, found order]
+    matches = []
+    annotated = 0
+    gave_up_on = None
+    seen = 0
+    while queue:
+        commit = queue.pop()
+        seen += 1
+        name = names.get(commit)
+        if name is not None:
+            if len(matches) < candidates:
+                flag = 1 << (len(matches) + 1)
+                matches.append([name, seen - 1, flag, len(matches) + 1])
+                flags[commit] |= flag
+                if name.prio == 2:
+                    annotated += 1
+            else:
+                gave_up_on = commit
+                break
+        cflags = flags[commit]
+        for m in matches:
+            if not cflags & m[2]:
+                m[1] += 1
+        if annotated and not queue:
+            break
+        for parent in get_parents(commit):
+            pflags = flags.get(parent, 0)
+            if not pflags & _SEEN:
+                queue.push(parent, get_time(parent))
+            flags[parent] = pflags | cflags
+
+    if not matches:
+        return reader.find_unique_abbrev(sha)
+
+    matches.sort(key=lambda m: (m[1], m[3]))
+    best = matches[0]
+    if gave_up_on is not None:
+        queue.push(gave_up_on, get_time(gave_up_on))
+    # count the commits that are not reachable from the best candidate,
+    # but were not visited yet
+    while queue:
+        commit = queue.pop()
+        cflags = flags[commit]
+        if cflags & best[2]:
+            if all(flags[c] & best[2] for c in queue):
+                break
+        else:
+            best[1] += 1
+        for parent in get_parents(commit):
+            pflags = flags.get(parent, 0)
+            if not pflags & _SEEN:
+                queue.push(parent, get_time(parent))
+            flags[parent] = pflags | cflags
+    return '{}-{}-g{}'.format(
+        best[0].path, best[1], reader.find_unique_abbrev(sha))
+
+
+def is_dirty(reader, sha):
+    """Whether index or work tree differ from a commit, like ``--dirty``
+
+    Untracked files are not considered.
+
+    Raises
+    ------
+    UnsupportedRepo
+      If this cannot be decided without looking at file content, e.g.
+      because the stat information of a file changed, or the index lacks a
+      valid cached tree.
+    """
+    try:
+        with open(op.join(reader.gitdir, 'index'), 'rb') as f:
+            data = f.read()
+            index_mtime = os.fstat(f.fileno()).st_mtime_ns
+    except FileNotFoundError as e:
+        raise UnsupportedRepo('no index') from e
+    if data[:4] != b'DIRC':
+        raise UnsupportedRepo('cannot parse index')
+    version, count = struct.unpack_from('>II', data, 4)
+    if version not in (2, 3):
+        raise UnsupportedRepo('unsupported index version {}'.format(version))
+
+    check_stat = reader.config.get('core.checkstat', 'default') != 'minimal'
+    trust_ctime = check_stat \
+        and reader.config.get('core.trustctime', 'true') != 'false'
+    filemode = reader.config.get('core.filemode', 'true') != 'false'
+    pos = 12
+    entries = []
+    for _ in range(count):
+        (ctime_s, ctime_ns, mtime_s, mtime_ns, _dev, ino, mode, uid, gid,
+         size) = struct.unpack_from('>10I', data, pos)
+        flags = struct.unpack_from('>H', data, pos + 60)[0]
+        namepos = pos + 62
+        if flags & 0x4000:
+            # extended flags: skip-worktree, intent-to-add
+            if struct.unpack_from('>H', data, namepos)[0] & 0x6000:
+                raise UnsupportedRepo('sparse or intent-to-add entries')
+            namepos += 2
+        name = data[namepos:data.index(b'\0', namepos)]
+        # entries are NUL-padded to a multiple of eight bytes
+        pos += (namepos - pos + len(name) + 8) & ~7
+        if (flags >> 12) & 3:
+            # merge conflict
+            return True
+        if flags & 0x8000:
+            # assume-unchanged
+            continue
+        entries.append((name, mode, mtime_s, mtime_ns, ctime_s, ctime_ns,
+                        ino, uid, gid, size))
+
+    tree = None
+    while pos < len(data) - 20:
+        sig = data[pos:pos + 4]
+        size = struct.unpack_from('>I', data, pos + 4)[0]
+        if sig == b'TREE':
+            ext = data[pos + 8:pos + 8 + size]
+            # the root entry comes first: empty path, NUL, entry count, ...
+            counts_end = ext.index(b'\n')
+            if int(ext[1:counts_end].split(b' ')[0]) >= 0:
+                tree = ext[counts_end + 1:counts_end + 21].hex()
+        elif not b'A' <= sig[:1] <= b'Z':
+            # a mandatory extension, like 'link' (split index) or 'sdir'
+            raise UnsupportedRepo('unsupported index extension {!r}'.format(
+                sig))
+        pos += 8 + size
+    if tree is None:
+        raise UnsupportedRepo('index has no valid cached tree')
+    if tree != reader.read_commit(sha).tree:
+        return True
+
+    for (name, mode, mtime_s, mtime_ns, ctime_s, ctime_ns, ino, uid, gid,
+         size) in entries:
+        if stat.S_IFMT(mode) == 0o160000:
+            raise UnsupportedRepo('submodules are not supported')
+        try:
+            st = os.lstat(op.join(
+                reader.worktree, os.fsdecode(name).replace('/', os.sep)))
+        except (FileNotFoundError, NotADirectoryError):
+            # deleted
+            return True
+        if stat.S_IFMT(st.st_mode) != stat.S_IFMT(mode) \
+                or (filemode and stat.S_ISREG(mode)
+                    and (st.st_mode & 0o100) != (mode & 0o100)):
+            # type or executable bit changed
+            return True
+        if (st.st_size & 0xffffffff) != size \
+                or _split_ns(st.st_mtime_ns) != (mtime_s, mtime_ns) \
+                or (trust_ctime
+                    and _split_ns(st.st_ctime_ns) != (ctime_s, ctime_ns)) \
+                or (check_stat
+                    and ((st.st_ino & 0xffffffff) != ino
+                         or st.st_uid != uid or st.st_gid != gid)):
+            raise UnsupportedRepo('stat information changed')
+        if mtime_s * 1000000000 + mtime_ns >= index_mtime:
+            # racily clean, content would have to be compared
+            raise UnsupportedRepo('racily clean entry')
+    return False
+
+
+def _split_ns(ns):
+    sec, nsec = divmod(ns, 1000000000)
+    return sec & 0xffffffff, nsec
+
+
+def _get_names(reader, match):
+    """Return a mapping of commit SHAs to the tag describing them"""
+    if match is not None:
+        match = _translate_wildmatch(match)
+    names = {}
+    for ref, value, peeled in reader.iter_refs('refs/tags/'):
+        path = ref[len('refs/tags/'):]
+        if match is not None and not fnmatchcase(path, match):
+            continue
+        if peeled is None:
+            peeled, annotated = reader.peel(value)
+        else:
+            annotated = peeled != value
+        prio = 2 if annotated else 1
+        current = names.get(peeled)
+        if current is None or current.prio < prio or (
+                current.prio == prio == 2
+                # prefer the most recent of multiple annotated tags
+                and _get_tagger_date(reader, current.tag)
+                < _get_tagger_date(reader, value)):
+            names[peeled] = _TagName(path, prio, value)
+    return names
+
+
+def _get_tagger_date(reader, sha):
+    content = reader.read_object(sha)[1]
+    mo = re.search(rb'^tagger .*> (\d+) [+-]\d{4}$', content, re.MULTILINE)
+    return int(mo.group(1)) if mo else 0
+
+
+def _translate_wildmatch(pattern):
+    """Translate a git wildmatch pattern into an fnmatch pattern"""
+    if '\\' in pattern:
+        raise UnsupportedRepo('escapes in patterns are not supported')
+
+    def repl(mo):
+        try:
+            return _POSIX_CLASSES[mo.group(1)]
+        except KeyError:
+            raise UnsupportedRepo(
+                'unsupported character class {}'.format(mo.group(0)))
+
+    pattern = re.sub(r'\[:(\w+):\]', repl, pattern)
+    # git also accepts '^' for negating a bracket expression
+    return pattern.replace('[^', '[!')
+
+
+class _DateQueue(object):
+    """Commits ordered by date, newest first, like git's date-sorted lists
+
+    Among commits with identical dates, the one inserted first is popped
+    first.
+    """
+
+    def __init__(self):
+        # stored in reverse order, to pop from the end
+        self._dates = []
+        self._commits = []
+
+    def __bool__(self):
+        return bool(self._commits)
+
+    def __iter__(self):
+        return reversed(self._commits)
+
+    def push(self, commit, date):
+        pos = bisect_left(self._dates, date)
+        self._dates.insert(pos, date)
+        self._commits.insert(pos, commit)
+
+    def pop(self):
+        self._dates.pop()
+        return self._commits.pop()
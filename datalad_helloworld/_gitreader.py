@@ -0,0 +1,1057 @@
+"""In-process reader for git repositories
+
+This module answers the questions versioneer asks about a source tree (which
+commit, which branch, which date, which tag) by reading the git directory
+directly: HEAD, loose refs, a memory-mapped ``packed-refs`` file, the
+commit-graph file, and loose and packed objects. This avoids spawning
+``git`` processes, whose startup cost dominates version determination, in
+particular on network file systems.
+
+Only the common repository layouts are supported. Whenever the reader meets
+something it cannot interpret with confidence (reftable ref storage, linked
+worktrees, SHA256 repositories, replace refs, ...) it raises
+:class:`UnsupportedRepo`, and :class:`GitRunner` falls back on running
+``git``.
+"""
+
+__docformat__ = 'restructuredtext'
+
+import logging
+import mmap
+import os
+import os.path as op
+import re
+import zlib
+from collections import namedtuple
+from datetime import (
+    datetime,
+    timedelta,
+)
+from functools import partial
+
+lgr = logging.getLogger('datalad.helloworld.gitreader')
+
+
+class UnsupportedRepo(Exception):
+    """Raised when a repository cannot be read in-process"""
+
+
+Commit = namedtuple('Commit', ('tree', 'parents', 'time', 'tz'))
+Commit.__doc__ = """Essential properties of a commit
+
+tree : str
+  SHA of the commit's tree.
+parents : tuple
+  SHAs of the parent commits.
+time : int
+  Committer timestamp, in seconds since the epoch.
+tz : str
+  Committer timezone offset, formatted like '+0100'.
+"""
+
+_SHA_RE = re.compile(rb'^[0-9a-f]{40}$')
+
+# pack object types
+_OBJ_COMMIT = 1
+_OBJ_TREE = 2
+_OBJ_BLOB = 3
+_OBJ_TAG = 4
+_OBJ_OFS_DELTA = 6
+_OBJ_REF_DELTA = 7
+_TYPE_NAMES = {
+    _OBJ_COMMIT: 'commit',
+    _OBJ_TREE: 'tree',
+    _OBJ_BLOB: 'blob',
+    _OBJ_TAG: 'tag',
+}
+
+
+def find_gitdirs(path):
+    """Locate the git directory responsible for `path`
+
+    Like ``git rev-parse --git-dir``, the search starts at `path` and
+    continues with its parent directories.
+
+    Returns
+    -------
+    tuple or None
+      A 2-tuple with the (per-worktree) git directory and the common git
+      directory, which differ only for linked worktrees. ``None`` is returned
+      when no git directory was found.
+    """
+    dotgit = _find_dotgit(path)
+    if dotgit is None:
+        return None
+    if op.isdir(dotgit):
+        gitdir = dotgit
+    else:
+        try:
+            with open(dotgit) as f:
+                content = f.read().strip()
+        except OSError:
+            return None
+        if not content.startswith('gitdir:'):
+            return None
+        gitdir = op.normpath(op.join(
+            op.dirname(dotgit), content[len('gitdir:'):].strip()))
+
+    commondir = gitdir
+    try:
+        with open(op.join(gitdir, 'commondir')) as f:
+            commondir = op.normpath(op.join(gitdir, f.read().strip()))
+    except OSError:
+        pass
+    return gitdir, commondir
+
+
+def _find_dotgit(path):
+    path = op.abspath(path)
+    while True:
+        dotgit = op.join(path, '.git')
+        if op.exists(dotgit):
+            return dotgit
+        parent = op.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+def read_config(path):
+    """Minimal parser for git config files
+
+    Returns
+    -------
+    dict
+      Mapping of lower-case 'section.key' (or 'section.subsection.key')
+      names to the last value set in the file. Includes are not followed.
+    """
+    config = {}
+    try:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            lines = f.readlines()
+    except OSError:
+        return config
+    section = ''
+    for line in lines:
+        line = line.strip()
+        if not line or line[0] in '#;':
+            continue
+        if line.startswith('['):
+            mo = re.match(r'^\[([^\]\s"]+)(?:\s+"(.*)")?\]', line)
+            if mo:
+                section = mo.group(1).lower()
+                if mo.group(2) is not None:
+                    section += '.' + mo.group(2)
+            continue
+        key, sep, value = line.partition('=')
+        value = value.strip()
+        if len(value) > 1 and value[0] == value[-1] == '"':
+            value = value[1:-1]
+        config['{}.{}'.format(section, key.strip().lower())] = \
+            value if sep else 'true'
+    return config
+
+
+class GitReader(object):
+    """Read-only, in-process access to a git repository
+
+    Parameters
+    ----------
+    path : str
+      Any path inside the work tree of the repository.
+    """
+
+    def __init__(self, path):
+        gitdirs = find_gitdirs(path)
+        if gitdirs is None:
+            raise UnsupportedRepo('no git repository at {}'.format(path))
+        self.gitdir, self.commondir = gitdirs
+        if self.gitdir != self.commondir:
+            raise UnsupportedRepo('linked worktrees are not supported')
+        self.worktree = op.dirname(_find_dotgit(path))
+        self.config = read_config(op.join(self.commondir, 'config'))
+        if self.config.get('core.bare', 'false') != 'false' \
+                or 'core.worktree' in self.config:
+            raise UnsupportedRepo('repository has no standard work tree')
+        if self.config.get('core.repositoryformatversion', '0') not in (
+                '0', '1'):
+            raise UnsupportedRepo('unknown repository format version')
+        for ext, value in self.config.items():
+            if not ext.startswith('extensions.'):
+                continue
+            if ext == 'extensions.objectformat' and value.lower() == 'sha1':
+                continue
+            if ext in ('extensions.preciousobjects',
+                       'extensions.partialclone',
+                       'extensions.worktreeconfig',
+                       'extensions.noop'):
+                continue
+            raise UnsupportedRepo('unsupported repository extension '
+                                  '{}={}'.format(ext, value))
+        for unsupported in ('reftable', op.join('refs', 'replace'),
+                            op.join('info', 'grafts')):
+            if op.exists(op.join(self.commondir, unsupported)):
+                raise UnsupportedRepo(
+                    'unsupported repository feature: {}'.format(unsupported))
+        self.objectsdir = op.join(self.commondir, 'objects')
+        self._objectsdirs = None
+        self._packed_refs = None
+        self._packs = None
+        self._objcache = {}
+        self._commits = {}
+        self._nodes = {}
+        self._generations = {}
+        self._graph = None
+        self._shallow = None
+
+    #
+    # refs
+    #
+    def read_symref(self, name):
+        """Return the target of a symbolic ref, or None if `name` is none"""
+        value = self._read_loose_ref(name)
+        if value is not None and value.startswith(b'ref:'):
+            return value[4:].strip().decode('utf-8')
+        return None
+
+    def resolve_ref(self, name):
+        """Return the SHA a ref points to, following symbolic refs
+
+        Returns None if the ref does not exist.
+        """
+        for _ in range(5):
+            value = self._read_loose_ref(name)
+            if value is None:
+                value = self._get_packed_refs().get(name, (None,))[0]
+                if value is None:
+                    return None
+            if value.startswith(b'ref:'):
+                name = value[4:].strip().decode('utf-8')
+                continue
+            if not _SHA_RE.match(value):
+                raise UnsupportedRepo('cannot parse ref {}'.format(name))
+            return value.decode('ascii')
+        raise UnsupportedRepo('symbolic ref nesting too deep')
+
+    def iter_refs(self, prefix):
+        """Yield (refname, sha, peeled sha) of all refs below `prefix`
+
+        `prefix` must end with a slash, e.g. 'refs/tags/'. Refs are reported
+        sorted by name, like git does. The peeled SHA (identical to the SHA
+        for anything but annotated tags) is only known for packed refs whose
+        ``packed-refs`` file carries full peeling information, and is None
+        otherwise. Symbolic refs are skipped.
+        """
+        refs = {
+            name: value
+            for name, value in self._get_packed_refs().items()
+            if name.startswith(prefix)
+        }
+        topdir = op.join(self.commondir, *prefix.rstrip('/').split('/'))
+        for dirpath, _, filenames in os.walk(topdir):
+            for fname in filenames:
+                name = prefix + op.relpath(
+                    op.join(dirpath, fname), topdir).replace(os.sep, '/')
+                if name.endswith('.lock'):
+                    continue
+                value = self._read_loose_ref(name)
+                if value is None:
+                    continue
+                # a loose ref takes precedence over a packed one
+                refs[name] = (value, None)
+        for name in sorted(refs, key=lambda n: n.encode('utf-8')):
+            value, peeled = refs[name]
+            if value.startswith(b'ref:'):
+                continue
+            if not _SHA_RE.match(value):
+                raise UnsupportedRepo('cannot parse ref {}'.format(name))
+            yield (
+                name,
+                value.decode('ascii'),
+                peeled.decode('ascii') if peeled else None,
+            )
+
+    def _read_loose_ref(self, name):
+        # HEAD and friends are per-worktree, everything else is shared.
+        # Both are identical, as linked worktrees are not supported
+        try:
+            with open(op.join(self.commondir, *name.split('/')), 'rb') as f:
+                return f.read().strip()
+        except (FileNotFoundError, NotADirectoryError, IsADirectoryError):
+            return None
+
+    def _get_packed_refs(self):
+        if self._packed_refs is None:
+            self._packed_refs = _PackedRefs(
+                op.join(self.commondir, 'packed-refs'))
+        return self._packed_refs
+
+    #
+    # objects
+    #
+    def read_object(self, sha):
+        """Return (type name, content) of an object
+
+        Raises
+        ------
+        UnsupportedRepo
+          If the object cannot be found.
+        """
+        obj = self._objcache.get(sha)
+        if obj is not None:
+            return obj
+        obj = self._read_loose_object(sha)
+        if obj is None:
+            for pack in self._get_packs():
+                offset = pack.find(sha)
+                if offset is not None:
+                    # REF_DELTA bases can live in any pack, or be loose
+                    obj = pack.read(offset, self.read_object)
+                    break
+        if obj is None:
+            raise UnsupportedRepo('object {} not found'.format(sha))
+        if len(self._objcache) > 256:
+            self._objcache.clear()
+        self._objcache[sha] = obj
+        return obj
+
+    def read_commit(self, sha):
+        """Return the :class:`Commit` with the given SHA"""
+        commit = self._commits.get(sha)
+        if commit is None:
+            objtype, content = self.read_object(sha)
+            if objtype != 'commit':
+                raise UnsupportedRepo('{} is not a commit'.format(sha))
+            commit = self._commits[sha] = _parse_commit(content)
+        return commit
+
+    def peel(self, sha):
+        """Follow annotated tags until a non-tag object is reached
+
+        Returns
+        -------
+        tuple
+          The SHA of the target object, and a flag whether `sha` is an
+          annotated tag.
+        """
+        target = sha
+        for _ in range(20):
+            objtype, content = self.read_object(target)
+            if objtype != 'tag':
+                return target, target != sha
+            target = content[7:47].decode('ascii')
+        raise UnsupportedRepo('tag nesting too deep')
+
+    def get_commit_date(self, sha):
+        """Return the committer date of a commit, formatted like '%ci'"""
+        commit = self.read_commit(sha)
+        sign = -1 if commit.tz.startswith('-') else 1
+        offset = sign * (int(commit.tz[1:3]) * 60 + int(commit.tz[3:5]))
+        date = datetime(1970, 1, 1) + timedelta(
+            seconds=commit.time, minutes=offset)
+        return '{} {}'.format(date.strftime('%Y-%m-%d %H:%M:%S'), commit.tz)
+
+    def find_unique_abbrev(self, sha):
+        """Return the abbreviation of `sha` that git would use
+
+        The minimum length follows ``core.abbrev``, and is determined from
+        the number of packed objects by default. It is extended as necessary
+        to be unambiguous among all objects.
+        """
+        if op.exists(op.join(self.objectsdir, 'pack', 'multi-pack-index')):
+            raise UnsupportedRepo('multi-pack-index is not supported')
+        abbrev = self.config.get('core.abbrev', 'auto').lower()
+        if abbrev == 'auto':
+            count = sum(p.get_count() for p in self._get_packs())
+            # like git: collisions are expected at the square root of the
+            # number of objects, and there are 4 bits per hex digit
+            length = max(7, (count.bit_length() + 1) // 2)
+        elif abbrev in ('false', 'no', 'off'):
+            return sha
+        elif abbrev.isdigit():
+            length = min(max(int(abbrev), 4), 40)
+        else:
+            raise UnsupportedRepo(
+                'cannot interpret core.abbrev={}'.format(abbrev))
+
+        def common_prefix(other):
+            i = 0
+            while i < 40 and sha[i] == other[i]:
+                i += 1
+            return i
+
+        binsha = bytes.fromhex(sha)
+        common = 0
+        for pack in self._get_packs():
+            for neighbor in pack.get_neighbors(binsha):
+                common = max(common, common_prefix(neighbor.hex()))
+        for objectsdir in self._get_objectsdirs():
+            try:
+                names = os.listdir(op.join(objectsdir, sha[:2]))
+            except FileNotFoundError:
+                continue
+            for name in names:
+                if len(name) == 38 and name != sha[2:]:
+                    common = max(common, common_prefix(sha[:2] + name))
+        return sha[:max(length, common + 1)]
+
+    def get_parents(self, sha):
+        """Return the SHAs of the parents of a commit
+
+        The commit-graph file is consulted first, commit objects are only
+        read for commits not contained in it.
+        """
+        return self._get_node(sha)[0]
+
+    def get_commit_time(self, sha):
+        """Return the committer timestamp of a commit"""
+        return self._get_node(sha)[1]
+
+    def get_generation(self, sha):
+        """Return the generation number (topological level) of a commit
+
+        Levels are taken from the commit-graph file, and computed (and
+        memoized) for commits not contained in it.
+        """
+        gen = self._generations.get(sha)
+        if gen is not None:
+            return gen
+        stack = [sha]
+        while stack:
+            cur = stack[-1]
+            if cur in self._generations:
+                stack.pop()
+                continue
+            graph = self._get_graph()
+            entry = graph.get(cur) if graph else None
+            if entry is not None:
+                self._generations[cur] = entry[2]
+                stack.pop()
+                continue
+            parents = self.get_parents(cur)
+            pending = [p for p in parents if p not in self._generations]
+            if pending:
+                stack.extend(pending)
+                continue
+            self._generations[cur] = 1 + max(
+                (self._generations[p] for p in parents), default=0)
+            stack.pop()
+        return self._generations[sha]
+
+    def is_ancestor(self, ancestor, commit, _memo=None):
+        """Whether `ancestor` is reachable from `commit`
+
+        `_memo` can be a dict that is shared across calls with the same
+        `ancestor` to avoid walking the same part of the history repeatedly.
+        With a commit-graph, generation numbers limit the walk to commits
+        that can possibly reach `ancestor`.
+        """
+        memo = {} if _memo is None else _memo
+        min_gen = self.get_generation(ancestor) \
+            if self._get_graph() is not None else None
+        # iterative depth-first search, as histories can be deep
+        stack = [commit]
+        while stack:
+            sha = stack[-1]
+            if sha in memo:
+                stack.pop()
+                continue
+            if sha == ancestor:
+                memo[sha] = True
+                stack.pop()
+                continue
+            if min_gen is not None and self.get_generation(sha) <= min_gen:
+                # any descendant has a larger generation number
+                memo[sha] = False
+                stack.pop()
+                continue
+            parents = self.get_parents(sha)
+            pending = [p for p in parents if p not in memo]
+            if pending:
+                stack.extend(pending)
+                continue
+            memo[sha] = any(memo[p] for p in parents)
+            stack.pop()
+        return memo[commit]
+
+    def iter_history(self, sha):
+        """Yield the SHAs of all commits reachable from `sha`"""
+        seen = {sha}
+        todo = [sha]
+        while todo:
+            sha = todo.pop()
+            yield sha
+            for parent in self.get_parents(sha):
+                if parent not in seen:
+                    seen.add(parent)
+                    todo.append(parent)
+
+    def _get_node(self, sha):
+        node = self._nodes.get(sha)
+        if node is None:
+            if self._shallow is None:
+                self._shallow = set()
+                try:
+                    with open(op.join(self.commondir, 'shallow')) as f:
+                        self._shallow.update(line.strip() for line in f)
+                except FileNotFoundError:
+                    pass
+            graph = self._get_graph()
+            entry = graph.get(sha) if graph else None
+            if entry is not None:
+                node = entry[:2]
+            else:
+                commit = self.read_commit(sha)
+                node = commit.parents, commit.time
+            if sha in self._shallow:
+                # like git, consider the parents of shallow commits absent
+                node = ((), node[1])
+            self._nodes[sha] = node
+        return node
+
+    def _get_graph(self):
+        if self._graph is None:
+            path = op.join(self.objectsdir, 'info', 'commit-graph')
+            graph = False
+            # git does not use a commit-graph in shallow repositories
+            if self.config.get('core.commitgraph', 'true') != 'false' \
+                    and not op.exists(op.join(self.commondir, 'shallow')) \
+                    and op.exists(path):
+                try:
+                    graph = CommitGraph(path)
+                except UnsupportedRepo as e:
+                    lgr.debug('Ignoring commit-graph: %s', e)
+            self._graph = graph
+        return self._graph or None
+
+    def _get_objectsdirs(self):
+        if self._objectsdirs is None:
+            dirs = [self.objectsdir]
+            try:
+                with open(op.join(self.objectsdir, 'info', 'alternates')) \
+                        as f:
+                    for line in f:
+                        line = line.strip()
+                        if line and not line.startswith('#'):
+                            dirs.append(op.normpath(
+                                op.join(self.objectsdir, line)))
+            except OSError:
+                pass
+            self._objectsdirs = dirs
+        return self._objectsdirs
+
+    def _read_loose_object(self, sha):
+        for objectsdir in self._get_objectsdirs():
+            try:
+                with open(op.join(objectsdir, sha[:2], sha[2:]), 'rb') as f:
+                    data = zlib.decompress(f.read())
+            except FileNotFoundError:
+                continue
+            header, _, content = data.partition(b'\0')
+            return header.split(b' ', 1)[0].decode('ascii'), content
+        return None
+
+    def _get_packs(self):
+        if self._packs is None:
+            packs = []
+            for objectsdir in self._get_objectsdirs():
+                packdir = op.join(objectsdir, 'pack')
+                try:
+                    names = os.listdir(packdir)
+                except OSError:
+                    continue
+                # newest packs first, like git does
+                idxs = sorted(
+                    (op.join(packdir, n) for n in names if n.endswith('.idx')),
+                    key=lambda p: os.stat(p).st_mtime,
+                    reverse=True)
+                packs.extend(_Pack(idx) for idx in idxs)
+            self._packs = packs
+        return self._packs
+
+
+class CommitGraph(object):
+    """Lookup of commits in a (single, non-split) commit-graph file"""
+
+    _NO_PARENT = 0x70000000
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._map = mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if mm[:4] != b'CGPH' or mm[4] != 1 or mm[5] != 1:
+            raise UnsupportedRepo('unsupported commit-graph format')
+        if mm[7]:
+            raise UnsupportedRepo('commit-graph has base graphs')
+        chunks = {}
+        for i in range(mm[6]):
+            entry = 8 + i * 12
+            chunks[mm[entry:entry + 4]] = int.from_bytes(
+                mm[entry + 4:entry + 12], 'big')
+        try:
+            self._oidf = chunks[b'OIDF']
+            self._oidl = chunks[b'OIDL']
+            self._cdat = chunks[b'CDAT']
+        except KeyError as e:
+            raise UnsupportedRepo(
+                'commit-graph lacks chunk {}'.format(e)) from e
+        self._edge = chunks.get(b'EDGE')
+        self.count = int.from_bytes(
+            mm[self._oidf + 255 * 4:self._oidf + 256 * 4], 'big')
+
+    def get(self, sha):
+        """Return (parent SHAs, commit time, topological level) or None"""
+        pos = self._find(bytes.fromhex(sha))
+        if pos is None:
+            return None
+        mm = self._map
+        entry = self._cdat + pos * 36
+        parents = []
+        parent = int.from_bytes(mm[entry + 20:entry + 24], 'big')
+        if parent != self._NO_PARENT:
+            parents.append(self._sha(parent))
+        parent = int.from_bytes(mm[entry + 24:entry + 28], 'big')
+        if parent & 0x80000000:
+            # octopus merge, the remaining parents are in the EDGE chunk
+            edge = self._edge + (parent & 0x7fffffff) * 4
+            while True:
+                parent = int.from_bytes(mm[edge:edge + 4], 'big')
+                parents.append(self._sha(parent & 0x7fffffff))
+                if parent & 0x80000000:
+                    break
+                edge += 4
+        elif parent != self._NO_PARENT:
+            parents.append(self._sha(parent))
+        genandtime = int.from_bytes(mm[entry + 28:entry + 36], 'big')
+        return (
+            tuple(parents),
+            genandtime & 0x3ffffffff,
+            genandtime >> 34,
+        )
+
+    def _sha(self, pos):
+        start = self._oidl + pos * 20
+        return self._map[start:start + 20].hex()
+
+    def _find(self, binsha):
+        pos = _fanout_bisect(self._map, self._oidf, self._oidl, binsha)
+        if pos < self.count and \
+                self._map[self._oidl + pos * 20:self._oidl + pos * 20 + 20] \
+                == binsha:
+            return pos
+        return None
+
+
+class _PackedRefs(object):
+    """Lookup in a memory-mapped ``packed-refs`` file
+
+    Single refs are looked up by bisection when the file declares itself as
+    sorted. Iteration parses the full file (once).
+    """
+
+    def __init__(self, path):
+        self._map = None
+        self._refs = None
+        try:
+            with open(path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size:
+                    self._map = mmap.mmap(
+                        f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            pass
+        if self._map is None:
+            return
+        header = b''
+        if self._map[:1] == b'#':
+            header = self._map[:self._map.find(b'\n')]
+            if not header.startswith(b'# pack-refs with:'):
+                raise UnsupportedRepo('cannot parse packed-refs header')
+        traits = header.split()[3:]
+        self._sorted = b'sorted' in traits
+        # without a 'fully-peeled' trait, the peeled values of loose refs
+        # cannot be trusted to be complete
+        self._peeled = b'fully-peeled' in traits
+
+    def get(self, name, default=None):
+        if self._map is None:
+            return default
+        if not self._sorted:
+            return self._get_all().get(name, default)
+        mm = self._map
+        key = name.encode('utf-8')
+        lo, hi = 0, len(mm)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = mm.rfind(b'\n', 0, mid) + 1
+            if mm[start:start + 1] == b'^':
+                # peeled value, the ref is on the line before
+                start = mm.rfind(b'\n', 0, start - 1) + 1
+            end = mm.find(b'\n', start)
+            if end < 0:
+                end = len(mm)
+            aend = end
+            peeled = None
+            if mm[end + 1:end + 2] == b'^':
+                aend = mm.find(b'\n', end + 1)
+                if aend < 0:
+                    aend = len(mm)
+                peeled = mm[end + 2:aend].strip()
+            line = mm[start:end].rstrip(b'\r')
+            if peeled is None and self._peeled:
+                peeled = line[:40]
+            if line.startswith(b'#'):
+                lo = aend + 1
+                continue
+            refname = line[41:]
+            if refname < key:
+                lo = aend + 1
+            elif refname > key:
+                hi = start
+            else:
+                return line[:40], peeled if self._peeled else None
+        return default
+
+    def items(self):
+        return self._get_all().items()
+
+    def _get_all(self):
+        if self._refs is None:
+            refs = {}
+            last = None
+            if self._map is not None:
+                for line in self._map[:].splitlines():
+                    if not line or line.startswith(b'#'):
+                        continue
+                    if line.startswith(b'^'):
+                        if last is not None and self._peeled:
+                            refs[last] = (refs[last][0], line[1:].strip())
+                        continue
+                    last = line[41:].decode('utf-8')
+                    refs[last] = (
+                        line[:40], line[:40] if self._peeled else None)
+            self._refs = refs
+        return self._refs
+
+
+class _Pack(object):
+    """Object lookup in a pack file via its (version 2) index"""
+
+    def __init__(self, idxpath):
+        self.idxpath = idxpath
+        self.packpath = idxpath[:-4] + '.pack'
+        self._idx = None
+        self._pack = None
+
+    def _open(self):
+        with open(self.idxpath, 'rb') as f:
+            idx = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if idx[:8] != b'\377tOc\0\0\0\2':
+            raise UnsupportedRepo(
+                'unsupported pack index version: {}'.format(self.idxpath))
+        self._idx = idx
+        self.count = int.from_bytes(idx[8 + 255 * 4:8 + 256 * 4], 'big')
+        with open(self.packpath, 'rb') as f:
+            self._pack = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def find(self, sha):
+        """Return the offset of an object in the pack, or None"""
+        if self._idx is None:
+            self._open()
+        binsha = bytes.fromhex(sha)
+        pos = _fanout_bisect(self._idx, 8, 8 + 256 * 4, binsha)
+        if pos < self.count and self._get_sha(pos) == binsha:
+            return self._get_offset(pos)
+        return None
+
+    def get_count(self):
+        """Return the number of objects in the pack"""
+        if self._idx is None:
+            self._open()
+        return self.count
+
+    def get_neighbors(self, binsha):
+        """Return the SHAs of the objects sorting next to `binsha`
+
+        `binsha` itself is not reported, if it is contained in the pack.
+        """
+        if self._idx is None:
+            self._open()
+        pos = _fanout_bisect(self._idx, 8, 8 + 256 * 4, binsha)
+        neighbors = []
+        if pos:
+            neighbors.append(self._get_sha(pos - 1))
+        if pos < self.count and self._get_sha(pos) == binsha:
+            pos += 1
+        if pos < self.count:
+            neighbors.append(self._get_sha(pos))
+        return neighbors
+
+    def iter_shas(self):
+        """Yield the binary SHAs of all objects in the pack, sorted"""
+        if self._idx is None:
+            self._open()
+        for i in range(self.count):
+            yield self._get_sha(i)
+
+    def _get_sha(self, pos):
+        start = 8 + 256 * 4 + pos * 20
+        return self._idx[start:start + 20]
+
+    def _get_offset(self, pos):
+        base = 8 + 256 * 4 + self.count * 24
+        offset = int.from_bytes(
+            self._idx[base + pos * 4:base + pos * 4 + 4], 'big')
+        if offset & 0x80000000:
+            large = base + self.count * 4 + (offset & 0x7fffffff) * 8
+            offset = int.from_bytes(self._idx[large:large + 8], 'big')
+        return offset
+
+    def read(self, offset, read_object):
+        """Return (type name, content) of the object at `offset`
+
+        `read_object` is called with a SHA to obtain bases of REF_DELTA
+        objects.
+        """
+        pack = self._pack
+        deltas = []
+        while True:
+            byte = pack[offset]
+            pos = offset + 1
+            objtype = (byte >> 4) & 7
+            while byte & 0x80:
+                byte = pack[pos]
+                pos += 1
+            if objtype == _OBJ_OFS_DELTA:
+                byte = pack[pos]
+                pos += 1
+                distance = byte & 0x7f
+                while byte & 0x80:
+                    byte = pack[pos]
+                    pos += 1
+                    distance = ((distance + 1) << 7) | (byte & 0x7f)
+                deltas.append(self._inflate(pos))
+                offset -= distance
+            elif objtype == _OBJ_REF_DELTA:
+                base_sha = pack[pos:pos + 20].hex()
+                deltas.append(self._inflate(pos + 20))
+                base_offset = self.find(base_sha)
+                if base_offset is None:
+                    objtype, content = read_object(base_sha)
+                    break
+                offset = base_offset
+            elif objtype in _TYPE_NAMES:
+                objtype = _TYPE_NAMES[objtype]
+                content = self._inflate(pos)
+                break
+            else:
+                raise UnsupportedRepo(
+                    'unknown object type {} in {}'.format(
+                        objtype, self.packpath))
+        for delta in reversed(deltas):
+            content = _apply_delta(content, delta)
+        return objtype, content
+
+    def _inflate(self, pos):
+        decomp = zlib.decompressobj()
+        chunks = []
+        while not decomp.eof:
+            chunk = self._pack[pos:pos + 8192]
+            if not chunk:
+                raise UnsupportedRepo(
+                    'truncated object in {}'.format(self.packpath))
+            pos += len(chunk)
+            chunks.append(decomp.decompress(chunk))
+        return b''.join(chunks)
+
+
+def _fanout_bisect(mm, fanout, table, binsha):
+    """Return the position of the first SHA in `table` that is >= `binsha`
+
+    `fanout` and `table` are the offsets of a 256-entry fan-out table and
+    the sorted table of binary SHAs it indexes, as used in pack indices and
+    commit-graph files.
+    """
+    first = binsha[0]
+    lo = int.from_bytes(mm[fanout + (first - 1) * 4:fanout + first * 4],
+                        'big') if first else 0
+    hi = int.from_bytes(mm[fanout + first * 4:fanout + first * 4 + 4], 'big')
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if mm[table + mid * 20:table + mid * 20 + 20] < binsha:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def _apply_delta(base, delta):
+    def varint(pos):
+        value = shift = 0
+        while True:
+            byte = delta[pos]
+            pos += 1
+            value |= (byte & 0x7f) << shift
+            shift += 7
+            if not byte & 0x80:
+                return value, pos
+
+    src_size, pos = varint(0)
+    if src_size != len(base):
+        raise UnsupportedRepo('delta does not match its base object')
+    dst_size, pos = varint(pos)
+    out = []
+    while pos < len(delta):
+        op = delta[pos]
+        pos += 1
+        if op & 0x80:
+            offset = size = 0
+            for i in range(4):
+                if op & (1 << i):
+                    offset |= delta[pos] << (8 * i)
+                    pos += 1
+            for i in range(3):
+                if op & (0x10 << i):
+                    size |= delta[pos] << (8 * i)
+                    pos += 1
+            out.append(base[offset:offset + (size or 0x10000)])
+        elif op:
+            out.append(delta[pos:pos + op])
+            pos += op
+        else:
+            raise UnsupportedRepo('invalid delta instruction')
+    result = b''.join(out)
+    if len(result) != dst_size:
+        raise UnsupportedRepo('delta produced unexpected size')
+    return result
+
+
+def _parse_commit(content):
+    tree = None
+    parents = []
+    committer = None
+    for line in content.split(b'\n'):
+        if not line:
+            # end of the header
+            break
+        key, _, value = line.partition(b' ')
+        if key == b'tree':
+            tree = value.decode('ascii')
+        elif key == b'parent':
+            parents.append(value.decode('ascii'))
+        elif key == b'committer':
+            committer = value
+    if tree is None or committer is None:
+        raise UnsupportedRepo('cannot parse commit')
+    time, tz = committer[committer.rindex(b'>') + 1:].split()
+    return Commit(tree, tuple(parents), int(time), tz.decode('ascii'))
+
+
+class GitRunner(object):
+    """Drop-in replacement for versioneer's ``run_command()`` for git
+
+    The git commands issued by ``git_pieces_from_vcs()`` are answered with a
+    :class:`GitReader` when possible. Any other command, and any command
+    that cannot be answered in-process, is passed on to `fallback`.
+
+    Parameters
+    ----------
+    fallback : callable
+      Function with the signature of ``run_command()``.
+    """
+
+    def __init__(self, fallback):
+        self._fallback = fallback
+        self._readers = {}
+        self._handlers = {
+            ('rev-parse', '--git-dir'): self._rev_parse_git_dir,
+            ('rev-parse', 'HEAD'): self._rev_parse_head,
+            ('rev-parse', '--abbrev-ref', 'HEAD'): self._abbrev_ref_head,
+            ('branch', '--contains'): self._branch_contains,
+            ('rev-list', 'HEAD', '--left-right'): self._rev_list_head,
+            ('show', '-s', '--format=%ci', 'HEAD'): self._show_date,
+        }
+
+    def __call__(self, commands, args, cwd=None, verbose=False,
+                 hide_stderr=False, env=None):
+        handler = self._handlers.get(tuple(args))
+        if handler is None and args[:5] == [
+                'describe', '--tags', '--dirty', '--always', '--long'] \
+                and (len(args) == 5
+                     or (len(args) == 7 and args[5] == '--match')):
+            handler = partial(
+                self._describe, match=args[6] if len(args) == 7 else None)
+        if handler is not None:
+            try:
+                return handler(self._get_reader(cwd)), 0
+            except UnsupportedRepo as e:
+                lgr.debug('Cannot run git %s in-process: %s', args, e)
+            except (OSError, ValueError, IndexError, zlib.error) as e:
+                lgr.debug('Failed to run git %s in-process: %s', args, e)
+        return self._fallback(commands, args, cwd=cwd, verbose=verbose,
+                              hide_stderr=hide_stderr, env=env)
+
+    def _get_reader(self, path):
+        path = op.abspath(path or os.curdir)
+        reader = self._readers.get(path)
+        if reader is None:
+            # also memoize failures to not inspect the repository repeatedly
+            try:
+                reader = GitReader(path)
+            except UnsupportedRepo as e:
+                reader = e
+            self._readers[path] = reader
+        if isinstance(reader, UnsupportedRepo):
+            raise reader
+        return reader
+
+    @staticmethod
+    def _head(reader):
+        head = reader.resolve_ref('HEAD')
+        if head is None:
+            raise UnsupportedRepo('unborn HEAD')
+        return head
+
+    def _describe(self, reader, match):
+        from ._gitdescribe import (
+            describe,
+            is_dirty,
+        )
+        head = self._head(reader)
+        out = describe(reader, head, match=match)
+        if is_dirty(reader, head):
+            out += '-dirty'
+        return out
+
+    def _rev_parse_git_dir(self, reader):
+        return reader.gitdir
+
+    def _rev_parse_head(self, reader):
+        return self._head(reader)
+
+    def _abbrev_ref_head(self, reader):
+        self._head(reader)
+        target = reader.read_symref('HEAD')
+        if target is None:
+            return 'HEAD'
+        if not target.startswith('refs/heads/'):
+            raise UnsupportedRepo('HEAD points outside refs/heads')
+        return target[len('refs/heads/'):]
+
+    def _branch_contains(self, reader):
+        head = self._head(reader)
+        current = reader.read_symref('HEAD')
+        memo = {}
+        lines = [
+            '{} {}'.format(
+                '*' if name == current else ' ', name[len('refs/heads/'):])
+            for name, sha, _ in reader.iter_refs('refs/heads/')
+            if reader.is_ancestor(head, sha, memo)
+        ]
+        if current is None:
+            lines.insert(0, '* (HEAD detached at {})'.format(head[:7]))
+        return '\n'.join(lines)
+
+    def _rev_list_head(self, reader):
+        return '\n'.join(reader.iter_history(self._head(reader)))
+
+    def _show_date(self, reader):
+        return reader.get_commit_date(self._head(reader))
@@ -0,0 +1,301 @@
+"""Static manifest of the commands in the command suite
+
+To build its command line parser, datalad imports the module of every command
+in the suite, only to read the parameter specifications and documentation of
+the command classes. This module provides lightweight stand-ins for these
+classes instead, which are built from a JSON manifest that is generated at
+build time (``python setup.py build_manifest``) and shipped alongside the
+package. The stand-ins carry everything needed to build the parser and render
+``--help``. The actual implementation module of a command is imported only
+when the command is executed.
+
+Whenever the manifest is missing, or does not match the sources of the
+modules that determine a command's documentation anymore (see
+`get_source_modules()`, e.g. after modifying a command in an editable
+install), the actual implementation is used. The manifest is regenerated
+whenever the package is built.
+"""
+
+__docformat__ = 'restructuredtext'
+
+import hashlib
+import inspect
+import json
+import logging
+import os.path as op
+import sys
+from importlib import import_module
+from importlib.util import find_spec
+
+lgr = logging.getLogger('datalad.helloworld.manifest')
+
+# implementation modules of all commands in the command suite, by class name.
+# Any command listed here must be given as
+# ('datalad_helloworld._manifest', <class name>, ...) in the command suite
+IMPLEMENTATIONS = {
+    'HelloWorld': 'datalad_helloworld.hello_cmd',
+    'HelloCache': 'datalad_helloworld.cache_cmd',
+}
+
+MANIFEST_PATH = op.join(op.dirname(__file__), 'command_manifest.json')
+
+# format version of the manifest
+MANIFEST_VERSION = 2
+
+# simple class attributes that datalad reads from an interface
+_ATTRIBUTES = ('_docs_', '_examples_', 'result_renderer',
+               'result_renderer_cmdline')
+
+# constraints that can be serialized, with functions returning the
+# arguments to recreate them
+_CONSTRAINT_ARGS = {
+    'EnsureBool': lambda c: [],
+    'EnsureFloat': lambda c: [],
+    'EnsureInt': lambda c: [],
+    'EnsureNone': lambda c: [],
+    'EnsureDataset': lambda c: [],
+    'EnsureStr': lambda c: [c._min_len],
+    'EnsureStrPrefix': lambda c: [c._prefix],
+    'EnsureChoice': lambda c: list(c._allowed),
+    'EnsureRange': lambda c: [c._min, c._max],
+    'EnsureLanguage': lambda c: [],
+    'AltConstraints': lambda c: [_dump_constraint(i) for i in c.constraints],
+    'Constraints': lambda c: [_dump_constraint(i) for i in c.constraints],
+}
+# constraints whose arguments are constraints themselves
+_MULTI_CONSTRAINTS = ('AltConstraints', 'Constraints')
+# modules of constraints that are not in datalad.support.constraints
+_CONSTRAINT_MODULES = {
+    'EnsureDataset': 'datalad.distribution.dataset',
+    'EnsureLanguage': 'datalad_helloworld.catalog',
+}
+
+_manifest = None
+
+
+def __getattr__(name):
+    # create the interface stand-ins on first access (PEP 562), this is how
+    # datalad's load_interface() obtains them
+    if name not in IMPLEMENTATIONS:
+        raise AttributeError(
+            'module {!r} has no attribute {!r}'.format(__name__, name))
+    intf = globals()[name] = get_interface(name)
+    return intf
+
+
+def get_interface(name):
+    """Return the interface class for the command `name`
+
+    Returns a stand-in built from the manifest, or the actual implementation
+    if the manifest is missing or outdated.
+    """
+    spec = _load_manifest().get(name)
+    if spec is None:
+        lgr.debug('No manifest for %s, importing its implementation', name)
+        return _import_implementation(name)
+    if spec['source_hash'] != get_source_hash(spec['source_modules']):
+        lgr.debug('Outdated manifest for %s, importing its implementation',
+                  name)
+        return _import_implementation(name)
+    return _make_interface(name, spec)
+
+
+def generate_manifest():
+    """Return the manifest of all commands in `IMPLEMENTATIONS`"""
+    return dict(
+        version=MANIFEST_VERSION,
+        commands={
+            name: _describe_interface(name) for name in IMPLEMENTATIONS},
+    )
+
+
+def write_manifest(path=MANIFEST_PATH):
+    """Generate the manifest and write it to `path`
+
+    Returns
+    -------
+    str
+      The path of the written manifest.
+    """
+    manifest = generate_manifest()
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+        f.write('\n')
+    return path
+
+
+def _load_manifest():
+    global _manifest
+    if _manifest is None:
+        try:
+            with open(MANIFEST_PATH, encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            lgr.debug('Cannot read command manifest: %s', e)
+            manifest = {}
+        _manifest = manifest.get('commands', {}) \
+            if manifest.get('version') == MANIFEST_VERSION else {}
+    return _manifest
+
+
+def get_source_modules(intf):
+    """Return the modules whose source determines a command's documentation
+
+    These are the module of the command, the modules of this package that
+    define any of its constraints, and datalad's module of the generic
+    parameters that are documented with every command.
+    """
+    package = __name__.partition('.')[0]
+    modules = [intf.__module__]
+    constraints = [p.constraints for p in intf._params_.values()]
+    while constraints:
+        constraint = constraints.pop()
+        if constraint is None:
+            continue
+        constraints.extend(getattr(constraint, 'constraints', ()))
+        module = type(constraint).__module__
+        if module.partition('.')[0] == package and module not in modules:
+            modules.append(module)
+    modules.append('datalad.interface.common_opts')
+    return modules
+
+
+def get_source_hash(modules):
+    """Return the SHA-1 of the sources of modules, without importing them
+
+    Returns None if any module has no source file.
+    """
+    sha1 = hashlib.sha1()
+    for module in modules:
+        spec = find_spec(module)
+        if spec is None or not spec.has_location \
+                or not spec.origin.endswith('.py'):
+            return None
+        with open(spec.origin, 'rb') as f:
+            sha1.update(f.read())
+    return sha1.hexdigest()
+
+
+def _import_implementation(name):
+    return getattr(import_module(IMPLEMENTATIONS[name]), name)
+
+
+def _describe_interface(name):
+    """Return the manifest entry of a command, from its implementation"""
+    from datalad.distribution.dataset import Dataset
+
+    intf = _import_implementation(name)
+    call = intf.__call__
+    signature = inspect.signature(call).parameters
+    source_modules = get_source_modules(intf)
+    spec = dict(
+        module=intf.__module__,
+        source_modules=source_modules,
+        source_hash=get_source_hash(source_modules),
+        doc=intf.__doc__,
+        call_doc=call.__doc__,
+        eval_results=getattr(call, '_eval_results', False),
+        signature=[_dump_parameter(p) for p in signature.values()],
+        # only the parameters in the signature of the command itself, the
+        # generic parameters added by @eval_results are known to datalad
+        params={
+            pname: dict(
+                args=param.cmd_args,
+                kwargs=param.cmd_kwargs,
+                doc=param._doc,
+                constraints=_dump_constraint(param.constraints),
+            )
+            for pname, param in intf._params_.items()
+            if pname in signature
+        },
+        # names under which the command is bound to the Dataset class
+        dataset_methods=sorted(
+            attr for attr, value in vars(Dataset).items()
+            if getattr(value, '__wrapped__', None) is call),
+        attributes={
+            attr: getattr(intf, attr)
+            for attr in _ATTRIBUTES if hasattr(intf, attr)},
+    )
+    # make sure the manifest can represent the interface faithfully
+    json.dumps(spec)
+    return spec
+
+
+def _make_interface(name, spec):
+    """Return a stand-in for an interface class, built from its manifest"""
+    from datalad.support.param import Parameter
+
+    def __call__(*args, **kwargs):
+        return _import_implementation(name).__call__(*args, **kwargs)
+
+    __call__.__module__ = spec['module']
+    __call__.__qualname__ = '{}.__call__'.format(name)
+    __call__.__doc__ = spec['call_doc']
+    __call__.__signature__ = inspect.Signature(
+        [_load_parameter(p) for p in spec['signature']])
+    if spec['eval_results']:
+        __call__._eval_results = True
+
+    if spec['dataset_methods'] and spec['module'] not in sys.modules:
+        # the implementation binds itself to the Dataset class on import,
+        # until then the stand-in takes its place
+        from datalad.distribution.dataset import datasetmethod
+        for dsname in spec['dataset_methods']:
+            datasetmethod(name=dsname)(__call__)
+
+    attrs = dict(
+        spec['attributes'],
+        __module__=spec['module'],
+        __qualname__=name,
+        __doc__=spec['doc'],
+        __call__=staticmethod(__call__),
+        _params_={
+            pname: Parameter(
+                args=None if p['args'] is None else tuple(p['args']),
+                doc=p['doc'],
+                constraints=_load_constraint(p['constraints']),
+                **p['kwargs'])
+            for pname, p in spec['params'].items()
+        },
+    )
+    return type(name, (object,), attrs)
+
+
+def _dump_parameter(param):
+    spec = dict(name=param.name, kind=param.kind.name)
+    if param.default is not param.empty:
+        spec['default'] = param.default
+    return spec
+
+
+def _load_parameter(spec):
+    return inspect.Parameter(
+        spec['name'],
+        getattr(inspect.Parameter, spec['kind']),
+        default=spec.get('default', inspect.Parameter.empty))
+
+
+def _dump_constraint(constraint):
+    if constraint is None:
+        return None
+    name = type(constraint).__name__
+    if name not in _CONSTRAINT_ARGS \
+            or type(constraint) is not _get_constraint_class(name):
+        raise ValueError(
+            'Cannot represent constraint {!r} in the manifest'.format(
+                constraint))
+    return [name, _CONSTRAINT_ARGS[name](constraint)]
+
+
+def _load_constraint(spec):
+    if spec is None:
+        return None
+    name, args = spec
+    if name in _MULTI_CONSTRAINTS:
+        args = [_load_constraint(a) for a in args]
+    return _get_constraint_class(name)(*args)
+
+
+def _get_constraint_class(name):
+    module = _CONSTRAINT_MODULES.get(name, 'datalad.support.constraints')
+    return getattr(import_module(module), name)
@@ -0,0 +1,141 @@
+"""Persistent cache for the version computed from a source tree
+
+In a source tree (e.g., an editable install) versioneer determines the
+version by running a number of ``git`` commands. This module stores the
+outcome in the ``versions`` namespace of the extension's on-disk cache
+(see ``datalad_helloworld.cache``), keyed on the state of the repository's
+HEAD, its branches and tags, and the index. As long as none of them change,
+the version is read back from the cache without spawning a single
+process.
+
+The key is determined exclusively by reading and stat'ing files in the git
+directory. Consequently, modifications of the work tree that do not touch
+the index will not be reflected in the "dirty" flag of a cached version.
+"""
+
+__docformat__ = 'restructuredtext'
+
+import hashlib
+import json
+import os
+import os.path as op
+
+from . import _version
+from ._gitreader import (
+    GitRunner,
+    find_gitdirs,
+)
+from .cache import get_cache_manager
+
+# namespace of the cache
+NAMESPACE = 'versions'
+
+
+def get_versions():
+    """Return version information like ``_version.get_versions()``
+
+    The result is taken from the cache whenever the repository state matches
+    the one that the cached version was computed for.
+    """
+    if not hasattr(_version, 'get_config'):
+        # static _version.py as written at build time, nothing to compute
+        return _version.get_versions()
+
+    root = get_source_root()
+    gitdirs = find_gitdirs(root)
+    if gitdirs is None:
+        # no git, versioneer will use keywords or the parent directory name
+        return _version.get_versions()
+
+    cache = get_cache_manager()
+    key = get_state_key(*gitdirs)
+    cached = _loads(cache.get(NAMESPACE, root))
+    if cached is not None and key is not None and cached.get('key') == key:
+        return cached['versions']
+
+    versions = compute_versions(root)
+    if versions.get('error'):
+        # do not persist failures, they might be transient
+        return versions
+    # the key is determined after the version computation, because
+    # 'git describe --dirty' may have refreshed the index
+    key = get_state_key(*gitdirs)
+    if key is not None:
+        cache.put(NAMESPACE, root, json.dumps(
+            dict(key=key, versions=versions)).encode('utf-8'))
+    return versions
+
+
+def compute_versions(root):
+    """Compute version information for the source tree at `root`
+
+    Like ``_version.get_versions()``, but git is queried in-process whenever
+    possible.
+    """
+    cfg = _version.get_config()
+    try:
+        pieces = _version.git_pieces_from_vcs(
+            cfg.tag_prefix, root, cfg.verbose,
+            runner=GitRunner(_version.run_command))
+        return _version.render(pieces, cfg.style)
+    except _version.NotThisMethod:
+        # let versioneer try all other methods
+        return _version.get_versions()
+
+
+def get_source_root():
+    """Return the root of the source tree, as determined by versioneer"""
+    root = op.realpath(_version.__file__)
+    for _ in _version.get_config().versionfile_source.split('/'):
+        root = op.dirname(root)
+    return root
+
+
+def get_state_key(gitdir, commondir):
+    """Return a string that changes whenever the version might change
+
+    The key covers the content of HEAD and the ref it points to, the names
+    and timestamps of all branches and tags (loose and packed), and the
+    index. Returns ``None`` if the state could not be determined.
+    """
+    state = [_version.__file__, _version.get_config().tag_prefix]
+    try:
+        with open(op.join(gitdir, 'HEAD'), 'rb') as f:
+            head = f.read()
+    except OSError:
+        return None
+    state.append(head)
+    if head.startswith(b'ref:'):
+        ref = head[4:].strip().decode('utf-8', 'replace')
+        try:
+            with open(op.join(commondir, *ref.split('/')), 'rb') as f:
+                state.append(f.read())
+        except OSError:
+            # unborn, or only present in packed-refs (which is covered below)
+            state.append(None)
+    state.append(_stat_sig(op.join(commondir, 'packed-refs')))
+    state.append(_stat_sig(op.join(gitdir, 'index')))
+    for refs in ('heads', 'tags'):
+        refs_dir = op.join(commondir, 'refs', refs)
+        for dirpath, dirnames, filenames in os.walk(refs_dir):
+            # make the key independent of the directory listing order
+            dirnames.sort()
+            for fname in sorted(filenames):
+                fpath = op.join(dirpath, fname)
+                state.append((op.relpath(fpath, refs_dir), _stat_sig(fpath)))
+    return hashlib.sha1(repr(state).encode('utf-8')).hexdigest()
+
+
+def _stat_sig(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+def _loads(value):
+    try:
+        return None if value is None else json.loads(value.decode('utf-8'))
+    except ValueError:
+        return None
@@ -0,0 +1,475 @@
+"""Size-bounded on-disk caches of this extension
+
+All caches that outlive a process are namespaces of a single SQLite
+database in the cache directory (see `get_cache_dir()`):
+
+- ``results``: results of ``hello-cmd --cache`` (see
+  ``datalad_helloworld.resultcache``)
+- ``versions``: the version computed from a source tree (see
+  ``datalad_helloworld._versioncache``)
+
+Every namespace has a size limit and an optional time to live (TTL). Entries
+that expired are never reported, and least recently used entries are
+evicted whenever a namespace grows beyond its limit. Limits can be set with
+``DATALAD_HELLOWORLD_CACHE_<NAMESPACE>_SIZE`` (in bytes) and
+``DATALAD_HELLOWORLD_CACHE_<NAMESPACE>_TTL`` (in seconds, 0 for none)
+environment variables. Every write is a transaction, concurrent processes
+never see a partially written entry. Hits, misses, and evictions are
+counted per namespace, across processes.
+
+Reading an entry does not write to the database: the access times of
+entries (hence, least recently used is approximate) and the counts of hits
+and misses are kept in memory, and written along with the next write of
+the process, or when it exits. The database uses SQLite's default rollback
+journal, rather than WAL mode, which needs shared memory that network file
+systems (e.g. an NFS home directory) do not provide.
+
+Failures to read or write the database are logged, and treated like a miss,
+a cache that cannot be used is no reason to fail. Maintenance operations
+(`CacheManager.stats()`, `CacheManager.prune()`, `CacheManager.clear()`)
+raise them instead. The ``hello-cache`` command shows, prunes, and primes
+the caches.
+"""
+
+__docformat__ = 'restructuredtext'
+
+import atexit
+import glob
+import logging
+import os
+import os.path as op
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+lgr = logging.getLogger('datalad.helloworld.cache')
+
+Namespace = namedtuple('Namespace', ('size', 'ttl', 'doc'))
+Namespace.__doc__ = """Limits of a cache namespace
+
+size : int
+  Maximum total size of the values, in bytes.
+ttl : float or None
+  Seconds after which an entry expires, or None if entries do not expire.
+doc : str
+  What is cached.
+"""
+
+# default limits of all namespaces
+NAMESPACES = {
+    'results': Namespace(
+        size=64 << 20, ttl=7 * 24 * 3600., doc='results of hello-cmd'),
+    'versions': Namespace(
+        size=1 << 20, ttl=None, doc='versions computed from source trees'),
+}
+
+# name of the database in the cache directory
+DATABASE = 'cache.sqlite'
+# seconds to wait for a lock on the database held by another process
+_TIMEOUT = 5.0
+# milliseconds to wait for a lock when writing pending updates at exit, they
+# are dropped rather than delaying the exit
+_EXIT_TIMEOUT = 100
+# number of pending access times and counts after which they are written
+_MAX_PENDING = 1000
+# files of the version cache that preceded the database
+_LEGACY_FILES = 'version-*.json'
+# version of the database schema
+_SCHEMA = 2
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+def get_cache_dir():
+    """Return the directory that holds the caches of this extension
+
+    The location can be set via the ``DATALAD_HELLOWORLD_CACHE_DIR``
+    environment variable, and defaults to ``datalad/helloworld`` in the
+    user's cache directory.
+    """
+    cache_dir = os.environ.get('DATALAD_HELLOWORLD_CACHE_DIR')
+    if not cache_dir:
+        cache_dir = op.join(
+            os.environ.get('XDG_CACHE_HOME')
+            or op.join(op.expanduser('~'), '.cache'),
+            'datalad', 'helloworld')
+    return cache_dir
+
+
+def get_namespaces():
+    """Return the limits of all namespaces, including environment overrides
+    """
+    namespaces = {}
+    for name, ns in NAMESPACES.items():
+        prefix = 'DATALAD_HELLOWORLD_CACHE_{}_'.format(name.upper())
+        size = os.environ.get(prefix + 'SIZE')
+        ttl = os.environ.get(prefix + 'TTL')
+        try:
+            if size:
+                ns = ns._replace(size=int(size))
+            if ttl:
+                ns = ns._replace(ttl=float(ttl) or None)
+        except ValueError as e:
+            lgr.warning('Ignoring invalid limit of cache %r: %s', name, e)
+        namespaces[name] = ns
+    return namespaces
+
+
+def get_cache_manager():
+    """Return the manager of the caches in `get_cache_dir()`
+
+    There is one manager per directory and process.
+    """
+    cache_dir = op.abspath(get_cache_dir())
+    with _managers_lock:
+        manager = _managers.get(cache_dir)
+        if manager is None:
+            manager = _managers[cache_dir] = CacheManager(cache_dir)
+        return manager
+
+
+class CacheManager(object):
+    """Access to the cache namespaces in a directory
+
+    Values are bytes, keys are strings. An entry can carry a tag, e.g. the
+    path of a dataset, to delete all entries with that tag at once. Access
+    times and counts of hits and misses are written lazily, see `flush()`.
+
+    Parameters
+    ----------
+    directory : str
+      Directory of the database, created on first use.
+    namespaces : dict, optional
+      Limits by namespace name, by default `get_namespaces()`.
+    """
+
+    def __init__(self, directory, namespaces=None):
+        self.path = op.join(directory, DATABASE)
+        self.namespaces = get_namespaces() if namespaces is None \
+            else dict(namespaces)
+        self._conn = None
+        self._pid = None
+        self._lock = threading.Lock()
+        # access times by (namespace, key), and counts of hits and misses by
+        # namespace, that are not written yet
+        self._atimes = {}
+        self._counts = {}
+        self._npending = 0
+        self._exit_handler = False
+
+    def get(self, namespace, key):
+        """Return the value of an entry, or None if there is none
+
+        Only reads from the database, unless many updates are pending.
+        """
+        self._check_namespace(namespace)
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                row = conn.execute(
+                    'SELECT value FROM entries WHERE namespace = ? '
+                    'AND key = ? AND (expires IS NULL OR expires > ?)',
+                    (namespace, key, now)).fetchone()
+                if row is not None:
+                    self._atimes[(namespace, key)] = now
+                counts = self._counts.setdefault(namespace, [0, 0])
+                counts[row is None] += 1
+                self._npending += 1
+                if not self._exit_handler:
+                    atexit.register(self._flush_at_exit)
+                    self._exit_handler = True
+                if self._npending >= _MAX_PENDING:
+                    with conn:
+                        self._flush(conn)
+        except (sqlite3.Error, OSError) as e:
+            lgr.debug('Cannot read cache %s: %s', self.path, e)
+            return None
+        return None if row is None else row[0]
+
+    def flush(self):
+        """Write pending access times and counts of hits and misses
+
+        They are also written with any other write, and at exit.
+        """
+        with self._lock:
+            if not self._npending:
+                return
+            conn = self._connect()
+            with conn:
+                self._flush(conn)
+
+    def put(self, namespace, key, value, tag=None):
+        """Store an entry, replacing any entry with the same key
+
+        Values that are larger than the size limit of the namespace are not
+        stored.
+        """
+        ns = self._check_namespace(namespace)
+        if len(value) > ns.size:
+            return
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                with conn:
+                    self._flush(conn)
+                    conn.execute(
+                        'INSERT OR REPLACE INTO entries '
+                        '(namespace, key, tag, value, size, atime, expires) '
+                        'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                        (namespace, key, tag, value, len(value), now,
+                         None if ns.ttl is None else now + ns.ttl))
+                    self._evict(conn, namespace, ns.size, now)
+        except (sqlite3.Error, OSError) as e:
+            lgr.debug('Cannot write cache %s: %s', self.path, e)
+
+    def delete(self, namespace, key=None, tag=None):
+        """Delete the entry with a key, or all entries with a tag
+
+        Without a key and a tag, all entries of the namespace are deleted.
+        """
+        self._check_namespace(namespace)
+        query, args = 'DELETE FROM entries WHERE namespace = ?', [namespace]
+        if key is not None:
+            query += ' AND key = ?'
+            args.append(key)
+        if tag is not None:
+            query += ' AND tag = ?'
+            args.append(tag)
+        try:
+            with self._lock:
+                conn = self._connect()
+                with conn:
+                    self._flush(conn)
+                    conn.execute(query, args)
+        except (sqlite3.Error, OSError) as e:
+            lgr.debug('Cannot delete from cache %s: %s', self.path, e)
+
+    def stats(self, namespace=None):
+        """Return the statistics of a namespace, or of all namespaces
+
+        Returns
+        -------
+        dict
+          Mapping of namespace names to dicts with the number of 'entries',
+          their total 'size', the 'limit' and 'ttl' of the namespace, and
+          the counts of 'hits', 'misses', and 'evictions'.
+        """
+        names = self._get_names(namespace)
+        with self._lock:
+            conn = self._connect()
+            if self._npending:
+                with conn:
+                    self._flush(conn)
+            stats = {}
+            for name in names:
+                entries, size = conn.execute(
+                    'SELECT count(*), coalesce(sum(size), 0) FROM entries '
+                    'WHERE namespace = ? AND (expires IS NULL '
+                    'OR expires > ?)', (name, time.time())).fetchone()
+                counters = conn.execute(
+                    'SELECT hits, misses, evictions FROM counters '
+                    'WHERE namespace = ?', (name,)).fetchone() or (0, 0, 0)
+                stats[name] = dict(
+                    entries=entries,
+                    size=size,
+                    limit=self.namespaces[name].size,
+                    ttl=self.namespaces[name].ttl,
+                    **dict(zip(('hits', 'misses', 'evictions'), counters)))
+        return stats
+
+    def prune(self, namespace=None, size=None):
+        """Delete expired entries, and evict entries beyond the size limit
+
+        Parameters
+        ----------
+        namespace : str, optional
+          By default, all namespaces are pruned.
+        size : int, optional
+          Size in bytes to shrink each namespace to, if smaller than its
+          limit.
+
+        Returns
+        -------
+        dict
+          Mapping of namespace names to tuples of the number of deleted
+          entries and the number of bytes freed.
+        """
+        names = self._get_names(namespace)
+        now = time.time()
+        pruned = {}
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                self._flush(conn)
+                for name in names:
+                    limit = self.namespaces[name].size
+                    if size is not None:
+                        limit = min(limit, size)
+                    expired = conn.execute(
+                        'SELECT count(*), coalesce(sum(size), 0) '
+                        'FROM entries WHERE namespace = ? AND expires <= ?',
+                        (name, now)).fetchone()
+                    conn.execute(
+                        'DELETE FROM entries '
+                        'WHERE namespace = ? AND expires <= ?', (name, now))
+                    evicted = self._evict(conn, name, limit, now)
+                    pruned[name] = (expired[0] + evicted[0],
+                                    expired[1] + evicted[1])
+        _remove_legacy_files(op.dirname(self.path))
+        return pruned
+
+    def clear(self, namespace=None):
+        """Delete all entries, and reset the statistics
+
+        Parameters
+        ----------
+        namespace : str, optional
+          By default, all namespaces are cleared.
+        """
+        names = self._get_names(namespace)
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                self._flush(conn)
+                for name in names:
+                    conn.execute(
+                        'DELETE FROM entries WHERE namespace = ?', (name,))
+                    conn.execute(
+                        'DELETE FROM counters WHERE namespace = ?', (name,))
+            conn.execute('VACUUM')
+
+    def _check_namespace(self, namespace):
+        ns = self.namespaces.get(namespace)
+        if ns is None:
+            raise ValueError('unknown cache namespace: {!r}'.format(namespace))
+        return ns
+
+    def _get_names(self, namespace):
+        if namespace is None:
+            return sorted(self.namespaces)
+        self._check_namespace(namespace)
+        return [namespace]
+
+    def _flush(self, conn):
+        # within a transaction, with the lock held. entries may have been
+        # accessed by another process more recently
+        conn.executemany(
+            'UPDATE entries SET atime = max(atime, ?) '
+            'WHERE namespace = ? AND key = ?',
+            [(atime, namespace, key)
+             for (namespace, key), atime in self._atimes.items()])
+        for namespace, (hits, misses) in self._counts.items():
+            self._count(conn, namespace, 'hits', hits)
+            self._count(conn, namespace, 'misses', misses)
+        self._atimes.clear()
+        self._counts.clear()
+        self._npending = 0
+
+    def _flush_at_exit(self):
+        if not self._npending or self._pid != os.getpid():
+            return
+        try:
+            self._conn.execute(
+                'PRAGMA busy_timeout = {}'.format(_EXIT_TIMEOUT))
+            self.flush()
+        except (sqlite3.Error, OSError) as e:
+            lgr.debug('Cannot update cache %s: %s', self.path, e)
+
+    @staticmethod
+    def _count(conn, namespace, counter, n=1):
+        # within a transaction
+        conn.execute(
+            'INSERT OR IGNORE INTO counters (namespace) VALUES (?)',
+            (namespace,))
+        conn.execute(
+            'UPDATE counters SET {0} = {0} + ? WHERE namespace = ?'.format(
+                counter), (n, namespace))
+
+    def _evict(self, conn, namespace, limit, now):
+        """Evict entries of a namespace until it fits its limit
+
+        Expired entries go first, then the least recently used ones. Returns
+        the number of evicted entries, and their total size.
+        """
+        # within a transaction
+        total = conn.execute(
+            'SELECT coalesce(sum(size), 0) FROM entries WHERE namespace = ?',
+            (namespace,)).fetchone()[0]
+        if total <= limit:
+            return 0, 0
+        keys = []
+        freed = 0
+        for key, size in conn.execute(
+                'SELECT key, size FROM entries WHERE namespace = ? '
+                'ORDER BY (expires IS NOT NULL AND expires <= ?) DESC, atime',
+                (namespace, now)).fetchall():
+            keys.append((namespace, key))
+            freed += size
+            if total - freed <= limit:
+                break
+        conn.executemany(
+            'DELETE FROM entries WHERE namespace = ? AND key = ?', keys)
+        self._count(conn, namespace, 'evictions', len(keys))
+        return len(keys), freed
+
+    def _connect(self):
+        # with the lock held. a connection is not shared with forked
+        # processes
+        if self._conn is not None and self._pid == os.getpid():
+            return self._conn
+        os.makedirs(op.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(
+            self.path, timeout=_TIMEOUT, check_same_thread=False)
+        try:
+            if conn.execute('PRAGMA user_version').fetchone()[0] != _SCHEMA:
+                _create_schema(conn)
+                _remove_legacy_files(op.dirname(self.path))
+        except sqlite3.Error:
+            conn.close()
+            raise
+        self._conn, self._pid = conn, os.getpid()
+        return conn
+
+
+def _remove_legacy_files(directory):
+    for path in glob.glob(op.join(directory, _LEGACY_FILES)):
+        try:
+            os.unlink(path)
+        except OSError as e:
+            lgr.debug('Cannot remove %s: %s', path, e)
+
+
+def _create_schema(conn):
+    # a single transaction, that a concurrent process waits for. Databases
+    # of an earlier version used WAL mode, which is persistent
+    conn.execute('PRAGMA journal_mode=DELETE')
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        if conn.execute('PRAGMA user_version').fetchone()[0] == _SCHEMA:
+            conn.execute('COMMIT')
+            return
+        conn.execute('DROP TABLE IF EXISTS entries')
+        conn.execute('DROP TABLE IF EXISTS counters')
+        conn.execute(
+            'CREATE TABLE entries ('
+            'namespace TEXT NOT NULL, key TEXT NOT NULL, tag TEXT, '
+            'value BLOB NOT NULL, size INTEGER NOT NULL, '
+            'atime REAL NOT NULL, expires REAL, '
+            'PRIMARY KEY (namespace, key))')
+        conn.execute(
+            'CREATE INDEX entries_atime ON entries (namespace, atime)')
+        conn.execute('CREATE INDEX entries_tag ON entries (namespace, tag)')
+        conn.execute(
+            'CREATE TABLE counters ('
+            'namespace TEXT PRIMARY KEY, hits INTEGER NOT NULL DEFAULT 0, '
+            'misses INTEGER NOT NULL DEFAULT 0, '
+            'evictions INTEGER NOT NULL DEFAULT 0)')
+        conn.execute('PRAGMA user_version = {}'.format(_SCHEMA))
+        conn.execute('COMMIT')
+    except BaseException:
+        conn.execute('ROLLBACK')
+        raise
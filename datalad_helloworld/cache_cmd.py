@@ -0,0 +1,175 @@
+"""Command to inspect and maintain the caches of the extension"""
+
+__docformat__ = 'restructuredtext'
+
+import sqlite3
+import sys
+
+from datalad.interface.base import Interface
+from datalad.support.param import Parameter
+from datalad.distribution.dataset import EnsureDataset
+from datalad.interface.common_opts import recursion_flag
+from datalad.interface.common_opts import recursion_limit
+from datalad.interface.base import eval_results
+from datalad.interface.utils import generic_result_renderer
+from datalad.support.constraints import EnsureChoice
+from datalad.support.constraints import EnsureInt
+from datalad.support.constraints import EnsureNone
+
+from datalad.interface.results import get_status_dict
+
+from datalad_helloworld._docs import build_doc
+from datalad_helloworld.cache import (
+    NAMESPACES,
+    get_cache_manager,
+)
+
+import logging
+lgr = logging.getLogger('datalad.helloworld.cache_cmd')
+
+
+@build_doc
+class HelloCache(Interface):
+    """Show, prune, and prime the caches of the extension
+
+    The caches are namespaces of a database in the cache directory of the
+    extension, which is set with the DATALAD_HELLOWORLD_CACHE_DIR
+    environment variable. Each namespace has a size limit, and an optional
+    time to live of its entries, that are set with
+    DATALAD_HELLOWORLD_CACHE_<NAMESPACE>_SIZE (in bytes) and
+    DATALAD_HELLOWORLD_CACHE_<NAMESPACE>_TTL (in seconds) environment
+    variables. Namespaces are pruned to their limit on every write, 'prune'
+    also removes expired entries, and can shrink them further.
+
+    One result is reported per namespace, with its number of 'entries', their
+    total 'size', its size 'limit' and 'ttl', and the numbers of 'hits',
+    'misses', and 'evictions' since it was last cleared.
+    """
+
+    _params_ = dict(
+        action=Parameter(
+            args=("action",),
+            nargs="?",
+            doc="""'show' reports the statistics of the caches. 'prune'
+            removes expired entries, and evicts least recently used entries
+            until every cache fits its size limit (or --max-size). 'clear'
+            removes all entries and statistics. 'prime' fills the caches:
+            the version of the extension, if it is computed from a source
+            tree, and the results of hello-cmd for a dataset in every
+            available language""",
+            constraints=EnsureChoice('show', 'prune', 'clear', 'prime')),
+        namespace=Parameter(
+            args=("-n", "--namespace"),
+            doc="""only act on this cache, instead of all of them""",
+            constraints=EnsureChoice(*sorted(NAMESPACES)) | EnsureNone()),
+        max_size=Parameter(
+            args=("--max-size",),
+            metavar="BYTES",
+            doc="""with 'prune', shrink each cache to at most this size, if
+            it is smaller than the size limit""",
+            constraints=EnsureInt() | EnsureNone()),
+        dataset=Parameter(
+            args=("-d", "--dataset"),
+            doc="""with 'prime', dataset to cache the results of hello-cmd
+            for""",
+            constraints=EnsureDataset() | EnsureNone()),
+        recursive=recursion_flag,
+        recursion_limit=recursion_limit,
+    )
+
+    @staticmethod
+    @eval_results
+    def __call__(action='show', namespace=None, max_size=None, dataset=None,
+                 recursive=False, recursion_limit=None):
+        manager = get_cache_manager()
+        names = sorted(NAMESPACES) if namespace is None else [namespace]
+        res_kwargs = dict(
+            action='hello-cache', path=manager.path, type='cache')
+        try:
+            pruned = {}
+            if action == 'prune':
+                pruned = manager.prune(namespace, size=max_size)
+            elif action == 'clear':
+                manager.clear(namespace)
+                if 'results' in names \
+                        and 'datalad_helloworld.resultcache' in sys.modules:
+                    # also the in-memory tier of this process
+                    from datalad_helloworld.resultcache import (
+                        get_result_cache,
+                    )
+                    get_result_cache().invalidate()
+            elif action == 'prime':
+                for name in list(names):
+                    message = _prime(
+                        name, dataset, recursive, recursion_limit)
+                    if message is not None:
+                        yield get_status_dict(
+                            status='notneeded', namespace=name,
+                            message=message, **res_kwargs)
+                        names.remove(name)
+            stats = manager.stats(namespace)
+        except (sqlite3.Error, OSError) as e:
+            yield get_status_dict(
+                status='error',
+                message=('cannot %s caches: %s', action, e),
+                **res_kwargs)
+            return
+
+        for name in names:
+            res = get_status_dict(
+                status='ok', namespace=name, **dict(res_kwargs, **stats[name]))
+            if name in pruned:
+                res['removed'], res['freed'] = pruned[name]
+            yield res
+
+    @staticmethod
+    def custom_result_renderer(res, **kwargs):
+        from datalad.ui import ui
+        from datalad.utils import bytes2human
+
+        if res['status'] != 'ok' or 'entries' not in res:
+            generic_result_renderer(res)
+            return
+        line = '{}: {} entries, {} of {}, {}; {} hits, {} misses, ' \
+            '{} evictions'.format(
+                res['namespace'], res['entries'], bytes2human(res['size']),
+                bytes2human(res['limit']), _format_ttl(res['ttl']),
+                res['hits'], res['misses'], res['evictions'])
+        if 'removed' in res:
+            line += ' (pruned {} entries, {})'.format(
+                res['removed'], bytes2human(res['freed']))
+        ui.message(line)
+
+
+def _prime(namespace, dataset, recursive, recursion_limit):
+    """Fill a cache namespace
+
+    Returns None, or a message why there was nothing to do.
+    """
+    if namespace == 'versions':
+        from datalad_helloworld import _version
+        if not hasattr(_version, 'get_config'):
+            return 'version is not computed from a source tree'
+        from datalad_helloworld._versioncache import get_versions
+        get_versions()
+    elif namespace == 'results':
+        if dataset is None:
+            return 'no dataset to cache results for'
+        from datalad_helloworld.catalog import get_languages
+        from datalad_helloworld.hello_cmd import hello_cmd_raw
+        for language in sorted(get_languages()):
+            # consumed completely, to be recorded
+            for _ in hello_cmd_raw(
+                    language=language, dataset=dataset, recursive=recursive,
+                    recursion_limit=recursion_limit, cache=True):
+                pass
+    return None
+
+
+def _format_ttl(ttl):
+    if ttl is None:
+        return 'no expiry'
+    for unit, seconds in (('d', 86400), ('h', 3600), ('m', 60)):
+        if ttl >= seconds and not ttl % seconds:
+            return 'expiry after {:.0f}{}'.format(ttl / seconds, unit)
+    return 'expiry after {:g}s'.format(ttl)
@@ -0,0 +1,436 @@
+"""Message catalogs
+
+Messages are translated with compiled gettext message catalogs (``.mo``
+files), one per language, at ``locale/<language>/LC_MESSAGES/<DOMAIN>.mo``
+in this package. Catalogs are compiled from their ``.po`` sources at build
+time (``python setup.py build_catalogs``).
+
+A catalog is loaded on first use only, by memory-mapping its file. Messages
+are looked up via the hash table of the file, without reading (or even
+paging in) the rest of the catalog. Hence, the number of available
+languages has no bearing on the cost of using any one of them.
+
+The set of available languages is given by the catalog directories, plus
+the language of the messages in the source code (`SOURCE_LANGUAGE`), which
+needs no catalog. Requested languages are BCP 47 language tags, or priority
+lists of them (like an HTTP ``Accept-Language`` header), which are
+negotiated against the available languages (see `negotiate_language()`).
+"""
+
+__docformat__ = 'restructuredtext'
+
+import logging
+import mmap
+import os
+import os.path as op
+import struct
+import threading
+from functools import lru_cache
+
+from datalad.support.constraints import Constraint
+
+lgr = logging.getLogger('datalad.helloworld.catalog')
+
+LOCALE_DIR = op.join(op.dirname(__file__), 'locale')
+
+# gettext domain, i.e. the file name of the catalogs
+DOMAIN = 'datalad_helloworld'
+
+# language of the messages in the source code
+SOURCE_LANGUAGE = 'en'
+
+_MO_MAGIC = 0x950412de
+
+# catalogs loaded so far, by language
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def get_languages():
+    """Return the available languages
+
+    Returns
+    -------
+    frozenset
+    """
+    try:
+        with os.scandir(LOCALE_DIR) as entries:
+            languages = {e.name for e in entries if e.is_dir()}
+    except FileNotFoundError:
+        languages = set()
+    languages.add(SOURCE_LANGUAGE)
+    return frozenset(languages)
+
+
+def get_catalog(language):
+    """Return the catalog for a language
+
+    Catalogs are loaded on first request, and reused afterwards.
+
+    Parameters
+    ----------
+    language : str
+
+    Returns
+    -------
+    Catalog or None
+      None, if `language` is not available.
+    """
+    catalog = _catalogs.get(language)
+    if catalog is not None or language not in get_languages():
+        return catalog
+    with _catalogs_lock:
+        catalog = _catalogs.get(language)
+        if catalog is None:
+            if language == SOURCE_LANGUAGE:
+                catalog = NullCatalog()
+            else:
+                path = get_catalog_path(language)
+                lgr.debug('Loading message catalog %s', path)
+                catalog = Catalog(path)
+            _catalogs[language] = catalog
+    return catalog
+
+
+@lru_cache(maxsize=1024)
+def negotiate_language(request):
+    """Return the available language that matches a request best
+
+    Requested tags are considered in order of their quality values. A tag
+    matches the available language with the longest common prefix of
+    subtags (e.g., 'de-AT-1996' matches 'de-AT', or else 'de'). If there
+    is no such language, but more specific ones (e.g., 'de-CH' for 'de'),
+    the first of those matches. The wildcard '*' matches the source
+    language.
+
+    Results are memoized, hence repeated requests cost a dictionary lookup.
+
+    Parameters
+    ----------
+    request : str
+      Language tag, or priority list of language tags, like
+      'de-AT, de;q=0.8, en;q=0.5'. Tags are case-insensitive, and '_' is
+      an alternative subtag separator.
+
+    Returns
+    -------
+    str or None
+      The matching language (a catalog directory name), or None, if no
+      available language matches.
+    """
+    trie = _get_language_trie()
+    for tag in _parse_language_request(request):
+        if tag == '*':
+            return SOURCE_LANGUAGE
+        node = trie
+        match = None
+        for subtag in tag.split('-'):
+            node = node.get(subtag)
+            if node is None:
+                break
+            match = node.get('', match)
+        else:
+            if match is None:
+                match = _get_first_language(node)
+        if match is not None:
+            return match
+    return None
+
+
+def _parse_language_request(request):
+    """Return the normalized tags of a request, in order of preference
+
+    Malformed entries and tags with a quality of zero are skipped.
+    """
+    tags = []
+    for i, item in enumerate(request.split(',')):
+        tag, _, params = item.partition(';')
+        tag = tag.strip().lower().replace('_', '-')
+        q = 1.0
+        if params:
+            name, _, value = params.partition('=')
+            if name.strip() != 'q':
+                continue
+            try:
+                q = float(value)
+            except ValueError:
+                continue
+        if tag and 0 < q <= 1:
+            tags.append((-q, i, tag))
+    return [tag for _, _, tag in sorted(tags)]
+
+
+@lru_cache(maxsize=None)
+def _get_language_trie():
+    """Return a prefix tree of the available languages
+
+    Nodes are dicts, keyed on (normalized) subtags. The language that
+    corresponds to the path to a node is stored under ''.
+    """
+    trie = {}
+    for language in sorted(get_languages()):
+        node = trie
+        for subtag in language.lower().replace('_', '-').split('-'):
+            node = node.setdefault(subtag, {})
+        node[''] = language
+    return trie
+
+
+def _get_first_language(node):
+    while node:
+        if '' in node:
+            return node['']
+        node = node[min(node)]
+    return None
+
+
+def get_catalog_path(language, ext='.mo'):
+    """Return the path of the catalog file for a language"""
+    return op.join(LOCALE_DIR, language, 'LC_MESSAGES', DOMAIN + ext)
+
+
+class NullCatalog(object):
+    """Catalog of the source language, messages are not translated"""
+
+    def gettext(self, message):
+        return message
+
+
+class Catalog(object):
+    """Memory-mapped, compiled gettext message catalog
+
+    Parameters
+    ----------
+    path : str
+      Path of a ``.mo`` file.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic = struct.unpack_from('<I', self._data)[0]
+        if magic == _MO_MAGIC:
+            self._order = '<'
+        elif struct.unpack_from('>I', self._data)[0] == _MO_MAGIC:
+            self._order = '>'
+        else:
+            raise ValueError('{} is not a message catalog'.format(path))
+        (self._nstrings, self._originals, self._translations,
+         self._hash_size, self._hash_table) = struct.unpack_from(
+            self._order + '5I', self._data, 8)
+        # translations that were looked up already, by message
+        self._cache = {}
+
+    def gettext(self, message):
+        """Return the translation of a message
+
+        Returns the message itself, if it has no translation.
+        """
+        translation = self._cache.get(message)
+        if translation is None:
+            translation = self._cache[message] = \
+                self._lookup(message.encode('utf-8'))
+            if translation is None:
+                translation = self._cache[message] = message
+        return translation
+
+    def _get_string(self, table, i):
+        length, offset = struct.unpack_from(
+            self._order + '2I', self._data, table + 8 * i)
+        return self._data[offset:offset + length]
+
+    def _lookup(self, key):
+        if not self._hash_size:
+            return self._bisect(key)
+        # open addressing with double hashing, like GNU gettext
+        hval = hashpjw(key)
+        size = self._hash_size
+        idx = hval % size
+        incr = 1 + hval % (size - 2)
+        while True:
+            i = struct.unpack_from(
+                self._order + 'I', self._data, self._hash_table + 4 * idx)[0]
+            if not i:
+                return None
+            if self._get_string(self._originals, i - 1) == key:
+                return self._get_string(
+                    self._translations, i - 1).decode('utf-8')
+            idx = idx - (size - incr) if idx >= size - incr else idx + incr
+
+    def _bisect(self, key):
+        # catalogs without a hash table have sorted messages
+        lo, hi = 0, self._nstrings
+        while lo < hi:
+            mid = (lo + hi) // 2
+            original = self._get_string(self._originals, mid)
+            if original == key:
+                return self._get_string(
+                    self._translations, mid).decode('utf-8')
+            if original < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+
+def hashpjw(key):
+    """Return the hash of a message, as used in the hash table of catalogs
+
+    Parameters
+    ----------
+    key : bytes
+    """
+    hval = 0
+    for c in key:
+        hval = ((hval << 4) + c) & 0xffffffff
+        g = hval & 0xf0000000
+        if g:
+            hval ^= g >> 24
+            hval ^= g
+    return hval
+
+
+class EnsureLanguage(Constraint):
+    """Ensure an input requests an available language
+
+    The input is a language tag or a priority list of language tags (see
+    `negotiate_language()`). Unlike ``EnsureChoice``, the available languages
+    are determined on first validation, not when the constraint is created.
+    """
+
+    _long_description = (
+        'value must be a language tag, or a priority list of language '
+        'tags, that matches a language with a message catalog, like '
+        '{!r}'.format(SOURCE_LANGUAGE))
+
+    def __call__(self, value):
+        # available languages are matched by a set lookup, anything else by
+        # (memoized) negotiation
+        if value not in get_languages() and negotiate_language(value) is None:
+            raise ValueError(
+                "value {!r} matches no available language".format(value))
+        return value
+
+    def long_description(self):
+        return self._long_description
+
+    def short_description(self):
+        return 'LANGUAGE'
+
+
+def compile_catalog(po_path, mo_path):
+    """Compile a ``.po`` file into a ``.mo`` file
+
+    Fuzzy and untranslated messages are omitted, like ``msgfmt`` does.
+    """
+    messages = _read_po(po_path)
+    with open(mo_path, 'wb') as f:
+        f.write(_build_mo(messages))
+
+
+def write_catalogs(locale_dir=LOCALE_DIR):
+    """Compile the ``.po`` files of all languages
+
+    Returns
+    -------
+    str
+      The directory of the catalogs.
+    """
+    for language in sorted(os.listdir(locale_dir)):
+        po_path = op.join(
+            locale_dir, language, 'LC_MESSAGES', DOMAIN + '.po')
+        if op.exists(po_path):
+            compile_catalog(po_path, po_path[:-3] + '.mo')
+    return locale_dir
+
+
+def _read_po(path):
+    """Return the translated messages in a ``.po`` file, by message"""
+    messages = {}
+    entry = {}
+    field = None
+    fuzzy = False
+
+    def add():
+        if entry.get('msgstr') and not fuzzy:
+            messages[entry.get('msgid', '')] = entry['msgstr']
+
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith('#'):
+                if line.startswith('#,') and 'fuzzy' in line:
+                    # applies to the next entry
+                    add()
+                    entry, field = {}, None
+                    fuzzy = True
+                continue
+            if line.startswith('"'):
+                entry[field] += _unquote(line)
+                continue
+            keyword, value = line.split(None, 1)
+            if keyword == 'msgid' and 'msgid' in entry:
+                add()
+                entry = {}
+                fuzzy = False
+            field = keyword
+            entry[field] = _unquote(value)
+    add()
+    return messages
+
+
+def _unquote(s):
+    # only needed at build time
+    import ast
+    if len(s) < 2 or s[0] != '"' or s[-1] != '"':
+        raise ValueError('invalid string in catalog: {}'.format(s))
+    # the escape sequences of C, as far as they are used in catalogs, are
+    # those of Python
+    return ast.literal_eval(s)
+
+
+def _build_mo(messages):
+    """Return the content of a ``.mo`` file with the given messages"""
+    keys = sorted(messages)
+    originals = [k.encode('utf-8') for k in keys]
+    translations = [messages[k].encode('utf-8') for k in keys]
+    n = len(keys)
+    hash_size = _next_prime(max(3, n * 4 // 3))
+    hash_table = [0] * hash_size
+    for i, key in enumerate(originals):
+        hval = hashpjw(key)
+        idx = hval % hash_size
+        incr = 1 + hval % (hash_size - 2)
+        while hash_table[idx]:
+            idx = idx - (hash_size - incr) \
+                if idx >= hash_size - incr else idx + incr
+        hash_table[idx] = i + 1
+
+    originals_offset = 28
+    translations_offset = originals_offset + 8 * n
+    hash_offset = translations_offset + 8 * n
+    offset = hash_offset + 4 * hash_size
+    tables = []
+    strings = []
+    for table in (originals, translations):
+        for s in table:
+            tables.append(struct.pack('<2I', len(s), offset))
+            strings.append(s + b'\0')
+            offset += len(s) + 1
+    return b''.join([
+        struct.pack('<7I', _MO_MAGIC, 0, n, originals_offset,
+                    translations_offset, hash_size, hash_offset),
+        *tables,
+        struct.pack('<{}I'.format(hash_size), *hash_table),
+        *strings,
+    ])
+
+
+def _next_prime(n):
+    n |= 1
+    while any(n % d == 0 for d in range(3, int(n ** 0.5) + 1, 2)):
+        n += 2
+    return n
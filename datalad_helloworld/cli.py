@@ -0,0 +1,137 @@
+"""Dedicated command line entry point of the demo command
+
+``datalad hello-cmd`` has datalad discover all extensions, and set up its
+parser for the command line of any command, before the parser of
+``hello-cmd`` is built. ``datalad-hello`` builds the parser of this one
+command right away, from the manifest of the command suite (see
+`datalad_helloworld._manifest`), and runs the command like ``datalad``
+does. Options, result renderers and exit codes are those of ``datalad
+[OPTIONS] hello-cmd``, with datalad's general options and the options of
+the command in a single parser::
+
+    datalad-hello -f json --language de
+
+Where an option string of the command is also one of a general option, it
+refers to the option of the command, e.g., ``-l`` is ``--language``, and
+the log level is set with ``--log-level``.
+"""
+
+__docformat__ = 'restructuredtext'
+
+import logging
+import sys
+
+lgr = logging.getLogger('datalad.helloworld.cli')
+
+# name of the program
+PROG = 'datalad-hello'
+
+
+def setup_parser():
+    """Return the parser of the ``datalad-hello`` command line"""
+    import argparse
+    from functools import partial
+
+    from datalad.cli.common_args import common_args
+    from datalad.cli.exec import call_from_parser
+    from datalad.cli.helpers import HelpAction
+    from datalad.cli.interface import (
+        alter_interface_docs_for_cmdline,
+        get_cmd_ex,
+    )
+    from datalad.cli.parser import (
+        ArgumentParserDisableAbbrev,
+        parser_add_common_opt,
+        parser_add_version_opt,
+        setup_parser_for_interface,
+    )
+    from datalad.interface.base import get_cmd_doc
+
+    # the stand-in built from the manifest, the implementation is imported
+    # when the command runs
+    from datalad_helloworld._manifest import HelloWorld
+
+    description = alter_interface_docs_for_cmdline(get_cmd_doc(HelloWorld))
+    if hasattr(HelloWorld, '_examples_'):
+        description += alter_interface_docs_for_cmdline(
+            get_cmd_ex(HelloWorld))
+    parser = ArgumentParserDisableAbbrev(
+        prog=PROG,
+        description=description,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        add_help=False,
+        # options of the command take precedence over general options with
+        # the same option string
+        conflict_handler='resolve')
+
+    class CommandHelpAction(HelpAction):
+        # the help of this command, without the list of all commands that
+        # datalad's help of a top-level parser includes
+        def _get_long_help(self, parser):
+            return parser.format_help()
+
+        def _get_short_help(self, parser):
+            return "{}\nUse '--help' to get more comprehensive " \
+                "information.".format(parser.format_usage())
+
+    # datalad's general options, like -f/--output-format. --cmd separates
+    # them from a command, there is none
+    for opt in (o for o in common_args if o != 'cmd'):
+        parser_add_common_opt(
+            parser, opt,
+            **(dict(action=CommandHelpAction) if opt == 'help' else {}))
+    setup_parser_for_interface(parser, HelloWorld)
+    # like 'datalad hello-cmd --version'
+    parser_add_version_opt(parser, 'datalad_helloworld', include_name=True)
+    defaults = dict(
+        func=partial(call_from_parser, HelloWorld),
+        logger=logging.getLogger(HelloWorld.__module__),
+        subparser=parser)
+    if hasattr(HelloWorld, 'result_renderer_cmdline'):
+        defaults['result_renderer'] = HelloWorld.result_renderer_cmdline
+    parser.set_defaults(**defaults)
+    return parser
+
+
+def main(args=None):
+    """Entry point of ``datalad-hello``
+
+    Parameters
+    ----------
+    args : list of str, optional
+      Command line, including the program name, by default ``sys.argv``.
+    """
+    import datalad
+    from datalad.cli.main import _run
+    from datalad.support.entrypoints import load_extensions
+
+    args = sys.argv if args is None else args
+    lgr.log(5, 'Starting main(%r)', args)
+    # like datalad's main(), record that we came in via the command line
+    setattr(datalad, '__api', 'cmdline')
+    # load extensions requested by configuration
+    load_extensions()
+
+    cmdlineargs = setup_parser().parse_args(args[1:])
+
+    if cmdlineargs.cfg_overrides is not None:
+        from datalad.cli.helpers import parse_overrides_from_cmdline
+        datalad.cfg.overrides.update(
+            parse_overrides_from_cmdline(cmdlineargs))
+        datalad.cfg.reload(force=True)
+        load_extensions()
+
+    if 'datalad.runtime.librarymode' in datalad.cfg:
+        datalad.enable_librarymode()
+
+    if cmdlineargs.change_path is not None:
+        from datalad.utils import chpwd
+        for path in cmdlineargs.change_path:
+            chpwd(path)
+
+    # raises SystemExit with the exit code
+    _run(cmdlineargs)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,309 @@
+"""Columnar export of results
+
+Results can be written to a file in a columnar layout, for analysis with
+dataframe libraries. The format is determined by the file name extension:
+
+``.npz``
+  NumPy arrays in an (uncompressed) ZIP archive, requires numpy.
+``.parquet``
+  Apache Parquet, requires pyarrow.
+
+The 'action' and 'status' columns are categorical, i.e. they are stored as
+integer codes into the distinct values of a column. 'message' (rendered as a
+string), 'path', and 'refds' are stored as strings, as messages can be
+distinct for every result, e.g. when they name the line of a request.
+Missing values are stored as code -1 or an empty string in ``.npz`` files,
+and as nulls in ``.parquet`` files.
+
+Results are collected in row groups of a fixed number of rows, and every
+complete row group is written to the file, hence memory use does not grow
+with the number of results.
+
+`load_results()` memory-maps a written file.
+"""
+
+__docformat__ = 'restructuredtext'
+
+import logging
+import mmap
+import os.path as op
+import struct
+import zipfile
+
+lgr = logging.getLogger('datalad.helloworld.columnar')
+
+# columns that are stored as codes into their distinct values, which must
+# be few
+CATEGORICAL = ('action', 'status')
+# columns that are stored as strings
+TEXT = ('message', 'path', 'refds')
+COLUMNS = CATEGORICAL + TEXT
+
+# default number of rows in a row group
+ROW_GROUP_SIZE = 1 << 16
+
+
+def open_writer(path, row_group_size=ROW_GROUP_SIZE):
+    """Return a writer for a columnar results file
+
+    Parameters
+    ----------
+    path : str
+      File to write, the format is determined by the extension.
+    row_group_size : int, optional
+      Number of results in a row group.
+
+    Returns
+    -------
+    NpzWriter or ParquetWriter
+    """
+    ext = op.splitext(path)[1]
+    if ext not in _WRITERS:
+        raise ValueError(
+            'unsupported columnar format {!r}, must be one of {}'.format(
+                ext, ', '.join(sorted(_WRITERS))))
+    return _WRITERS[ext](path, row_group_size=row_group_size)
+
+
+def load_results(path):
+    """Memory-map a columnar results file
+
+    Returns
+    -------
+    ResultTable or pyarrow.Table
+      A ResultTable for an ``.npz`` file, a pyarrow table (with dictionary
+      encoded categorical columns) for a ``.parquet`` file.
+    """
+    ext = op.splitext(path)[1]
+    if ext == '.npz':
+        return ResultTable(path)
+    if ext == '.parquet':
+        pq = _import('pyarrow.parquet', 'pyarrow')
+        return pq.read_table(path, memory_map=True)
+    raise ValueError('unsupported columnar format {!r}'.format(ext))
+
+
+class _ColumnarWriter(object):
+    def __init__(self, path, row_group_size=ROW_GROUP_SIZE):
+        self.path = path
+        self._row_group_size = row_group_size
+        self._rows = {c: [] for c in COLUMNS}
+        # codes of the distinct values of categorical columns, by value
+        self._codes = {c: {} for c in CATEGORICAL}
+        self._nrows = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, res):
+        """Add a result to the file"""
+        for c in CATEGORICAL:
+            value = res.get(c)
+            if value is None:
+                code = -1
+            else:
+                codes = self._codes[c]
+                code = codes.get(value)
+                if code is None:
+                    code = codes[value] = len(codes)
+            self._rows[c].append(code)
+        for c in TEXT:
+            value = res.get(c)
+            if c == 'message':
+                value = _render_message(value)
+            self._rows[c].append(None if value is None else str(value))
+        self._nrows += 1
+        if self._nrows >= self._row_group_size:
+            self._flush()
+
+    def close(self):
+        """Write any remaining results, and complete the file"""
+        if self._nrows:
+            self._flush()
+        self._close()
+
+    def _flush(self):
+        self._write_row_group(self._rows)
+        for rows in self._rows.values():
+            rows.clear()
+        self._nrows = 0
+
+    def _get_categories(self, column):
+        # codes are assigned in insertion order
+        return list(self._codes[column])
+
+
+class NpzWriter(_ColumnarWriter):
+    """Writer of results to a ``.npz`` file
+
+    Every row group of a column is an array ``<column>/<n>.npy``, the
+    distinct values of categorical columns are ``categories/<column>.npy``.
+    Members are not compressed, such that they can be memory-mapped.
+    """
+
+    def __init__(self, path, row_group_size=ROW_GROUP_SIZE):
+        self._np = _import('numpy')
+        super().__init__(path, row_group_size=row_group_size)
+        self._zip = zipfile.ZipFile(
+            path, 'w', compression=zipfile.ZIP_STORED, allowZip64=True)
+        self._ngroups = 0
+
+    def _write_array(self, name, array):
+        with self._zip.open(name, 'w', force_zip64=True) as f:
+            self._np.lib.format.write_array(f, array, allow_pickle=False)
+
+    def _write_row_group(self, rows):
+        np = self._np
+        for c in CATEGORICAL:
+            self._write_array(
+                '{}/{:06d}.npy'.format(c, self._ngroups),
+                np.array(rows[c], dtype=np.int32))
+        for c in TEXT:
+            self._write_array(
+                '{}/{:06d}.npy'.format(c, self._ngroups),
+                np.array(['' if v is None else v for v in rows[c]],
+                         dtype=str))
+        self._ngroups += 1
+
+    def _close(self):
+        for c in CATEGORICAL:
+            self._write_array(
+                'categories/{}.npy'.format(c),
+                self._np.array(self._get_categories(c), dtype=str))
+        self._zip.close()
+
+
+class ParquetWriter(_ColumnarWriter):
+    """Writer of results to a ``.parquet`` file
+
+    Categorical columns are dictionary encoded.
+    """
+
+    def __init__(self, path, row_group_size=ROW_GROUP_SIZE):
+        self._pa = _import('pyarrow')
+        pq = _import('pyarrow.parquet', 'pyarrow')
+        super().__init__(path, row_group_size=row_group_size)
+        pa = self._pa
+        self._schema = pa.schema(
+            [(c, pa.dictionary(pa.int32(), pa.string())) for c in CATEGORICAL]
+            + [(c, pa.string()) for c in TEXT])
+        self._writer = pq.ParquetWriter(path, self._schema)
+
+    def _write_row_group(self, rows):
+        pa = self._pa
+        columns = []
+        for c in CATEGORICAL:
+            columns.append(pa.DictionaryArray.from_arrays(
+                # -1 is missing
+                pa.array([None if i < 0 else i for i in rows[c]],
+                         type=pa.int32()),
+                pa.array(self._get_categories(c), type=pa.string())))
+        for c in TEXT:
+            columns.append(pa.array(rows[c], type=pa.string()))
+        self._writer.write_table(
+            pa.Table.from_arrays(columns, schema=self._schema),
+            row_group_size=len(rows[COLUMNS[0]]))
+
+    def _close(self):
+        self._writer.close()
+
+
+_WRITERS = {
+    '.npz': NpzWriter,
+    '.parquet': ParquetWriter,
+}
+
+
+class ResultTable(object):
+    """Memory-mapped results in an ``.npz`` file
+
+    Parameters
+    ----------
+    path : str
+    """
+
+    def __init__(self, path):
+        self._np = _import('numpy')
+        with open(path, 'rb') as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        arrays = {}
+        with zipfile.ZipFile(path) as zf:
+            for info in zf.infolist():
+                arrays[info.filename[:-4]] = self._map_array(info)
+        self.categories = {
+            c: arrays.pop('categories/{}'.format(c)) for c in CATEGORICAL}
+        self.row_groups = [
+            {c: arrays['{}/{}'.format(c, name)] for c in COLUMNS}
+            for name in sorted(
+                k.split('/', 1)[1] for k in arrays
+                if k.startswith(COLUMNS[0] + '/'))]
+
+    def __len__(self):
+        return sum(len(g[COLUMNS[0]]) for g in self.row_groups)
+
+    def column(self, name):
+        """Return all rows of a column
+
+        Returns codes for categorical columns, see `categories` for their
+        values. Unlike the arrays in `row_groups`, the returned array is a
+        copy, unless there is a single row group.
+        """
+        groups = [g[name] for g in self.row_groups]
+        if len(groups) == 1:
+            return groups[0]
+        if not groups:
+            return self._np.array(
+                [], dtype=self._np.int32 if name in CATEGORICAL else str)
+        return self._np.concatenate(groups)
+
+    def decode(self, name):
+        """Return the values of a categorical column
+
+        Missing values are None.
+        """
+        np = self._np
+        categories = np.append(
+            self.categories[name].astype(object), None)
+        # -1 (missing) indexes the trailing None
+        return categories[self.column(name)]
+
+    def _map_array(self, info):
+        np = self._np
+        if info.compress_type != zipfile.ZIP_STORED:
+            raise ValueError(
+                'cannot memory-map compressed member {}'.format(
+                    info.filename))
+        # skip the local file header, its extra field can differ from the
+        # one in the central directory
+        namelen, extralen = struct.unpack_from(
+            '<2H', self._data, info.header_offset + 26)
+        self._data.seek(info.header_offset + 30 + namelen + extralen)
+        version = np.lib.format.read_magic(self._data)
+        if version == (1, 0):
+            header = np.lib.format.read_array_header_1_0(self._data)
+        else:
+            header = np.lib.format.read_array_header_2_0(self._data)
+        shape, fortran_order, dtype = header
+        return np.ndarray(
+            shape, dtype=dtype, buffer=self._data, offset=self._data.tell(),
+            order='F' if fortran_order else 'C')
+
+
+def _render_message(msg):
+    if msg is None:
+        return None
+    if isinstance(msg, tuple):
+        return msg[0] % msg[1:]
+    return str(msg)
+
+
+def _import(name, dist=None):
+    from importlib import import_module
+    try:
+        return import_module(name)
+    except ImportError as e:
+        raise RuntimeError(
+            'columnar export requires {}'.format(dist or name)) from e
@@ -0,0 +1,452 @@
+"""Warm worker daemon for command line calls
+
+Most of the wall-clock time of ``datalad hello-cmd`` is spent starting the
+interpreter, importing datalad and discovering extensions, not in the
+command itself. A daemon started with::
+
+    python -m datalad_helloworld.daemon serve
+
+has all of this done once, and serves command line calls over a Unix socket
+(`get_socket_path()`)::
+
+    python -m datalad_helloworld.daemon run hello-cmd --language de
+
+The client is thin, it imports neither datalad nor the command. It passes
+its standard streams, working directory and environment to the daemon, which
+forks a worker for every call. The worker runs the command line with the
+client's streams, hence output is streamed to the client as it is rendered,
+and the client exits with the exit code of the call. If no daemon is
+running, the client runs the command line in-process instead.
+
+Only ``hello-cmd`` calls are served, and only to the user that runs the
+daemon: the socket is in a private directory, and both the client and the
+daemon check the user of their peer. A daemon keeps the code it has
+imported, it must be restarted to pick up a new version of datalad or of
+this extension.
+
+The daemon needs Unix sockets that can pass file descriptors, and ``fork()``.
+On other platforms, like Windows, calls are always run in-process.
+"""
+
+__docformat__ = 'restructuredtext'
+
+import array
+import errno
+import json
+import logging
+import os
+import os.path as op
+import signal
+import socket
+import stat
+import struct
+import sys
+
+lgr = logging.getLogger('datalad.helloworld.daemon')
+
+# command line arguments that are served
+COMMAND = 'hello-cmd'
+
+# whether the platform supports the daemon
+SUPPORTED = hasattr(socket, 'AF_UNIX') and hasattr(socket, 'SCM_RIGHTS') \
+    and hasattr(os, 'fork')
+
+# limit of the size of a request, in bytes
+_MAX_REQUEST = 1 << 20
+
+
+def get_socket_path():
+    """Return the path of the daemon's socket
+
+    The ``DATALAD_HELLOWORLD_SOCKET`` environment variable, if set, or a path
+    in ``$XDG_RUNTIME_DIR``, or else in a directory of the temporary
+    directory that only the user can access (`get_private_dir()`).
+    """
+    path = os.environ.get('DATALAD_HELLOWORLD_SOCKET')
+    if path:
+        return path
+    rundir = os.environ.get('XDG_RUNTIME_DIR')
+    if rundir:
+        return op.join(rundir, 'datalad-helloworld.sock')
+    return op.join(get_private_dir(), 'daemon.sock')
+
+
+def get_private_dir():
+    """Return the path of the per-user directory for the daemon's socket
+
+    The directory is created by the daemon, and checked by the client,
+    see `check_private_dir()`.
+    """
+    import tempfile
+    return op.join(
+        tempfile.gettempdir(), 'datalad-helloworld-{}'.format(_get_user()))
+
+
+def check_private_dir(path, create=False):
+    """Make sure that only the user can access a directory
+
+    Parameters
+    ----------
+    path : str
+    create : bool, optional
+      Create the directory, if it does not exist.
+
+    Raises
+    ------
+    PermissionError
+      If the directory is a symlink, is not owned by the user, or others
+      have access to it.
+    """
+    if create:
+        try:
+            os.mkdir(path, 0o700)
+        except FileExistsError:
+            pass
+    # not following symlinks, another user could have created one
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() \
+            or st.st_mode & 0o077:
+        raise PermissionError(
+            errno.EPERM, 'not a private directory of the user', path)
+
+
+def connect(path=None):
+    """Return a socket connected to the daemon
+
+    The socket, and the process that listens on it, must belong to the user.
+
+    Raises
+    ------
+    OSError
+      If no daemon is running, or the platform does not support the daemon.
+    PermissionError
+      If the socket, or the process that listens on it, belongs to another
+      user.
+    """
+    if not SUPPORTED:
+        raise OSError(errno.ENOTSUP, 'not supported on this platform')
+    path = path or get_socket_path()
+    if op.dirname(path) == get_private_dir():
+        check_private_dir(op.dirname(path))
+    st = os.lstat(path)
+    if not stat.S_ISSOCK(st.st_mode) or st.st_uid != os.getuid():
+        raise PermissionError(
+            errno.EPERM, 'not a socket of the user', path)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+        _check_peer(sock)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def run(args, path=None):
+    """Run a datalad command line, by the daemon if one is running
+
+    Parameters
+    ----------
+    args : list of str
+      Command line arguments, without the program name, e.g.
+      ``['hello-cmd', '--language', 'de']``.
+    path : str, optional
+      Socket of the daemon, by default `get_socket_path()`.
+
+    Returns
+    -------
+    int
+      Exit code.
+    """
+    try:
+        sock = connect(path)
+    except PermissionError as e:
+        # the environment and streams of this process are not passed on
+        lgr.warning('Not using the daemon (%s), running in-process', e)
+        return _run_in_process(args)
+    except OSError as e:
+        lgr.debug('No daemon (%s), running in-process', e)
+        return _run_in_process(args)
+    with sock:
+        # the worker writes to the standard streams of this process
+        sys.stdout.flush()
+        sys.stderr.flush()
+        _send_request(
+            sock,
+            dict(args=args, cwd=os.getcwd(), env=dict(os.environ)),
+            fds=[0, 1, 2])
+        reader = sock.makefile('rb')
+        pid = _read_int(reader)
+        try:
+            status = _read_int(reader)
+        except KeyboardInterrupt:
+            # stop the worker, rather than leaving it to write to streams
+            # that are no longer read
+            if pid is not None:
+                os.kill(pid, signal.SIGINT)
+            raise
+    # a worker that died reports no exit code
+    return 1 if status is None else status
+
+
+def stop(path=None):
+    """Stop the daemon
+
+    Returns
+    -------
+    bool
+      False, if no daemon is running.
+    """
+    try:
+        sock = connect(path)
+    except OSError:
+        return False
+    with sock:
+        _send_request(sock, dict(command='stop'))
+        # wait for the daemon to receive the request
+        sock.makefile('rb').read()
+    return True
+
+
+def serve(path=None):
+    """Serve command line calls until the daemon is stopped
+
+    Parameters
+    ----------
+    path : str, optional
+      Socket to listen on, by default `get_socket_path()`.
+    """
+    import socketserver
+
+    if not SUPPORTED:
+        raise RuntimeError('the daemon is not supported on this platform')
+    path = path or get_socket_path()
+    if op.dirname(path) == get_private_dir():
+        check_private_dir(op.dirname(path), create=True)
+    try:
+        connect(path).close()
+    except PermissionError as e:
+        raise RuntimeError('cannot serve {}: {}'.format(path, e))
+    except OSError:
+        pass
+    else:
+        raise RuntimeError('a daemon is already serving {}'.format(path))
+    if op.lexists(path):
+        # left behind by a daemon that was killed
+        os.unlink(path)
+
+    parser = _preload()
+
+    class Server(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+        pass
+
+    class Handler(socketserver.BaseRequestHandler):
+        def handle(self):
+            # runs in the forked worker
+            try:
+                _check_peer(self.request)
+            except PermissionError as e:
+                lgr.warning('Refused a request: %s', e)
+                return
+            _handle_request(self.request, parser)
+
+    # the socket is only accessible to the user
+    umask = os.umask(0o177)
+    try:
+        server = Server(path, Handler)
+    finally:
+        os.umask(umask)
+    signal.signal(signal.SIGTERM, _terminate)
+    lgr.info('Serving %s calls on %s', COMMAND, path)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        os.unlink(path)
+
+
+def _preload():
+    # import everything that a command line call would import, and have
+    # extensions and interfaces discovered
+    from datalad.cli.parser import setup_parser
+
+    import datalad.api  # noqa: F401
+    import datalad.cli.main  # noqa: F401
+    import datalad_helloworld.hello_cmd  # noqa: F401
+
+    return setup_parser(['datalad', COMMAND])
+
+
+def _terminate(signum, frame):
+    raise SystemExit(0)
+
+
+def _get_user():
+    getuid = getattr(os, 'getuid', None)
+    if getuid is not None:
+        return getuid()
+    import getpass
+    return getpass.getuser()
+
+
+def _check_peer(sock):
+    """Make sure that the process at the other end of a socket is the user's
+
+    Where the user of the peer cannot be determined, only the permissions
+    of the socket and its directory protect it.
+    """
+    if not hasattr(socket, 'SO_PEERCRED'):
+        return
+    creds = struct.Struct('3i')
+    _, uid, _ = creds.unpack(
+        sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, creds.size))
+    if uid != os.getuid():
+        raise PermissionError(
+            errno.EPERM, 'peer belongs to another user (uid {})'.format(uid))
+
+
+def _get_command(args, parser):
+    """Return the command of a datalad command line, or None
+
+    The command is the first argument that is neither an option of datalad,
+    as defined by its `parser`, nor the value of one. None is also returned
+    for options with a variable number of values.
+    """
+    nargs = {}
+    for action in parser._actions:
+        for option in action.option_strings:
+            nargs[option] = action.nargs
+    args = iter(args)
+    for arg in args:
+        if arg == '--':
+            return next(args, None)
+        if not arg.startswith('-'):
+            return arg
+        if '=' in arg:
+            continue
+        n = nargs.get(arg, 0)
+        if n is None:
+            # the value of the option
+            next(args, None)
+        elif n != 0:
+            return None
+    return None
+
+
+def _handle_request(conn, parser):
+    """Serve a request in a worker"""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    request, fds = _recv_request(conn)
+    conn.sendall(b'%d\n' % os.getpid())
+    if request.get('command') == 'stop':
+        os.kill(os.getppid(), signal.SIGTERM)
+        return
+    # take over the standard streams, working directory and environment of
+    # the client
+    sys.stdout.flush()
+    sys.stderr.flush()
+    for target, fd in enumerate(fds[:3]):
+        os.dup2(fd, target)
+    for fd in fds:
+        os.close(fd)
+    os.chdir(request['cwd'])
+    os.environ.clear()
+    os.environ.update(request['env'])
+    args = request['args']
+    if _get_command(args, parser) == COMMAND:
+        import datalad
+        datalad.cfg.reload(force=True)
+        status = _run_in_process(args)
+    else:
+        sys.stderr.write(
+            'only {} calls are served, got: {}\n'.format(
+                COMMAND, ' '.join(args)))
+        status = 2
+    sys.stdout.flush()
+    sys.stderr.flush()
+    conn.sendall(b'%d\n' % status)
+
+
+def _run_in_process(args):
+    from datalad.cli.main import main
+    try:
+        main(['datalad'] + list(args))
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        sys.stderr.write('{}\n'.format(e.code))
+        return 1
+    return 0
+
+
+def _send_request(sock, request, fds=()):
+    data = json.dumps(request).encode('utf-8') + b'\n'
+    ancdata = [(socket.SOL_SOCKET, socket.SCM_RIGHTS,
+                array.array('i', fds))] if fds else []
+    # file descriptors are passed along with the first part of the request
+    sent = sock.sendmsg([data], ancdata)
+    sock.sendall(data[sent:])
+
+
+def _recv_request(sock):
+    fds = array.array('i')
+    data, ancdata, _, _ = sock.recvmsg(
+        1 << 16, socket.CMSG_SPACE(3 * fds.itemsize))
+    for level, type_, cdata in ancdata:
+        if level == socket.SOL_SOCKET and type_ == socket.SCM_RIGHTS:
+            fds.frombytes(
+                cdata[:len(cdata) - len(cdata) % fds.itemsize])
+    while not data.endswith(b'\n'):
+        chunk = sock.recv(1 << 16)
+        if not chunk or len(data) > _MAX_REQUEST:
+            raise ValueError('incomplete request')
+        data += chunk
+    return json.loads(data.decode('utf-8')), list(fds)
+
+
+def _read_int(reader):
+    line = reader.readline()
+    return int(line) if line else None
+
+
+def main(argv=None):
+    """Command line entry point of the daemon and its client"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog='python -m datalad_helloworld.daemon',
+        description='Warm worker daemon for {} calls'.format(COMMAND))
+    parser.add_argument(
+        '--socket', metavar='PATH',
+        help='socket of the daemon [Default: {}]'.format(get_socket_path()))
+    subparsers = parser.add_subparsers(dest='action')
+    subparsers.required = True
+    subparsers.add_parser('serve', help='run the daemon')
+    subparsers.add_parser('stop', help='stop the daemon')
+    subparsers.add_parser(
+        'run', usage='%(prog)s ARGS...',
+        help='run a datalad command line, like {} ..., by the daemon if one '
+        'is running, or else in-process'.format(COMMAND))
+    argv = sys.argv[1:] if argv is None else list(argv)
+    # any arguments after 'run' are datalad's
+    run_args = []
+    if 'run' in argv:
+        i = argv.index('run') + 1
+        argv, run_args = argv[:i], argv[i:]
+    args = parser.parse_args(argv)
+
+    if args.action == 'serve':
+        try:
+            serve(args.socket)
+        except RuntimeError as e:
+            parser.exit(1, '{}\n'.format(e))
+        return 0
+    if args.action == 'stop':
+        if not stop(args.socket):
+            parser.exit(1, 'no daemon is running\n')
+        return 0
+    return run(run_args, args.socket)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
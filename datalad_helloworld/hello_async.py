@@ -0,0 +1,157 @@
+"""Native asyncio API for the demo command
+
+:func:`hello_cmd_async` reports the same results as ``hello_cmd``, but is an
+async generator that can be consumed from an event loop without blocking it.
+Any work that involves git or the file system (resolving the dataset,
+discovering subdatasets, reading batch input) runs in the loop's default
+executor, while the results are assembled on the loop itself.
+"""
+
+__docformat__ = 'restructuredtext'
+
+import asyncio
+import logging
+import sys
+from os.path import (
+    abspath,
+    curdir,
+)
+
+from datalad_helloworld.hello_cmd import (
+    _get_paths,
+    _get_record,
+    _get_targets,
+    _parse_record,
+    _process,
+)
+
+lgr = logging.getLogger('datalad.helloworld.hello_async')
+
+# size hint (in bytes) for reading lines of batch input at once
+_READ_HINT = 1 << 16
+
+
+async def hello_cmd_async(language='en', input_file=None, dataset=None,
+                          recursive=False, recursion_limit=None,
+                          compact=False, limit=None):
+    """Say "hello", asynchronously
+
+    Results are yielded like with ``hello_cmd(..., return_type='generator',
+    result_renderer='disabled', on_failure='ignore')``, in path order.
+
+    Parameters
+    ----------
+    language, input_file, dataset, recursive, recursion_limit, compact
+      Like the parameters of ``hello_cmd``. Its other parameters are not
+      supported: there is no `jobs`, because blocking operations run in the
+      loop's executor (see `limit`), no `order` other than 'path', and no
+      result cache (`cache`).
+    limit : asyncio.Semaphore, optional
+      If given, this semaphore is held by every blocking operation while it
+      runs in the executor. Sharing a semaphore between invocations limits
+      the number of executor threads they occupy concurrently.
+
+    Notes
+    -----
+    Cancelling a consumer of this generator (or closing the generator)
+    takes effect immediately. A blocking operation that is already running
+    completes in the background, an input file is closed after that.
+    """
+    if dataset is not None or recursive:
+        ds, targets = await (await _submit(
+            limit, _get_targets, dataset, recursive, recursion_limit))
+        kwargs = dict(compact=compact, refds=ds.path)
+    else:
+        targets = None
+        kwargs = dict(compact=compact)
+        cwd = abspath(curdir)
+
+    if input_file is None:
+        records = _aiter_single(_get_record(language))
+    else:
+        records = _aiter_records(input_file, limit)
+    try:
+        async for record in records:
+            if targets is None:
+                yield _process(record, cwd, **kwargs)
+                continue
+            for path in _get_paths(record, targets):
+                yield _process(record, path, **kwargs)
+    finally:
+        await records.aclose()
+
+
+async def _aiter_single(record):
+    yield record
+
+
+async def _aiter_records(input_file, limit):
+    """Asynchronously yield the requests in a batch input file"""
+    f = None
+    if input_file == '-':
+        reading = await _submit(limit, _read, sys.stdin)
+    else:
+        # open and read the first lines in one go
+        reading = await _submit(limit, _open_and_read, input_file)
+    lineno = 0
+    try:
+        while True:
+            # shielded, such that a cancellation does not leave a thread
+            # behind that is still reading from a file that is closed below
+            f, lines, eof = await asyncio.shield(reading)
+            reading = None
+            for line in lines:
+                lineno += 1
+                record = _parse_record(lineno, line)
+                if record is not None:
+                    yield record
+            if eof:
+                break
+            reading = await _submit(limit, _read, f)
+    finally:
+        if reading is not None and not reading.done():
+            reading.add_done_callback(_close_when_read)
+        elif f is not None and f is not sys.stdin:
+            f.close()
+
+
+def _open_and_read(path):
+    return _read(open(path, encoding='utf-8'))
+
+
+def _read(f):
+    """Read lines from a file, returns the file, the lines, and EOF state"""
+    if f.seekable():
+        # a regular file, read many lines at once
+        lines = f.readlines(_READ_HINT)
+        return f, lines, sum(map(len, lines)) < _READ_HINT
+    # a pipe or terminal, report each line as soon as it arrives
+    line = f.readline()
+    return f, [line] if line else [], not line
+
+
+def _close_when_read(reading):
+    if reading.cancelled() or reading.exception() is not None:
+        return
+    f = reading.result()[0]
+    if f is not sys.stdin:
+        f.close()
+
+
+async def _submit(limit, func, *args):
+    """Submit `func` to the default executor, return its future
+
+    If given, `limit` is acquired before, and released once `func`
+    completed.
+    """
+    if limit is not None:
+        await limit.acquire()
+    try:
+        fut = asyncio.get_running_loop().run_in_executor(None, func, *args)
+    except BaseException:
+        if limit is not None:
+            limit.release()
+        raise
+    if limit is not None:
+        fut.add_done_callback(lambda _: limit.release())
+    return fut
@@ -2,21 +2,60 @@
 
 __docformat__ = 'restructuredtext'
 
+import json
+import sys
+import threading
+from functools import partial
+from operator import itemgetter
 from os.path import curdir
 from os.path import abspath
 
 from datalad.interface.base import Interface
-from datalad.interface.base import build_doc
 from datalad.support.param import Parameter
 from datalad.distribution.dataset import datasetmethod
+from datalad.distribution.dataset import EnsureDataset
+from datalad.distribution.dataset import require_dataset
+from datalad.interface.common_opts import recursion_flag
+from datalad.interface.common_opts import recursion_limit
 from datalad.interface.base import eval_results
+from datalad.interface.utils import generic_result_renderer
+from datalad.support.constraints import EnsureBool
 from datalad.support.constraints import EnsureChoice
+from datalad.support.constraints import EnsureInt
+from datalad.support.constraints import EnsureNone
+from datalad.support.constraints import EnsureStr
 
 from datalad.interface.results import get_status_dict
+from datalad.support.parallel import ProducerConsumer
+
+# like datalad's build_doc, but uses docstrings that are pre-rendered at
+# build time, as long as they are current
+from datalad_helloworld._docs import build_doc
+from datalad_helloworld.catalog import (
+    EnsureLanguage,
+    get_catalog,
+    negotiate_language,
+)
+from datalad_helloworld.messages import LazyMessage
+from datalad_helloworld.renderers import (
+    get_jsonl_writer,
+    ResultSummary,
+    get_result_summary,
+    pop_result_summary,
+    start_result_summary,
+)
+from datalad_helloworld.results import (
+    ResultRecord,
+    chunked,
+)
 
 import logging
 lgr = logging.getLogger('datalad.helloworld.hello_cmd')
 
+# number of requests per parallel job that are read ahead of the reported
+# results
+READ_AHEAD = 64
+
 
 # decoration auto-generates standard help
 @build_doc
@@ -36,10 +75,88 @@ class HelloWorld(Interface):
             # cmdline argument definitions, incl aliases
             args=("-l", "--language"),
             # documentation
-            doc="""language to say "hello" in""",
+            doc="""language to say "hello" in. Can be a priority list of
+            languages, like in an HTTP Accept-Language header, e.g.
+            'de-AT, de;q=0.8, en;q=0.5'""",
             # type checkers, constraint definition is automatically
             # added to the docstring
-            constraints=EnsureChoice('en', 'de')),
+            constraints=EnsureLanguage()),
+        input_file=Parameter(
+            args=("-i", "--input-file"),
+            metavar="PATH",
+            doc="""process a batch of requests read from this file, or from
+            stdin if '-' is given, instead of a single one. Each line is
+            either a language, or a JSON object with a 'language' and an
+            optional 'path' property, e.g. {"language": "de", "path": "sub"}.
+            One result is reported per request, and requests are processed
+            as they are read""",
+            constraints=EnsureStr() | EnsureNone()),
+        dataset=Parameter(
+            args=("-d", "--dataset"),
+            doc="""dataset to say "hello" to, instead of the current
+            directory. Each request without an explicit path is processed
+            for this dataset (and its subdatasets, if recursive)""",
+            constraints=EnsureDataset() | EnsureNone()),
+        recursive=recursion_flag,
+        recursion_limit=recursion_limit,
+        jobs=Parameter(
+            args=("-J", "--jobs"),
+            metavar="NJOBS",
+            doc="""how many datasets to process in parallel. "auto"
+            corresponds to the number defined by the
+            'datalad.runtime.max-jobs' configuration item""",
+            constraints=EnsureInt() | EnsureNone() | EnsureChoice('auto')),
+        order=Parameter(
+            args=("--order",),
+            doc="""order in which results are reported when processing
+            datasets: 'completion' reports each result as soon as it is
+            available, 'path' reports results sorted by dataset path,
+            regardless of the number of parallel jobs""",
+            constraints=EnsureChoice('completion', 'path')),
+        compact=Parameter(
+            # not exposed on the command line
+            args=tuple(),
+            doc="""report results as compact, read-only mappings instead of
+            dicts. This considerably reduces the memory footprint of
+            callers that keep many results""",
+            constraints=EnsureBool()),
+        jsonl=Parameter(
+            args=("--jsonl",),
+            action='store_true',
+            doc="""render results as JSON lines, like the 'json' result
+            renderer, but with a fast encoder (orjson, if installed) and
+            buffered output, for piping many results into other tools.
+            Output is written when the buffer is full, when a second has
+            passed since the last write, and when the command completes.
+            Applies to the 'tailored' result renderer, i.e. the default"""),
+        export=Parameter(
+            args=("--export",),
+            metavar="PATH",
+            doc="""also write all results to this file, in a columnar
+            layout for analysis with dataframe libraries. The format is
+            determined by the file name extension: '.npz' (NumPy arrays,
+            requires numpy) or '.parquet' (requires pyarrow). Results are
+            written in row groups as they are reported, and the file can
+            be loaded with datalad_helloworld.columnar.load_results()""",
+            constraints=EnsureStr() | EnsureNone()),
+        count_only=Parameter(
+            args=("--count-only",),
+            action='store_true',
+            doc="""only count the results by action and status, and keep a
+            few failed results as samples, rather than reporting every
+            result. A single result of type 'summary' is reported, with the
+            'counts' by action and status, the number of 'failures', and the
+            failed results kept as 'samples'. Its status is 'error' if any
+            result failed"""),
+        cache=Parameter(
+            args=("--cache",),
+            action='store_true',
+            doc="""reuse the results of an earlier call with the same
+            parameters on a dataset, as long as the dataset's HEAD points to
+            the same commit, and cache the results of this call otherwise.
+            Uncommitted changes, like installed subdatasets, are not
+            detected. Batches, and calls that are neither given a dataset
+            nor recursive, are not cached"""),
     )
 
     @staticmethod
@@ -49,28 +166,392 @@ class HelloWorld(Interface):
     @eval_results
     # signature must match parameter list above
     # additional generic arguments are added by decorators
-    def __call__(language='en'):
-        if language == 'en':
-            msg = 'Hello!'
-        elif language == 'de':
-            msg = 'Tachchen!'
+    def __call__(language='en', input_file=None, dataset=None,
+                 recursive=False, recursion_limit=None, jobs=None,
+                 order='path', compact=False, jsonl=False, export=None,
+                 count_only=False, cache=False):
+        if count_only:
+            # the counts are reported as a single result, rendered like any
+            # other one
+            pop_result_summary()
+            yield _count_results(
+                language=language, input_file=input_file, dataset=dataset,
+                recursive=recursive, recursion_limit=recursion_limit)
+            if jsonl:
+                get_jsonl_writer().flush()
+            return
+        # results are summarized as they are rendered by the custom result
+        # renderer, rather than from a list of all results at the end (which
+        # datalad would keep for a custom_result_summary_renderer)
+        if not jsonl:
+            start_result_summary()
         else:
-            msg = ("unknown language: '%s'", language)
+            # a summary would interfere with JSON lines on stdout
+            pop_result_summary()
+
+        # commands should be implemented as generators and should report any
+        # results by yielding status dictionaries. The implementation is
+        # also available without the result handling of eval_results
+        results = hello_cmd_raw(
+            language=language, input_file=input_file, dataset=dataset,
+            recursive=recursive, recursion_limit=recursion_limit,
+            jobs=jobs, order=order, compact=compact, cache=cache)
+        writer = None
+        try:
+            if export is None:
+                yield from results
+            else:
+                # imports numpy or pyarrow, only when needed
+                from datalad_helloworld.columnar import open_writer
+                writer = open_writer(export)
+                for res in results:
+                    writer.write(res)
+                    yield res
+        finally:
+            if writer is not None:
+                writer.close()
+            if jsonl:
+                # every result is rendered before the next one is requested,
+                # hence all results are rendered by now
+                get_jsonl_writer().flush()
+        summary = pop_result_summary()
+        if summary is not None and summary.counts:
+            # only results rendered by the custom result renderer are
+            # counted. With the 'generic' result renderer, datalad renders
+            # its own summary
+            summary.render()
+
+    @staticmethod
+    def custom_result_renderer(res, **kwargs):
+        # used with the 'tailored' result renderer
+        summary = get_result_summary()
+        if summary is not None:
+            summary.add(res)
+        if kwargs.get('jsonl'):
+            get_jsonl_writer().write(res)
+        elif res.get('type') == 'summary':
+            # reported with --count-only
+            ResultSummary.from_result(res).render()
+        else:
+            generic_result_renderer(res)
+
+
+def hello_cmd_raw(language='en', input_file=None, dataset=None,
+                  recursive=False, recursion_limit=None, jobs=None,
+                  order='path', compact=False, cache=False):
+    """Say "hello", without any result handling
+
+    This is a fast path for programmatic consumers of many results. It takes
+    the parameters of ``hello_cmd``, and returns an iterator over its
+    results as they are produced, bypassing ``eval_results``. That is, there
+    is no rendering, filtering, transformation, logging of results, or error
+    handling according to ``on_failure``: results with an 'error' status are
+    reported like any other result. Also, parameters are not validated.
+
+    With `cache`, the results for a dataset are taken from, or recorded in,
+    the result cache (see ``datalad_helloworld.resultcache``).
+    """
+    records = _get_records(language, input_file)
+
+    if dataset is None and not recursive:
+        # the current directory is determined once, rather than for every
+        # result
+        return map(partial(_process, path=abspath(curdir), compact=compact),
+                   records)
+
+    ds = _require_dataset(dataset)
+    # the results of an invalid request are not worth caching
+    if cache and input_file is None and 'error' not in records[0]:
+        from datalad_helloworld.resultcache import get_result_cache
+        result_cache = get_result_cache()
+        key = result_cache.make_key(
+            ds, language=language, recursive=recursive,
+            recursion_limit=recursion_limit, order=order, compact=compact)
+        if key is not None:
+            results = result_cache.get(key)
+            if results is not None:
+                return iter(results)
+            return result_cache.record(key, _process_targets(
+                records, ds, recursive, recursion_limit, jobs, order,
+                compact))
+    return _process_targets(
+        records, ds, recursive, recursion_limit, jobs, order, compact)
+
+
+def _process_targets(records, ds, recursive, recursion_limit, jobs, order,
+                     compact):
+    """Return an iterator over the results of requests for a dataset"""
+    ds, targets = _get_targets(
+        ds, recursive, recursion_limit, sort=order == 'path')
+    # requests are read ahead of the reported results only as far as it
+    # takes to keep all jobs busy, any number of them is processed with
+    # bounded memory
+    window = threading.Semaphore(
+        max(ProducerConsumer.get_effective_jobs(jobs), 1) * READ_AHEAD)
+    stopped = threading.Event()
+
+    def produce():
+        # items are numbered, such that results can be reported in the
+        # order in which they were produced
+        i = 0
+        for record in records:
+            for path in _get_paths(record, targets):
+                if not _wait_for_window(window, stopped):
+                    return
+                yield i, record, path
+                i += 1
+
+    def consume(item):
+        i, record, path = item
+        return i, _process(record, path, compact=compact, refds=ds.path)
+
+    results = ProducerConsumer(
+        produce(), consume,
+        jobs=jobs,
+        # items need not be hashable
+        producer_future_key=itemgetter(0))
+    if order == 'completion':
+        results = map(itemgetter(1), results)
+    else:
+        results = _iter_ordered(results)
+    return _iter_windowed(results, window, stopped)
+
+
+def _wait_for_window(window, stopped):
+    """Wait until another request can be read ahead
+
+    Returns False if the requests are not consumed anymore, i.e. the
+    iteration over the results ended, or the interpreter shuts down without
+    it being closed.
+    """
+    while not window.acquire(timeout=0.5):
+        if stopped.is_set() or not threading.main_thread().is_alive():
+            return False
+    return not stopped.is_set()
+
+
+def _iter_windowed(results, window, stopped):
+    """Yield results, and let the producer read ahead by one for each
+
+    Once the iteration ends, early or not, the producer is stopped.
+    """
+    try:
+        for res in results:
+            window.release()
+            yield res
+    finally:
+        stopped.set()
+        # wake up a producer that waits for the window
+        window.release()
+
+
+def hello_cmd_chunks(language='en', input_file=None, dataset=None,
+                     recursive=False, recursion_limit=None, jobs=None,
+                     order='path', compact=False, cache=False,
+                     chunk_size=1000):
+    """Say "hello", and report results in chunks
+
+    Like `hello_cmd_raw()`, but the returned iterator yields lists of up to
+    `chunk_size` results. A chunk is reported once it is full, or when there
+    are no more results. The helpers in ``datalad_helloworld.results``
+    flatten, filter, or render chunks.
+    """
+    return chunked(
+        hello_cmd_raw(
+            language=language, input_file=input_file, dataset=dataset,
+            recursive=recursive, recursion_limit=recursion_limit, jobs=jobs,
+            order=order, compact=compact, cache=cache),
+        chunk_size)
+
+
+def _get_records(language, input_file):
+    if input_file is None:
+        return [_get_record(language)]
+    # read requests one by one, to process a batch of any size with constant
+    # memory
+    return _read_records(input_file)
+
+
+def _get_record(language):
+    """Return the request for a language given as a parameter
 
-        # commands should be implemented as generators and should
-        # report any results by yielding status dictionaries
-        yield get_status_dict(
-            # an action label must be defined, the command name make a good
-            # default
+    Parameters are not validated in the Python API, hence anything but a
+    string is an invalid request.
+    """
+    if not isinstance(language, str):
+        return dict(error=LazyMessage("invalid language: %r", language))
+    return dict(language=language)
+
+
+def _count_results(language='en', input_file=None, dataset=None,
+                   recursive=False, recursion_limit=None):
+    """Count the results of `hello_cmd_raw()`, and return a summary result
+
+    Results are not created, except for the failed results that are kept as
+    samples.
+    """
+    summary = ResultSummary()
+    records = _get_records(language, input_file)
+    if dataset is None and not recursive:
+        path, ntargets, kwargs = abspath(curdir), 1, {}
+    else:
+        ds, targets = _get_targets(
+            dataset, recursive, recursion_limit, sort=False)
+        path, ntargets, kwargs = ds.path, len(targets), dict(refds=ds.path)
+    for record in records:
+        n = 1 if 'path' in record or 'error' in record else ntargets
+        if 'error' not in record and get_catalog(
+                negotiate_language(record['language'])) is not None:
+            summary.count('demo', 'ok', n)
+        else:
+            summary.count('demo', 'error', n,
+                          sample=partial(_process, record, path, **kwargs))
+    return summary.as_result(action='hello-cmd', path=path, **kwargs)
+
+
+def _require_dataset(dataset):
+    return require_dataset(
+        dataset, check_installed=True, purpose='say hello')
+
+
+def _get_targets(dataset, recursive, recursion_limit, sort=True):
+    """Return the dataset and the paths of all datasets to process
+
+    Unless `sort` is False, the paths are sorted.
+    """
+    ds = _require_dataset(dataset)
+    targets = [ds.path]
+    if recursive:
+        targets.extend(
+            sds['path'] for sds in ds.subdatasets(
+                state='present',
+                recursive=True,
+                recursion_limit=recursion_limit,
+                on_failure='ignore',
+                return_type='generator',
+                result_renderer='disabled')
+            if sds.get('status') == 'ok')
+    if sort:
+        targets.sort()
+    return ds, targets
+
+
+def _get_paths(record, targets):
+    """Return the paths to process a request for"""
+    if 'path' in record or 'error' in record:
+        # processed exactly once
+        return [None]
+    return targets
+
+
+def _process(record, path=None, compact=False, **kwargs):
+    """Return the result of a request
+
+    Parameters
+    ----------
+    record : dict
+      The request.
+    path : str, optional
+      The absolute path to process a request without a path for. Defaults
+      to the current directory.
+    """
+    if 'error' in record:
+        return (ResultRecord if compact else get_status_dict)(
             action='demo',
-            # most results will be about something associated with a dataset
-            # (component), reported paths MUST be absolute
             path=abspath(curdir),
-            # status labels are used to identify how a result will be reported
-            # and can be used for filtering
-            status='ok' if language in ('en', 'de') else 'error',
-            # arbitrary result message, can be a str or tuple. in the latter
-            # case string expansion with arguments is delayed until the
-            # message actually needs to be rendered (analog to exception
-            # messages)
-            message=msg)
+            status='error',
+            message=record['error'],
+            **kwargs)
+    if 'path' in record:
+        path = abspath(record['path'])
+    elif path is None:
+        path = abspath(curdir)
+    return _greet(record['language'], path, compact=compact, **kwargs)
+
+
+def _iter_ordered(results):
+    """Yield numbered results in order, as soon as their predecessors are in
+
+    Parameters
+    ----------
+    results : iterable
+      (number, result) tuples, numbered consecutively from zero, in any
+      order.
+    """
+    pending = {}
+    next_i = 0
+    for i, res in results:
+        pending[i] = res
+        while next_i in pending:
+            yield pending.pop(next_i)
+            next_i += 1
+
+
+def _greet(language, path, compact=False, **kwargs):
+    # messages are translated with the message catalog of the best
+    # matching language, any request and message is looked up only once
+    catalog = get_catalog(negotiate_language(language))
+    if catalog is not None:
+        msg = catalog.gettext('Hello!')
+    else:
+        msg = LazyMessage("unknown language: '%s'", language)
+
+    # compact records are read-only mappings that stand in for the dicts
+    # created by get_status_dict()
+    return (ResultRecord if compact else get_status_dict)(
+        # an action label must be defined, the command name make a good
+        # default
+        action='demo',
+        # most results will be about something associated with a dataset
+        # (component), reported paths MUST be absolute
+        path=path,
+        # status labels are used to identify how a result will be reported
+        # and can be used for filtering
+        status='ok' if catalog is not None else 'error',
+        # arbitrary result message, can be a str, a tuple, or a lazy
+        # message. in the latter cases string expansion with arguments is
+        # delayed until the message actually needs to be rendered (analog
+        # to exception messages)
+        message=msg,
+        **kwargs)
+
+
+def _read_records(input_file):
+    """Yield the requests in a batch input file, one at a time
+
+    Each line is either a plain language, or a JSON object with a
+    'language' and an optional 'path' property. Invalid lines yield a
+    record with an 'error' message.
+    """
+    f = sys.stdin if input_file == '-' else open(input_file, encoding='utf-8')
+    try:
+        for lineno, line in enumerate(f, 1):
+            record = _parse_record(lineno, line)
+            if record is not None:
+                yield record
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def _parse_record(lineno, line):
+    """Return the request in a line of a batch input file
+
+    Returns None for empty lines.
+    """
+    line = line.strip()
+    if not line:
+        return None
+    if not line.startswith('{'):
+        return dict(language=line)
+    try:
+        record = json.loads(line)
+    except ValueError as e:
+        return dict(error=LazyMessage(
+            "invalid JSON in line %i: %s", lineno, str(e)))
+    if not isinstance(record.get('language'), str) \
+            or not isinstance(record.get('path', ''), str) \
+            or set(record) - {'language', 'path'}:
+        return dict(error=LazyMessage(
+            "invalid record in line %i: %s", lineno, line))
+    return record
@@ -0,0 +1,263 @@
+"""HTTP API for the demo command
+
+An embeddable HTTP/1.1 server (stdlib only) that runs ``hello_cmd`` for
+requests to ``/hello-cmd``, with the parameters of the command given as
+query parameters of a GET request, or as a JSON object in the body of a
+POST request::
+
+    python -m datalad_helloworld.http_api --port 8080
+    curl 'http://127.0.0.1:8080/hello-cmd?language=de'
+
+Results are streamed as JSON lines (``application/x-ndjson``) in a chunked
+response, as they are produced (see `hello_cmd_raw()`), like with
+``--jsonl``. Connections are kept alive between requests. Requests are
+served by a fixed pool of worker threads, hence concurrency is bounded,
+and further connections wait for a worker.
+
+The server runs commands on behalf of any client that can connect to it,
+e.g. on any dataset that is accessible to the server process. By default,
+it only listens on the loopback interface. The number of threads of a
+request is not up to the client, but the default of the server process
+(``datalad.runtime.max-jobs``).
+"""
+
+__docformat__ = 'restructuredtext'
+
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from http.server import (
+    BaseHTTPRequestHandler,
+    HTTPServer,
+)
+from urllib.parse import (
+    parse_qsl,
+    urlsplit,
+)
+
+from datalad.support.constraints import EnsureBool
+
+from datalad_helloworld.hello_cmd import (
+    HelloWorld,
+    hello_cmd_raw,
+)
+from datalad_helloworld.renderers import JSONLinesWriter
+
+lgr = logging.getLogger('datalad.helloworld.http_api')
+
+# path of the command
+PATH = '/hello-cmd'
+# parameters of the command that can be given in a request
+PARAMETERS = ('language', 'dataset', 'recursive', 'recursion_limit', 'order',
+              'cache')
+# constraints of parameters that have none, because they are flags on the
+# command line
+_FLAG_CONSTRAINTS = {
+    'recursive': EnsureBool(),
+    'cache': EnsureBool(),
+}
+# default number of worker threads
+WORKERS = 8
+# seconds after which an idle connection is closed, such that it does not
+# hold a worker
+KEEPALIVE_TIMEOUT = 5.0
+# size of response chunks, in bytes
+CHUNK_SIZE = 1 << 16
+# interval after which results are sent, even if a chunk is not full, in
+# seconds
+FLUSH_INTERVAL = 0.1
+
+
+def make_server(host='127.0.0.1', port=0, workers=WORKERS):
+    """Return a server, ready to `serve_forever()`
+
+    Parameters
+    ----------
+    host : str, optional
+    port : int, optional
+      By default, a free port is chosen, see `server_address`.
+    workers : int, optional
+      Maximum number of requests that are served concurrently.
+
+    Returns
+    -------
+    HelloServer
+    """
+    return HelloServer((host, port), workers=workers)
+
+
+class HelloServer(HTTPServer):
+    """HTTP server that serves connections with a pool of worker threads"""
+
+    def __init__(self, server_address, workers=WORKERS):
+        super().__init__(server_address, HelloRequestHandler)
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='hello-http')
+
+    def process_request(self, request, client_address):
+        self._pool.submit(self._process_request, request, client_address)
+
+    def _process_request(self, request, client_address):
+        # like socketserver.ThreadingMixIn, but in a worker
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._pool.shutdown(wait=True)
+
+
+class HelloRequestHandler(BaseHTTPRequestHandler):
+    # keep-alive
+    protocol_version = 'HTTP/1.1'
+    server_version = 'datalad-helloworld'
+    timeout = KEEPALIVE_TIMEOUT
+    # headers and chunks are written separately, which must not wait for
+    # the acknowledgement of the previous write
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path != PATH:
+            self._send_error(404, 'not found: {}'.format(url.path))
+            return
+        self._run(dict(parse_qsl(url.query, keep_blank_values=True)))
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if url.path != PATH:
+            self._send_error(404, 'not found: {}'.format(url.path))
+            return
+        try:
+            params = json.loads(body.decode('utf-8')) if body else {}
+        except ValueError as e:
+            self._send_error(400, 'invalid JSON: {}'.format(e))
+            return
+        if not isinstance(params, dict):
+            self._send_error(400, 'parameters must be a JSON object')
+            return
+        self._run(params)
+
+    def _run(self, params):
+        try:
+            results = hello_cmd_raw(**get_kwargs(params))
+        except ValueError as e:
+            self._send_error(400, str(e))
+            return
+        except Exception as e:
+            lgr.debug('Failed to run %s with %r', PATH, params,
+                      exc_info=True)
+            self._send_error(500, str(e))
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        writer = JSONLinesWriter(
+            _ChunkedStream(self.wfile), buffer_size=CHUNK_SIZE,
+            flush_interval=FLUSH_INTERVAL)
+        try:
+            for res in results:
+                writer.write(res)
+            writer.flush()
+            # the last chunk
+            self.wfile.write(b'0\r\n\r\n')
+        except Exception as e:
+            # the status was sent already, an incomplete response tells the
+            # client about the failure
+            lgr.debug('Aborted response to %s: %s', self.path, e)
+            self.close_connection = True
+        finally:
+            if hasattr(results, 'close'):
+                results.close()
+
+    def _send_error(self, code, message):
+        body = json.dumps(dict(error=message)).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        lgr.debug('%s - %s', self.address_string(), format % args)
+
+
+class _ChunkedStream(object):
+    """Binary stream that writes HTTP chunks"""
+
+    def __init__(self, wfile):
+        self._wfile = wfile
+
+    def write(self, data):
+        self._wfile.write(b'%x\r\n%s\r\n' % (len(data), bytes(data)))
+
+    def flush(self):
+        pass
+
+
+def get_kwargs(params):
+    """Return the arguments of ``hello_cmd`` for the parameters of a request
+
+    Values are validated, and converted (e.g. from strings), by the
+    constraints of the command's parameters.
+
+    Raises
+    ------
+    ValueError
+      For unknown parameters, and invalid values.
+    """
+    unknown = set(params) - set(PARAMETERS)
+    if unknown:
+        raise ValueError('unknown parameters: {}'.format(
+            ', '.join(sorted(unknown))))
+    kwargs = {}
+    for name, value in params.items():
+        constraints = HelloWorld._params_[name].constraints \
+            or _FLAG_CONSTRAINTS.get(name)
+        try:
+            kwargs[name] = value if constraints is None \
+                else constraints(value)
+        except (ValueError, TypeError) as e:
+            raise ValueError('invalid {}: {}'.format(name, e)) from e
+    return kwargs
+
+
+def main(argv=None):
+    """Command line entry point of the server"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog='python -m datalad_helloworld.http_api',
+        description='Serve hello-cmd over HTTP')
+    parser.add_argument(
+        '--host', default='127.0.0.1',
+        help='address to listen on [Default: %(default)s]')
+    parser.add_argument(
+        '--port', type=int, default=8080,
+        help='port to listen on [Default: %(default)s]')
+    parser.add_argument(
+        '--workers', type=int, default=WORKERS,
+        help='maximum number of concurrent requests [Default: %(default)s]')
+    args = parser.parse_args(argv)
+
+    server = make_server(args.host, args.port, args.workers)
+    lgr.info('Serving %s on http://%s:%s', PATH, *server.server_address[:2])
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""Lazily expanded result messages
+
+Datalad expands ``(format, *args)`` tuple messages when a result is rendered,
+but the format string is never translated, and any consumer that needs a
+string (e.g. a JSON serializer) has to know about the convention. A
+:class:`LazyMessage` holds a format string, its arguments, and the language
+to translate it to, and is only translated and formatted when it is
+converted to a string, i.e., when a renderer emits it. Results that are
+filtered, suppressed, or only counted never pay for it.
+"""
+
+__docformat__ = 'restructuredtext'
+
+from datalad_helloworld.catalog import get_catalog
+
+
+class LazyMessage(object):
+    """Message that is translated and formatted on conversion to a string
+
+    Parameters
+    ----------
+    template : str
+      Format string for the ``%`` operator, in the source language.
+    *args
+      Arguments of the format string.
+    language : str, optional
+      Available language (see ``negotiate_language()``) to translate the
+      format string to. By default, the source language.
+    """
+
+    __slots__ = ('template', 'args', 'language')
+
+    def __init__(self, template, *args, language=None):
+        self.template = template
+        self.args = args
+        self.language = language
+
+    def __str__(self):
+        template = self.template
+        if self.language is not None:
+            catalog = get_catalog(self.language)
+            if catalog is not None:
+                template = catalog.gettext(template)
+        # like datalad's expansion of tuple messages
+        return template % self.args
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, ', '.join(
+            [repr(self.template)] + [repr(a) for a in self.args]
+            + ([] if self.language is None
+               else ['language={!r}'.format(self.language)])))
+
+    def __eq__(self, other):
+        if not isinstance(other, LazyMessage):
+            return NotImplemented
+        return (self.template, self.args, self.language) \
+            == (other.template, other.args, other.language)
+
+    def __hash__(self):
+        return hash((self.template, self.args, self.language))
+
+    def __reduce__(self):
+        return _make_message, (self.template, self.args, self.language)
+
+
+def _make_message(template, args, language):
+    return LazyMessage(template, *args, language=language)
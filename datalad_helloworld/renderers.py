@@ -0,0 +1,259 @@
+"""Result renderers for large volumes of results
+
+Datalad's JSON result renderer serializes every result with ``json.dumps()``
+and writes it with a separate UI call. :class:`JSONLinesWriter` serializes
+results with orjson, if it is installed, and collects the lines in a buffer,
+which is written to stdout as a whole.
+
+:class:`ResultSummary` aggregates results as they are rendered, with memory
+use that does not grow with the number of results.
+"""
+
+__docformat__ = 'restructuredtext'
+
+import atexit
+import json
+import logging
+import sys
+import time
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+lgr = logging.getLogger('datalad.helloworld.renderers')
+
+# default size of the output buffer, in bytes
+BUFFER_SIZE = 1 << 20
+# default interval after which buffered output is written, in seconds
+FLUSH_INTERVAL = 1.0
+# default number of failed results to keep as samples
+MAX_SAMPLES = 10
+
+_writer = None
+# summary of the results of the running command
+_summary = None
+
+
+def get_jsonl_writer():
+    """Return the writer of JSON lines to stdout
+
+    The writer is created on first use, and flushed at exit.
+    """
+    global _writer
+    if _writer is None:
+        _writer = JSONLinesWriter()
+        atexit.register(_writer.flush)
+    return _writer
+
+
+def encode_result(res):
+    """Return a result, serialized as a JSON line
+
+    Like with datalad's JSON result renderer, keys are sorted, and values
+    that cannot be serialized are represented by their string.
+
+    Returns
+    -------
+    bytes
+      Including the trailing newline.
+    """
+    if not isinstance(res, dict):
+        # e.g. compact result records
+        res = dict(res)
+    if orjson is not None:
+        return orjson.dumps(
+            res, default=str,
+            option=orjson.OPT_SORT_KEYS | orjson.OPT_APPEND_NEWLINE)
+    return (_encode_json(res) + '\n').encode('utf-8')
+
+
+_encode_json = json.JSONEncoder(sort_keys=True, default=str).encode
+
+
+class JSONLinesWriter(object):
+    """Buffered writer of results as JSON lines
+
+    Buffered output is written when the buffer exceeds its size, when a
+    result is written after more than `flush_interval` seconds since the last
+    write, or on `flush()`.
+
+    Parameters
+    ----------
+    stream : file-like, optional
+      Binary stream to write to. By default, the binary buffer of the
+      current ``sys.stdout``, or ``sys.stdout`` itself, if it is a text
+      stream without one (e.g. when output is captured).
+    buffer_size : int, optional
+      In bytes.
+    flush_interval : float, optional
+      In seconds.
+    """
+
+    def __init__(self, stream=None, buffer_size=BUFFER_SIZE,
+                 flush_interval=FLUSH_INTERVAL):
+        self._stream = stream
+        self._buffer_size = buffer_size
+        self._flush_interval = flush_interval
+        self._buffer = bytearray()
+        self._last_flush = time.monotonic()
+
+    def write(self, res):
+        """Serialize a result, and add it to the output"""
+        self._buffer += encode_result(res)
+        if len(self._buffer) >= self._buffer_size \
+                or time.monotonic() - self._last_flush >= self._flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Write any buffered output"""
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        stream = self._stream
+        if stream is None:
+            stream = getattr(sys.stdout, 'buffer', None)
+            # any output of the UI precedes the buffered output
+            sys.stdout.flush()
+        if stream is None:
+            sys.stdout.write(self._buffer.decode('utf-8'))
+            sys.stdout.flush()
+        else:
+            stream.write(self._buffer)
+            stream.flush()
+        self._buffer.clear()
+
+
+def start_result_summary(**kwargs):
+    """Start a new summary of results, and return it
+
+    Parameters are those of `ResultSummary`.
+    """
+    global _summary
+    _summary = ResultSummary(**kwargs)
+    return _summary
+
+
+def get_result_summary():
+    """Return the current summary of results, or None"""
+    return _summary
+
+
+def pop_result_summary():
+    """Return the current summary of results, or None, and end it"""
+    global _summary
+    summary, _summary = _summary, None
+    return summary
+
+
+class ResultSummary(object):
+    """Summary of results, aggregated as results are reported
+
+    Results are counted by action and status, and the first failed results
+    are kept as samples. Hence, memory use is bounded by the number of
+    distinct actions and statuses, and `max_samples`.
+
+    Parameters
+    ----------
+    max_samples : int, optional
+      Number of failed results to keep.
+    min_results : int, optional
+      The summary is only rendered when there are at least this many
+      results, or a failure.
+    """
+
+    def __init__(self, max_samples=MAX_SAMPLES, min_results=2):
+        # number of results, by (action, status)
+        self.counts = {}
+        self.samples = []
+        self.nfailures = 0
+        self._max_samples = max_samples
+        self._min_results = min_results
+        self._start = time.monotonic()
+
+    def add(self, res):
+        """Add a result"""
+        self.count(res.get('action'), res.get('status'), sample=res)
+
+    def count(self, action, status, n=1, sample=None):
+        """Count results without creating them
+
+        Parameters
+        ----------
+        action : str
+        status : str
+        n : int, optional
+          Number of results.
+        sample : dict or callable, optional
+          A failed result, or a function that returns one. It is only
+          called, if the sample is kept.
+        """
+        key = (action, status)
+        self.counts[key] = self.counts.get(key, 0) + n
+        if status in ('impossible', 'error'):
+            self.nfailures += n
+            if sample is not None and len(self.samples) < self._max_samples:
+                self.samples.append(sample() if callable(sample) else sample)
+
+    def as_result(self, **kwargs):
+        """Return the summary as a result
+
+        The result has the 'counts' of results by action and status, the
+        number of 'failures', the failed results kept as 'samples', and the
+        'duration' in seconds. Its status is 'error' if any result failed.
+        Any keyword arguments are added to the result.
+        """
+        from datalad.interface.results import get_status_dict
+
+        counts = {}
+        for (action, status), n in self.counts.items():
+            counts.setdefault(action, {})[status] = n
+        total = sum(self.counts.values())
+        return get_status_dict(
+            status='error' if self.nfailures else 'ok',
+            type='summary',
+            message=('%d of %d results failed', self.nfailures, total)
+            if self.nfailures else ('%d results', total),
+            counts=counts,
+            failures=self.nfailures,
+            samples=list(self.samples),
+            duration=time.monotonic() - self._start,
+            **kwargs)
+
+    @classmethod
+    def from_result(cls, res):
+        """Return the summary that `as_result()` returned a result of"""
+        summary = cls(max_samples=len(res['samples']), min_results=0)
+        for action, counts in res['counts'].items():
+            for status, n in counts.items():
+                summary.counts[(action, status)] = n
+        summary.nfailures = res['failures']
+        summary.samples = list(res['samples'])
+        summary._start = time.monotonic() - res['duration']
+        return summary
+
+    def render(self):
+        """Report the summary via the UI"""
+        from datalad.interface.utils import generic_result_renderer
+        from datalad.ui import ui
+
+        total = sum(self.counts.values())
+        if total < self._min_results and not self.nfailures:
+            return
+        actions = {}
+        for (action, status), n in sorted(
+                self.counts.items(), key=lambda i: tuple(map(str, i[0]))):
+            actions.setdefault(action, []).append(
+                '{}: {}'.format(status, n))
+        ui.message('action summary:\n  {}'.format('\n  '.join(
+            '{} ({})'.format(action, ', '.join(counts))
+            for action, counts in actions.items())))
+        if self.samples:
+            ui.message('failed results ({} of {}):'.format(
+                len(self.samples), self.nfailures))
+            for res in self.samples:
+                generic_result_renderer(res)
+        duration = time.monotonic() - self._start
+        ui.message('{} results in {:.1f} s ({:.0f} results/s)'.format(
+            total, duration, total / duration if duration else 0))
@@ -0,0 +1,292 @@
+"""Memoized results of ``hello_cmd``
+
+Saying "hello" to a dataset (and its subdatasets) yields the same results as
+long as the request, the dataset, and the state of the dataset are the same.
+With ``cache=True``, results are reused from an earlier call that matches a
+key made of the parameters of the call, the dataset path, the commit the
+dataset's HEAD points to, and the message catalog of the language.
+
+There are two tiers. An in-process LRU tier holds the results of the most
+recent calls, and the size-bounded ``results`` namespace of the extension's
+on-disk cache (see ``datalad_helloworld.cache``) shares results between
+processes. Least recently used entries are evicted from either tier once it
+is full.
+
+Uncommitted changes, e.g. a subdataset that was installed or removed since
+results were cached, are not part of the key. Entries of a dataset are
+dropped with `ResultCache.invalidate()`.
+
+On disk, results are stored as JSON, with lazy messages as
+``[template, args, language]``, never as pickles: the cache directory can
+be shared, and loading a pickle could run code that anyone with write
+access to the database put there.
+"""
+
+__docformat__ = 'restructuredtext'
+
+import hashlib
+import json
+import logging
+import os
+import os.path as op
+import threading
+from collections import OrderedDict
+
+from datalad_helloworld._gitreader import (
+    GitReader,
+    UnsupportedRepo,
+)
+from datalad_helloworld.cache import get_cache_manager
+from datalad_helloworld.catalog import (
+    get_catalog_path,
+    negotiate_language,
+)
+from datalad_helloworld.messages import LazyMessage
+from datalad_helloworld.results import ResultRecord
+
+lgr = logging.getLogger('datalad.helloworld.resultcache')
+
+# number of calls whose results are kept in memory
+MEMORY_ENTRIES = 128
+# namespace of the on-disk tier
+NAMESPACE = 'results'
+# version of the key and value format, entries of other versions are not
+# reused
+_FORMAT = 2
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    """Return the result cache of this process"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResultCache(get_cache_manager())
+        return _cache
+
+
+def get_dataset_state(ds):
+    """Return the commit that the HEAD of a dataset points to
+
+    Returns None if there is no commit yet.
+    """
+    try:
+        return GitReader(ds.path).resolve_ref('HEAD')
+    except (UnsupportedRepo, OSError, ValueError) as e:
+        lgr.debug('Cannot read HEAD of %s in-process: %s', ds.path, e)
+    return ds.repo.get_hexsha()
+
+
+class ResultCache(object):
+    """Two-tier cache of the results of ``hello_cmd`` calls
+
+    Parameters
+    ----------
+    manager : CacheManager or None
+      Manager of the on-disk tier. With None, results are only kept in
+      memory.
+    memory_entries : int, optional
+      Number of calls whose results are kept in memory.
+    """
+
+    def __init__(self, manager, memory_entries=MEMORY_ENTRIES):
+        self._memory = OrderedDict()
+        self._memory_entries = memory_entries
+        self._lock = threading.Lock()
+        self._manager = manager
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @property
+    def hits(self):
+        return self.memory_hits + self.disk_hits
+
+    def make_key(self, ds, language='en', recursive=False,
+                 recursion_limit=None, order='path', compact=False):
+        """Return the key of a call for a dataset
+
+        Returns None if the state of the dataset cannot be determined, the
+        results of such a call are not cached.
+        """
+        head = get_dataset_state(ds)
+        if head is None:
+            return None
+        # a catalog that is updated in place changes the messages
+        catalog_sig = None
+        negotiated = negotiate_language(language)
+        if negotiated is not None:
+            catalog = get_catalog_path(negotiated)
+            try:
+                st = os.stat(catalog)
+                catalog_sig = (catalog, st.st_mtime_ns, st.st_size)
+            except OSError:
+                pass
+        key = (_FORMAT, ds.path, head, language, catalog_sig, recursive,
+               recursion_limit, order, compact)
+        return _Key(
+            hashlib.sha1(repr(key).encode('utf-8')).hexdigest(), ds.path)
+
+    def get(self, key):
+        """Return the cached results for a key, or None
+
+        Every call returns new copies of the results, that can be modified.
+        """
+        with self._lock:
+            entry = self._memory.get(key.digest)
+            if entry is not None:
+                self._memory.move_to_end(key.digest)
+                self.memory_hits += 1
+                return _copy(entry[1])
+        results = self._load(key)
+        with self._lock:
+            if results is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, results)
+        return _copy(results)
+
+    def put(self, key, results):
+        """Cache the results for a key, in both tiers"""
+        results = tuple(results)
+        with self._lock:
+            self._remember(key, results)
+        if self._manager is None:
+            return
+        try:
+            value = _dumps(results)
+        except (TypeError, ValueError) as e:
+            lgr.debug('Cannot store results on disk: %s', e)
+            return
+        self._manager.put(NAMESPACE, key.digest, value, tag=key.path)
+
+    def record(self, key, results):
+        """Yield results, and cache them once they are all reported
+
+        Results are not cached if the iteration is stopped early, or fails.
+        """
+        reported = []
+        for res in results:
+            # a copy, as the consumer may modify the result
+            reported.append(dict(res) if isinstance(res, dict) else res)
+            yield res
+        self.put(key, reported)
+
+    def invalidate(self, path=None):
+        """Drop the cached results of a dataset, or of all datasets
+
+        Parameters
+        ----------
+        path : str, optional
+          Path of the dataset, as in a result's 'refds'. By default, all
+          results are dropped.
+        """
+        with self._lock:
+            if path is None:
+                self._memory.clear()
+            else:
+                path = op.abspath(path)
+                for digest in [d for d, (p, _) in self._memory.items()
+                               if p == path]:
+                    del self._memory[digest]
+        if self._manager is not None:
+            self._manager.delete(NAMESPACE, tag=path)
+
+    def stats(self):
+        """Return the counters and sizes of the cache
+
+        Counters are those of this process.
+
+        Returns
+        -------
+        dict
+          'hits' (of both tiers), 'memory_hits', 'disk_hits', 'misses',
+          'memory_entries', and, with an on-disk tier, 'disk_entries' and
+          'disk_size' (in bytes).
+        """
+        with self._lock:
+            stats = dict(
+                hits=self.hits,
+                memory_hits=self.memory_hits,
+                disk_hits=self.disk_hits,
+                misses=self.misses,
+                memory_entries=len(self._memory),
+            )
+        if self._manager is not None:
+            disk = self._manager.stats(NAMESPACE)[NAMESPACE]
+            stats.update(disk_entries=disk['entries'], disk_size=disk['size'])
+        return stats
+
+    def _load(self, key):
+        if self._manager is None:
+            return None
+        value = self._manager.get(NAMESPACE, key.digest)
+        if value is None:
+            return None
+        try:
+            return _loads(value)
+        except (ValueError, TypeError, KeyError) as e:
+            lgr.debug('Cannot load cached results: %s', e)
+            return None
+
+    def _remember(self, key, results):
+        # with the lock held
+        self._memory[key.digest] = (key.path, results)
+        self._memory.move_to_end(key.digest)
+        while len(self._memory) > self._memory_entries:
+            self._memory.popitem(last=False)
+
+
+class _Key(object):
+    __slots__ = ('digest', 'path')
+
+    def __init__(self, digest, path):
+        self.digest = digest
+        self.path = path
+
+    def __repr__(self):
+        return '_Key({!r}, {!r})'.format(self.digest, self.path)
+
+
+def _dumps(results):
+    """Serialize results as JSON
+
+    Results are dicts, or all of them are compact result records. Values are
+    JSON types, except for lazy messages.
+
+    Raises
+    ------
+    TypeError
+      If a value cannot be serialized.
+    """
+    compact = bool(results) and isinstance(results[0], ResultRecord)
+    return json.dumps(
+        dict(compact=compact, results=[dict(res) for res in results]),
+        default=_encode_message, ensure_ascii=False).encode('utf-8')
+
+
+def _encode_message(value):
+    if isinstance(value, LazyMessage):
+        return [value.template, value.args, value.language]
+    raise TypeError('cannot serialize {!r}'.format(value))
+
+
+def _loads(value):
+    """Return the results that `_dumps()` serialized"""
+    data = json.loads(value.decode('utf-8'))
+    results = []
+    for res in data['results']:
+        message = res.get('message')
+        if isinstance(message, list):
+            template, args, language = message
+            res['message'] = LazyMessage(
+                template, *args, language=language)
+        results.append(ResultRecord(**res) if data['compact'] else res)
+    return tuple(results)
+
+
+def _copy(results):
+    return [dict(res) if isinstance(res, dict) else res for res in results]
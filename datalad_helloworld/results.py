@@ -0,0 +1,189 @@
+"""Compact result records and result chunks
+
+Results are typically reported as dicts, as created by datalad's
+``get_status_dict()``. For consumers that keep many results in memory, the
+per-dict overhead dominates. A :class:`ResultRecord` holds the same
+information in a fixed set of slots, and behaves as a read-only mapping, such
+that it can be processed by ``eval_results``, result filters, and renderers
+like a dict.
+
+For consumers of many results, the per-result overhead of iteration
+dominates. Results can be reported in chunks (lists of results) instead,
+see `chunked()`. Chunks can be flattened for consumers of single results
+(`flatten()`), or filtered and rendered a chunk at a time
+(`filter_chunks()`, `render_chunks()`).
+"""
+
+__docformat__ = 'restructuredtext'
+
+import json
+import sys
+from collections.abc import Mapping
+from itertools import (
+    chain,
+    compress,
+    islice,
+)
+from operator import attrgetter
+
+
+class ResultRecord(Mapping):
+    """Read-only result mapping with a fixed set of keys
+
+    Keys with a value of ``None`` are absent, like with
+    ``get_status_dict()``. Action and status labels are interned, such that
+    all records share a single instance of each label.
+    """
+
+    # in the order in which get_status_dict() adds them
+    __slots__ = ('action', 'path', 'type', 'refds', 'status', 'message')
+
+    def __init__(self, action=None, path=None, type=None, refds=None,
+                 status=None, message=None):
+        setattr_ = object.__setattr__
+        setattr_(self, 'action',
+                 None if action is None else sys.intern(action))
+        setattr_(self, 'path', path)
+        setattr_(self, 'type', type)
+        setattr_(self, 'refds', refds)
+        setattr_(self, 'status',
+                 None if status is None else sys.intern(status))
+        setattr_(self, 'message', message)
+
+    # eval_results, filters and renderers query results a lot, hence the
+    # mapping methods avoid Python-level loops
+
+    def __getitem__(self, key):
+        if key in _KEYS:
+            value = getattr(self, key)
+            if value is not None:
+                return value
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        value = getattr(self, key) if key in _KEYS else None
+        return default if value is None else value
+
+    def __iter__(self):
+        return compress(
+            ResultRecord.__slots__,
+            [v is not None for v in _get_values(self)])
+
+    def __len__(self):
+        return len(ResultRecord.__slots__) - _get_values(self).count(None)
+
+    def __contains__(self, key):
+        return key in _KEYS and getattr(self, key) is not None
+
+    def __setattr__(self, name, value):
+        raise TypeError('{} is read-only'.format(type(self).__name__))
+
+    __delattr__ = __setattr__
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, dict(self))
+
+    def __reduce__(self):
+        return type(self), _get_values(self)
+
+    def pop(self, key, *default):
+        """Like ``dict.pop()``, but only for absent keys
+
+        ``eval_results`` pops a 'logger' from every result, which a compact
+        record never has.
+        """
+        if key in self:
+            raise TypeError('{} is read-only'.format(type(self).__name__))
+        if default:
+            return default[0]
+        raise KeyError(key)
+
+    def copy(self):
+        """Return the record as a (mutable) dict"""
+        return dict(self)
+
+
+_KEYS = frozenset(ResultRecord.__slots__)
+_get_values = attrgetter(*ResultRecord.__slots__)
+
+
+def chunked(results, size):
+    """Return an iterator over chunks of results
+
+    Parameters
+    ----------
+    results : iterable
+    size : int
+      Maximum number of results in a chunk. Only the last chunk can be
+      smaller.
+
+    Returns
+    -------
+    iterator
+      Lists of results.
+
+    Raises
+    ------
+    ValueError
+      If `size` is less than 1.
+    """
+    if size < 1:
+        raise ValueError(
+            'chunk size must be at least 1, not {}'.format(size))
+    results = iter(results)
+    return iter(lambda: list(islice(results, size)), [])
+
+
+def flatten(chunks):
+    """Return an iterator over the results in chunks"""
+    return chain.from_iterable(chunks)
+
+
+def filter_chunks(chunks, result_filter):
+    """Filter chunks of results
+
+    Parameters
+    ----------
+    chunks : iterable
+    result_filter : callable
+      Called with a result, like the `result_filter` of ``eval_results``.
+      Results for which it returns False are removed.
+
+    Yields
+    ------
+    list
+      Chunks with the remaining results, empty chunks are skipped.
+    """
+    for chunk in chunks:
+        chunk = list(filter(result_filter, chunk))
+        if chunk:
+            yield chunk
+
+
+def render_chunks(chunks, result_renderer='json'):
+    """Render chunks of results, and yield them
+
+    Every chunk is rendered by a single UI call.
+
+    Parameters
+    ----------
+    chunks : iterable
+    result_renderer : {'json', 'json_pp', 'disabled'}
+      Like the result renderers of ``eval_results``.
+    """
+    if result_renderer not in ('json', 'json_pp', 'disabled'):
+        raise ValueError(
+            'unsupported result renderer: {}'.format(result_renderer))
+    if result_renderer == 'disabled':
+        yield from chunks
+        return
+    from datalad.ui import ui
+    encode = json.JSONEncoder(
+        sort_keys=True,
+        indent=2 if result_renderer == 'json_pp' else None,
+        default=str).encode
+    for chunk in chunks:
+        ui.message('\n'.join(
+            encode({k: v for k, v in res.items() if k != 'logger'})
+            for res in chunk))
+        yield chunk
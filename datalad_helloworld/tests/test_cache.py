@@ -0,0 +1,135 @@
+import pytest
+
+from datalad.api import (
+    Dataset,
+    hello_cache,
+)
+from datalad.tests.utils_pytest import assert_result_count
+
+from datalad_helloworld import cache
+from datalad_helloworld.cache import (
+    NAMESPACES,
+    CacheManager,
+    get_namespaces,
+)
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    path = tmp_path / 'cache'
+    monkeypatch.setenv('DATALAD_HELLOWORLD_CACHE_DIR', str(path))
+    # no in-memory results from other tests
+    monkeypatch.setattr('datalad_helloworld.resultcache._cache', None)
+    return path
+
+
+def test_namespaces(tmp_path, monkeypatch):
+    namespaces = dict(
+        NAMESPACES,
+        results=NAMESPACES['results']._replace(size=10, ttl=60.))
+    manager = CacheManager(str(tmp_path), namespaces=namespaces)
+    assert manager.get('results', 'a') is None
+    manager.put('results', 'a', b'12345', tag='ds')
+    manager.put('results', 'b', b'12345')
+    manager.put('versions', 'a', b'version')
+    assert manager.get('results', 'a') == b'12345'
+    # beyond the limit, the least recently used entry is evicted
+    manager.put('results', 'c', b'12345')
+    assert manager.get('results', 'b') is None
+    # too large
+    manager.put('results', 'd', b'x' * 11)
+    assert manager.get('results', 'd') is None
+    # namespaces are independent
+    assert manager.get('versions', 'a') == b'version'
+    with pytest.raises(ValueError):
+        manager.get('unknown', 'a')
+
+    # reads are not written until the next write, or a flush
+    changes = manager._conn.total_changes
+    assert manager.get('results', 'c') == b'12345'
+    assert manager._conn.total_changes == changes
+    manager.flush()
+    assert manager._conn.total_changes > changes
+    # statistics are shared by all processes
+    stats = CacheManager(str(tmp_path), namespaces=namespaces).stats()
+    assert stats['results'] == dict(
+        entries=2, size=10, limit=10, ttl=60., hits=2, misses=3,
+        evictions=1)
+    assert stats['versions']['entries'] == 1
+
+    manager.delete('results', tag='ds')
+    assert manager.get('results', 'a') is None
+    assert manager.get('results', 'c') == b'12345'
+
+    # entries expire
+    now = cache.time.time()
+    monkeypatch.setattr(cache.time, 'time', lambda: now + 61)
+    assert manager.get('results', 'c') is None
+    assert manager.get('versions', 'a') == b'version'
+    assert manager.stats('results')['results']['entries'] == 0
+    assert manager.prune() == dict(results=(1, 5), versions=(0, 0))
+
+    manager.clear('versions')
+    assert manager.stats()['versions'] == dict(
+        entries=0, size=0, limit=NAMESPACES['versions'].size, ttl=None,
+        hits=0, misses=0, evictions=0)
+
+
+def test_legacy_files(tmp_path):
+    # files of the version cache before the database
+    legacy = tmp_path / 'version-0123.json'
+    legacy.write_text('{}')
+    other = tmp_path / 'other.json'
+    other.write_text('{}')
+    CacheManager(str(tmp_path)).stats()
+    assert not legacy.exists()
+    assert other.exists()
+    # left behind by another process
+    legacy.write_text('{}')
+    CacheManager(str(tmp_path)).prune()
+    assert not legacy.exists()
+
+
+def test_limits_from_environment(monkeypatch):
+    monkeypatch.setenv('DATALAD_HELLOWORLD_CACHE_RESULTS_SIZE', '1000')
+    monkeypatch.setenv('DATALAD_HELLOWORLD_CACHE_RESULTS_TTL', '0')
+    monkeypatch.setenv('DATALAD_HELLOWORLD_CACHE_VERSIONS_TTL', '60')
+    namespaces = get_namespaces()
+    assert namespaces['results'].size == 1000
+    assert namespaces['results'].ttl is None
+    assert namespaces['versions'].ttl == 60.
+
+
+def test_hello_cache(tmp_path, cache_dir, monkeypatch):
+    ds = Dataset(tmp_path / 'ds').create(annex=False)
+    ds.create('sub', annex=False)
+
+    res = hello_cache(result_renderer='disabled')
+    assert_result_count(res, 2, status='ok', action='hello-cache')
+    assert res[0]['path'] == str(cache_dir / 'cache.sqlite')
+    assert_result_count(res, 1, namespace='results', entries=0)
+
+    res = hello_cache('prime', namespace='results', dataset=ds,
+                      recursive=True, result_renderer='disabled')
+    assert_result_count(res, 1)
+    nlanguages = res[0]['entries']
+    assert nlanguages > 1
+    # results are cached on disk, like for another process
+    monkeypatch.setattr('datalad_helloworld.resultcache._cache', None)
+    res = ds.hello_cmd(recursive=True, language='de', cache=True,
+                       result_renderer='disabled')
+    assert_result_count(res, 2, message='Tachchen!')
+    assert hello_cache(namespace='results', result_renderer='disabled')[0][
+        'hits'] == 1
+    # nothing to prime without a dataset
+    assert_result_count(
+        hello_cache('prime', namespace='results', on_failure='ignore',
+                    result_renderer='disabled'),
+        1, status='notneeded')
+
+    res = hello_cache('prune', namespace='results', max_size=1,
+                      result_renderer='disabled')
+    assert_result_count(res, 1, entries=0, removed=nlanguages)
+
+    res = hello_cache('clear', result_renderer='disabled')
+    assert_result_count(res, 2, entries=0, hits=0, evictions=0)
@@ -0,0 +1,145 @@
+import gettext
+
+import pytest
+
+from datalad_helloworld import catalog
+from datalad_helloworld.catalog import (
+    Catalog,
+    EnsureLanguage,
+    compile_catalog,
+    get_catalog,
+    get_catalog_path,
+    get_languages,
+    negotiate_language,
+)
+
+PO = r'''# a comment
+msgid ""
+msgstr ""
+"Content-Type: text/plain; charset=UTF-8\n"
+
+msgid "Hello!"
+msgstr "Tachchen!"
+
+msgid "multi"
+"line"
+msgstr "mehr"
+"zeilig\n"
+
+#, fuzzy
+msgid "fuzzy"
+msgstr "unscharf"
+
+msgid "untranslated"
+msgstr ""
+
+msgid "quote \"me\""
+msgstr "zitier \"mich\" – ü"
+'''
+
+
+def test_compile_catalog(tmp_path):
+    po_path = tmp_path / 'test.po'
+    po_path.write_text(PO, encoding='utf-8')
+    mo_path = tmp_path / 'test.mo'
+    compile_catalog(str(po_path), str(mo_path))
+    cat = Catalog(str(mo_path))
+    # can be read by gettext, too
+    with mo_path.open('rb') as f:
+        ref = gettext.GNUTranslations(f)
+    for msg, expected in (('Hello!', 'Tachchen!'),
+                          ('multiline', 'mehrzeilig\n'),
+                          ('fuzzy', 'fuzzy'),
+                          ('untranslated', 'untranslated'),
+                          ('quote "me"', 'zitier "mich" – ü'),
+                          ('unknown', 'unknown')):
+        assert cat.gettext(msg) == expected
+        assert ref.gettext(msg) == expected
+        # memoized
+        assert cat.gettext(msg) == expected
+
+
+def test_catalog_lookup(tmp_path):
+    # enough messages for hash collisions
+    po_path = tmp_path / 'test.po'
+    po_path.write_text(''.join(
+        'msgid "m{0}"\nmsgstr "t{0}"\n\n'.format(i) for i in range(2000)))
+    mo_path = tmp_path / 'test.mo'
+    compile_catalog(str(po_path), str(mo_path))
+    cat = Catalog(str(mo_path))
+    assert all(cat._lookup('m{}'.format(i).encode()) == 't{}'.format(i)
+               for i in range(2000))
+    assert cat._lookup(b'm2000') is None
+    # catalogs without a hash table are supported, too
+    cat._hash_size = 0
+    assert cat._lookup(b'm1234') == 't1234'
+    assert cat._lookup(b'm2000') is None
+
+
+def test_catalogs_are_current(tmp_path):
+    # recompile with 'python setup.py build_catalogs'
+    for language in get_languages() - {catalog.SOURCE_LANGUAGE}:
+        mo_path = tmp_path / (language + '.mo')
+        compile_catalog(get_catalog_path(language, '.po'), str(mo_path))
+        with open(get_catalog_path(language), 'rb') as f:
+            assert mo_path.read_bytes() == f.read()
+
+
+def test_get_catalog(monkeypatch):
+    monkeypatch.setattr(catalog, '_catalogs', {})
+    assert {'en', 'de'} <= get_languages()
+    assert get_catalog('en').gettext('Hello!') == 'Hello!'
+    # catalogs are loaded on demand
+    assert 'de' not in catalog._catalogs
+    de = get_catalog('de')
+    assert de.gettext('Hello!') == 'Tachchen!'
+    assert get_catalog('de') is de
+    assert get_catalog('xx') is None
+    assert 'xx' not in catalog._catalogs
+
+
+@pytest.fixture
+def languages(monkeypatch):
+    def clear():
+        negotiate_language.cache_clear()
+        catalog._get_language_trie.cache_clear()
+    clear()
+    monkeypatch.setattr(catalog, 'get_languages', lambda: frozenset(
+        ('en', 'de', 'de_AT', 'pt_BR', 'pt_PT', 'zh_Hant_TW')))
+    yield
+    clear()
+
+
+def test_negotiate_language(languages):
+    for request, expected in (
+            ('de', 'de'),
+            ('DE-at', 'de_AT'),
+            ('de-CH', 'de'),
+            ('de-AT-1996', 'de_AT'),
+            # more specific languages match, too
+            ('pt', 'pt_BR'),
+            ('zh', 'zh_Hant_TW'),
+            ('zh-Hant', 'zh_Hant_TW'),
+            ('pt_PT', 'pt_PT'),
+            ('fr, de-AT, de;q=0.8, en;q=0.5', 'de_AT'),
+            ('en;q=0.5, de;q=0.8', 'de'),
+            ('fr;q=1, en;q=0.1', 'en'),
+            # order of equal qualities is preserved
+            ('en;q=0.5, de;q=0.5', 'en'),
+            ('de;q=0, en;q=0.1', 'en'),
+            ('fr, *;q=0.1', 'en'),
+            ('de;q=x, de;foo=1, , en', 'en'),
+            ('fr', None),
+            ('', None),
+            ('de;q=0', None)):
+        assert negotiate_language(request) == expected, request
+
+
+def test_ensure_language(languages):
+    c = EnsureLanguage()
+    assert c('de') == 'de'
+    assert c('fr, de-AT;q=0.5') == 'fr, de-AT;q=0.5'
+    with pytest.raises(ValueError):
+        c('xx')
+    with pytest.raises(ValueError):
+        c('fr, de;q=0')
@@ -0,0 +1,43 @@
+import subprocess
+import sys
+
+from datalad_helloworld.cli import setup_parser
+from datalad_helloworld.tests.utils import get_datalad_cmd
+
+
+def run(cmd, *args, **kwargs):
+    return subprocess.run(
+        cmd + list(args), stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True, **kwargs)
+
+
+def test_parser():
+    args = setup_parser().parse_args(
+        ['-l', 'de', '--log-level', 'debug', '-f', 'json', '-r'])
+    # the option of the command takes precedence
+    assert args.language == 'de'
+    assert args.common_result_renderer == 'json'
+    assert args.recursive
+
+
+def test_like_datalad_hello_cmd(tmp_path):
+    input_file = tmp_path / 'input'
+    input_file.write_text('en\nde\nfr\n')
+    hello = [sys.executable, '-m', 'datalad_helloworld.cli']
+    # general options, and options of the command
+    for general, args in (
+            ([], ['--language', 'de']),
+            (['-f', 'json'], ['-i', str(input_file)]),
+            ([], ['-i', str(input_file), '--count-only']),
+            ([], ['--language', 'xx'])):
+        expected = run([get_datalad_cmd()] + general + ['hello-cmd'], *args,
+                       cwd=str(tmp_path))
+        res = run(hello + general, *args, cwd=str(tmp_path))
+        assert res.returncode == expected.returncode
+        if res.returncode != 2:
+            # the throughput in the result summary can differ
+            assert [line for line in res.stdout.splitlines()
+                    if 'results/s' not in line] == \
+                [line for line in expected.stdout.splitlines()
+                 if 'results/s' not in line]
+    assert run(hello, '--version').stdout.startswith('datalad_helloworld ')
@@ -0,0 +1,66 @@
+import pytest
+from datalad.api import hello_cmd
+
+from datalad_helloworld.columnar import (
+    load_results,
+    open_writer,
+)
+
+RESULTS = [
+    dict(action='demo', status='ok', path='/a', message='Hello!'),
+    dict(action='demo', status='error', path='/b', refds='/',
+         message=("unknown language: '%s'", 'fr')),
+    dict(action='other', status='ok', path='/c'),
+] * 3
+
+
+def _write(path):
+    with open_writer(str(path), row_group_size=4) as writer:
+        for res in RESULTS:
+            writer.write(res)
+
+
+def test_npz(tmp_path):
+    np = pytest.importorskip('numpy')
+    path = tmp_path / 'results.npz'
+    _write(path)
+    table = load_results(str(path))
+    assert len(table) == 9
+    assert [len(g['status']) for g in table.row_groups] == [4, 4, 1]
+    # memory-mapped, read-only
+    assert not table.row_groups[0]['path'].flags.writeable
+    assert list(table.categories['action']) == ['demo', 'other']
+    assert table.column('status').dtype == np.int32
+    assert list(table.decode('status')) == ['ok', 'error', 'ok'] * 3
+    assert list(table.column('message')) == \
+        ['Hello!', "unknown language: 'fr'", ''] * 3
+    assert list(table.column('path')) == ['/a', '/b', '/c'] * 3
+    assert list(table.column('refds')) == ['', '/', ''] * 3
+
+
+def test_parquet(tmp_path):
+    pytest.importorskip('pyarrow')
+    path = tmp_path / 'results.parquet'
+    _write(path)
+    table = load_results(str(path))
+    assert table.num_rows == 9
+    assert str(table.schema.field('status').type).startswith('dictionary')
+    assert str(table.schema.field('message').type) == 'string'
+    assert table.column('message').to_pylist() == \
+        ['Hello!', "unknown language: 'fr'", None] * 3
+    assert table.column('refds').to_pylist() == [None, '/', None] * 3
+
+
+def test_unsupported(tmp_path):
+    with pytest.raises(ValueError):
+        open_writer(str(tmp_path / 'results.csv'))
+
+
+def test_hello_cmd_export(tmp_path):
+    pytest.importorskip('numpy')
+    path = tmp_path / 'results.npz'
+    res = hello_cmd(language='de', export=str(path),
+                    result_renderer='disabled')
+    table = load_results(str(path))
+    assert len(table) == 1
+    assert list(table.column('message')) == [res[0]['message']]
@@ -0,0 +1,133 @@
+import json
+import os
+import os.path as op
+import subprocess
+import sys
+import time
+
+import pytest
+
+from datalad_helloworld import daemon
+from datalad_helloworld.daemon import (
+    SUPPORTED,
+    check_private_dir,
+    connect,
+    get_socket_path,
+)
+
+needs_daemon = pytest.mark.skipif(
+    not SUPPORTED, reason='daemon is not supported on this platform')
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return str(tmp_path / 'daemon.sock')
+
+
+def client(socket_path, *args, **kwargs):
+    return subprocess.run(
+        [sys.executable, '-m', 'datalad_helloworld.daemon',
+         '--socket', socket_path] + list(args),
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True, **kwargs)
+
+
+def test_fallback(tmp_path, socket_path):
+    # no daemon is running
+    res = client(socket_path, 'run', 'hello-cmd', '--language', 'de',
+                 cwd=str(tmp_path))
+    assert res.returncode == 0
+    assert 'demo(ok): {} [Tachchen!]'.format(tmp_path) in res.stdout
+    assert client(socket_path, 'stop').returncode == 1
+
+
+@needs_daemon
+def test_daemon(tmp_path, socket_path):
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'datalad_helloworld.daemon',
+         '--socket', socket_path, 'serve'],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                connect(socket_path).close()
+                break
+            except OSError:
+                assert server.poll() is None
+                assert time.monotonic() < deadline
+                time.sleep(0.1)
+
+        # working directory and standard streams are those of the client
+        res = client(socket_path, 'run', '-f', 'json', 'hello-cmd',
+                     '-i', '-', cwd=str(tmp_path), input='de\nfr\n')
+        assert res.returncode == 1
+        results = [json.loads(line) for line in res.stdout.splitlines()]
+        assert [(r['status'], r['path']) for r in results] == \
+            [('ok', str(tmp_path)), ('error', str(tmp_path))]
+
+        for args in (['wtf'], ['wtf', 'hello-cmd'],
+                     ['-c', 'x.y=hello-cmd', 'wtf']):
+            res = client(socket_path, 'run', *args)
+            assert res.returncode == 2
+            assert 'only hello-cmd calls are served' in res.stderr
+
+        assert client(socket_path, 'stop').returncode == 0
+        assert server.wait(timeout=60) == 0
+        assert not op.exists(socket_path)
+    finally:
+        if server.poll() is None:
+            server.kill()
+
+
+@needs_daemon
+def test_private_dir(tmp_path, monkeypatch):
+    monkeypatch.delenv('DATALAD_HELLOWORLD_SOCKET', raising=False)
+    monkeypatch.delenv('XDG_RUNTIME_DIR', raising=False)
+    monkeypatch.setattr('tempfile.tempdir', str(tmp_path))
+    path = get_socket_path()
+    rundir = op.dirname(path)
+    assert rundir == daemon.get_private_dir()
+    assert rundir.startswith(str(tmp_path))
+    check_private_dir(rundir, create=True)
+    assert os.stat(rundir).st_mode & 0o777 == 0o700
+    # no daemon
+    with pytest.raises(FileNotFoundError):
+        connect()
+    # not a socket
+    open(path, 'w').close()
+    with pytest.raises(PermissionError):
+        connect()
+    # others have access
+    os.chmod(rundir, 0o755)
+    with pytest.raises(PermissionError):
+        check_private_dir(rundir)
+    with pytest.raises(PermissionError):
+        connect()
+    os.unlink(path)
+    os.rmdir(rundir)
+    # a symlink to somebody else's directory
+    os.symlink(str(tmp_path), rundir)
+    with pytest.raises(PermissionError):
+        check_private_dir(rundir, create=True)
+
+
+def test_get_command():
+    parser = daemon._preload()
+    assert daemon._get_command(
+        ['-f', 'json', '-c', 'x.y=z', 'hello-cmd', '-i', '-'], parser) \
+        == 'hello-cmd'
+    assert daemon._get_command(['--output-format=json', 'hello-cmd'],
+                               parser) == 'hello-cmd'
+    assert daemon._get_command(['run', 'hello-cmd'], parser) == 'run'
+    assert daemon._get_command(['-C', 'hello-cmd', 'wtf'], parser) == 'wtf'
+    assert daemon._get_command([], parser) is None
+
+
+def test_client_is_thin():
+    out = subprocess.run(
+        [sys.executable, '-c',
+         'import json, sys; import datalad_helloworld.daemon; '
+         'print(json.dumps(sorted(sys.modules)))'],
+        check=True, stdout=subprocess.PIPE).stdout
+    assert 'datalad' not in json.loads(out)
@@ -0,0 +1,81 @@
+import runpy
+import subprocess
+import sys
+
+import pytest
+
+from datalad.interface.base import (
+    Interface,
+    eval_results,
+)
+from datalad.support.param import Parameter
+
+from datalad_helloworld import (
+    _docs,
+    _docstrings,
+    _manifest,
+)
+from datalad_helloworld.hello_cmd import HelloWorld
+
+# render the docstrings, like 'python setup.py build_docstrings' does
+WRITE_DOCSTRINGS = """
+import sys
+from datalad_helloworld._docs import write_docstrings
+write_docstrings(sys.argv[1])
+"""
+
+
+@pytest.fixture(scope='module')
+def docstrings(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('docs') / '_docstrings.py')
+    subprocess.run([sys.executable, '-c', WRITE_DOCSTRINGS, path],
+                   check=True)
+    return runpy.run_path(path)['DOCSTRINGS']
+
+
+def _make_interface():
+    class Demo(Interface):
+        """Demo command"""
+        _params_ = dict(
+            value=Parameter(args=('value',), doc='some value'))
+
+        @staticmethod
+        @eval_results
+        def __call__(value):
+            yield dict(action='demo', status='ok', path='/')
+    return Demo
+
+
+def test_rendered_docstrings(docstrings):
+    key, doc = docstrings['datalad_helloworld.hello_cmd.HelloWorld']
+    assert key == _docs.get_doc_key(HelloWorld)
+    # precomputed, or assembled on import, the docstring is the same
+    assert HelloWorld.__call__.__doc__ == doc
+    # the generic parameters are added like datalad's build_doc does
+    assert 'result_renderer' in HelloWorld._params_
+    assert 'datalad_helloworld.cache_cmd.HelloCache' in docstrings
+
+
+def test_doc_key():
+    modules = _manifest.get_source_modules(HelloWorld)
+    # the documentation of the constraint of the language is in the catalog
+    # module, and the generic parameters are documented by datalad
+    assert modules == ['datalad_helloworld.hello_cmd',
+                       'datalad_helloworld.catalog',
+                       'datalad.interface.common_opts']
+    assert _docs.get_doc_key(HelloWorld) == \
+        _manifest.get_source_hash(modules)
+    assert _manifest.get_source_hash(['datalad_helloworld.unknown']) is None
+
+
+def test_build_doc(monkeypatch):
+    name = '{}._make_interface.<locals>.Demo'.format(__name__)
+    key = _docs.get_doc_key(_make_interface())
+    monkeypatch.setitem(_docstrings.DOCSTRINGS, name, (key, 'precomputed'))
+    assert _docs.build_doc(_make_interface()).__call__.__doc__ \
+        == 'precomputed'
+    # an outdated docstring is not used
+    monkeypatch.setitem(_docstrings.DOCSTRINGS, name, ('outdated', 'old'))
+    doc = _docs.build_doc(_make_interface()).__call__.__doc__
+    assert doc.startswith('Demo command')
+    assert 'some value' in doc
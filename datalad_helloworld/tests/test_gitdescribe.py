@@ -0,0 +1,158 @@
+import os
+import random
+import subprocess
+
+import pytest
+
+from datalad_helloworld._gitdescribe import (
+    describe,
+    is_dirty,
+)
+from datalad_helloworld._gitreader import (
+    GitReader,
+    GitRunner,
+    UnsupportedRepo,
+)
+from datalad_helloworld._version import run_command
+
+# the pattern versioneer uses with an empty tag prefix
+MATCH = '[[:digit:]]*'
+DESCRIBE = ['describe', '--tags', '--dirty', '--always', '--long',
+            '--match', MATCH]
+
+
+def _git(repo, *args, **kwargs):
+    return subprocess.run(
+        ['git', '-c', 'user.name=Hello', '-c', 'user.email=hello@example.com']
+        + list(args),
+        cwd=str(repo), check=True, stdout=subprocess.PIPE,
+        universal_newlines=True, **kwargs).stdout
+
+
+def _make_synthetic_repo(path, ncommits, seed):
+    """Create a history with branches, merges, clock skew and many tags"""
+    rnd = random.Random(seed)
+    stream = []
+    heads = {0: None}
+    time = 1500000000
+    for mark in range(1, ncommits + 1):
+        branch = rnd.choice(list(heads))
+        if rnd.random() < 0.05 and len(heads) < 8:
+            # fork a new branch
+            branch = len(heads)
+            heads[branch] = heads[rnd.choice(list(heads))]
+        # mostly increasing commit dates, with some skew and identical dates
+        time += rnd.choice((0, 60, 3600, 86400, -7200))
+        stream.append(
+            'commit refs/heads/b{}\nmark :{}\n'
+            'committer C <c@example.com> {} +0100\n'
+            'data 2\nc\n'.format(branch, mark, time))
+        if heads[branch] is not None:
+            stream.append('from :{}\n'.format(heads[branch]))
+        others = [h for b, h in heads.items() if b != branch and h]
+        if others and rnd.random() < 0.1:
+            stream.append('merge :{}\n'.format(rnd.choice(others)))
+        stream.append('M 644 inline f{}\ndata 3\n{:02d}\n\n'.format(
+            branch, mark % 100))
+        heads[branch] = mark
+        if rnd.random() < 0.1:
+            # lightweight and annotated tags, matching the pattern or not,
+            # occasionally several on the same commit
+            for i in range(rnd.choice((1, 1, 1, 2, 3))):
+                name = '{}{}.{}'.format(
+                    rnd.choice(('', '', '', 'v')), mark, i)
+                if rnd.random() < 0.5:
+                    stream.append('reset refs/tags/{}\nfrom :{}\n\n'.format(
+                        name, mark))
+                else:
+                    stream.append(
+                        'tag {}\nfrom :{}\n'
+                        'tagger T <t@example.com> {} +0000\n'
+                        'data 2\nt\n'.format(
+                            name, mark, time + rnd.randint(-100, 100)))
+    _git(path, 'init', '-q')
+    _git(path, 'fast-import', '--quiet', input=''.join(stream))
+
+
+def _assert_describe_like_git(repo, nsamples, seed):
+    commits = _git(repo, 'rev-list', '--all').split()
+    samples = random.Random(seed).sample(commits, nsamples)
+    reader = GitReader(str(repo))
+    for match in (MATCH, None):
+        args = ['describe', '--tags', '--long', '--always']
+        if match:
+            args += ['--match', match]
+        expected = _git(repo, *(args + samples)).split()
+        assert [describe(reader, c, match=match) for c in samples] \
+            == expected
+
+
+@pytest.mark.parametrize('commit_graph', [False, True])
+def test_describe_conformance(tmp_path, commit_graph):
+    _make_synthetic_repo(tmp_path, 3000, seed=3000)
+    if commit_graph:
+        _git(tmp_path, 'commit-graph', 'write', '--reachable')
+    _assert_describe_like_git(tmp_path, 50, seed=1)
+
+
+def test_describe_conformance_long_abbrev(tmp_path):
+    # enough objects for git to abbreviate to 8 characters
+    _make_synthetic_repo(tmp_path, 6000, seed=6000)
+    _git(tmp_path, 'commit-graph', 'write', '--reachable')
+    _assert_describe_like_git(tmp_path, 20, seed=2)
+
+
+def test_generation_numbers(tmp_path):
+    _make_synthetic_repo(tmp_path, 300, seed=300)
+    tips = _git(tmp_path, 'for-each-ref', '--format=%(objectname)',
+                'refs/heads/').split()
+    graphless = GitReader(str(tmp_path))
+    _git(tmp_path, 'commit-graph', 'write', '--reachable')
+    graph = GitReader(str(tmp_path))
+    for tip in tips:
+        assert graph.get_generation(tip) == graphless.get_generation(tip)
+        for commit in _git(tmp_path, 'rev-list', '-n', '20', tip).split():
+            assert graph.is_ancestor(commit, tip)
+            assert graph.get_parents(commit) == \
+                graphless.get_parents(commit)
+
+
+def test_runner_describe(tmp_path):
+    _git(tmp_path, 'init', '-q')
+    for i in range(5):
+        (tmp_path / 'file{}'.format(i)).write_text(str(i))
+        _git(tmp_path, 'add', '.')
+        _git(tmp_path, 'commit', '-q', '-m', str(i))
+        if i == 2:
+            _git(tmp_path, 'tag', '-a', '-m', 'release', '1.0')
+    # backdate all files, such that no index entry is racily clean
+    for i in range(5):
+        os.utime(str(tmp_path / 'file{}'.format(i)), (1500000000,) * 2)
+    _git(tmp_path, 'update-index', '--refresh')
+
+    fallbacks = []
+
+    def fallback(*args, **kwargs):
+        fallbacks.append(args)
+        return run_command(*args, **kwargs)
+
+    def check():
+        assert GitRunner(fallback)(['git'], DESCRIBE, cwd=str(tmp_path)) \
+            == run_command(['git'], DESCRIBE, cwd=str(tmp_path))
+
+    check()
+    assert not fallbacks
+    assert not is_dirty(GitReader(str(tmp_path)), _git(
+        tmp_path, 'rev-parse', 'HEAD').strip())
+    # a deleted file is detected without git
+    (tmp_path / 'file0').unlink()
+    check()
+    assert not fallbacks
+    _git(tmp_path, 'checkout', 'file0')
+    # modified content requires git
+    (tmp_path / 'file1').write_text('modified')
+    with pytest.raises(UnsupportedRepo):
+        is_dirty(GitReader(str(tmp_path)), _git(
+            tmp_path, 'rev-parse', 'HEAD').strip())
+    check()
+    assert len(fallbacks) == 1
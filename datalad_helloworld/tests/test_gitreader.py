@@ -0,0 +1,109 @@
+import subprocess
+
+import pytest
+
+from datalad_helloworld._gitreader import (
+    GitReader,
+    GitRunner,
+    UnsupportedRepo,
+)
+from datalad_helloworld._version import run_command
+
+# the queries of versioneer's git_pieces_from_vcs() that are answered
+# in-process
+QUERIES = [
+    ['rev-parse', 'HEAD'],
+    ['rev-parse', '--abbrev-ref', 'HEAD'],
+    ['branch', '--contains'],
+    ['show', '-s', '--format=%ci', 'HEAD'],
+]
+
+
+def _git(repo, *args):
+    return subprocess.run(
+        ['git', '-c', 'user.name=Hello', '-c', 'user.email=hello@example.com']
+        + list(args),
+        cwd=str(repo), check=True, stdout=subprocess.PIPE,
+        universal_newlines=True).stdout
+
+
+def _make_repo(path):
+    _git(path, 'init', '-q', '-b', 'master')
+    for i in range(20):
+        (path / 'file').write_text('line\n' * (i + 100))
+        _git(path, 'add', 'file')
+        _git(path, 'commit', '-q', '-m', 'commit {}'.format(i),
+             '--date', '2020-01-{:02d}T10:00:00+0130'.format(i + 1))
+        if i == 5:
+            _git(path, 'tag', '-a', '-m', 'annotated', '1.0')
+        if i == 10:
+            _git(path, 'branch', 'side')
+    _git(path, 'checkout', '-q', 'side')
+    _git(path, 'commit', '-q', '--allow-empty', '-m', 'side')
+    _git(path, 'checkout', '-q', 'master')
+
+
+def _assert_same_as_git(repo):
+    fallbacks = []
+
+    def fallback(*args, **kwargs):
+        fallbacks.append(args)
+        return run_command(*args, **kwargs)
+
+    runner = GitRunner(fallback)
+    for args in QUERIES:
+        out, rc = runner(['git'], args, cwd=str(repo))
+        expected = run_command(['git'], args, cwd=str(repo))
+        if args == ['branch', '--contains']:
+            # versioneer does not look at the line for a detached HEAD
+            assert [l for l in out.splitlines() if '(' not in l] == \
+                [l for l in expected[0].splitlines() if '(' not in l]
+        else:
+            assert (out, rc) == expected
+    assert not fallbacks
+
+
+def test_runner_loose(tmp_path):
+    _make_repo(tmp_path)
+    _assert_same_as_git(tmp_path)
+    _git(tmp_path, 'checkout', '-q', 'HEAD~12')
+    _assert_same_as_git(tmp_path)
+
+
+def test_runner_packed(tmp_path):
+    _make_repo(tmp_path)
+    _git(tmp_path, 'gc', '-q', '--aggressive')
+    _git(tmp_path, 'checkout', '-q', '--detach', 'HEAD~3')
+    _assert_same_as_git(tmp_path)
+    reader = GitReader(str(tmp_path))
+    # packed annotated tags are peeled
+    assert list(reader.iter_refs('refs/tags/')) == [
+        ('refs/tags/1.0',
+         _git(tmp_path, 'rev-parse', '1.0').strip(),
+         _git(tmp_path, 'rev-parse', '1.0^{commit}').strip())]
+    assert reader.peel(_git(tmp_path, 'rev-parse', '1.0').strip()) == \
+        (_git(tmp_path, 'rev-parse', '1.0^{commit}').strip(), True)
+    assert len(list(reader.iter_history(reader.resolve_ref('HEAD')))) == 17
+
+
+def test_unsupported(tmp_path):
+    with pytest.raises(UnsupportedRepo):
+        GitReader(str(tmp_path))
+    repo = tmp_path / 'repo'
+    repo.mkdir()
+    _make_repo(repo)
+    _git(repo, 'worktree', 'add', '-q', str(tmp_path / 'wt'))
+    with pytest.raises(UnsupportedRepo):
+        GitReader(str(tmp_path / 'wt'))
+    # the runner falls back on git
+    fallbacks = []
+
+    def fallback(*args, **kwargs):
+        fallbacks.append(args)
+        return run_command(*args, **kwargs)
+
+    out, rc = GitRunner(fallback)(
+        ['git'], ['rev-parse', 'HEAD'], cwd=str(tmp_path / 'wt'))
+    assert rc == 0
+    assert out == _git(repo, 'rev-parse', 'HEAD').strip()
+    assert len(fallbacks) == 1
@@ -0,0 +1,83 @@
+import asyncio
+import io
+import os
+
+import pytest
+from datalad.api import (
+    Dataset,
+    hello_cmd,
+)
+
+from datalad_helloworld.hello_async import hello_cmd_async
+
+
+def _collect(**kwargs):
+    async def collect():
+        return [r async for r in hello_cmd_async(**kwargs)]
+    return asyncio.run(collect())
+
+
+def _strip(results):
+    return [(r['status'], r['path'], r['message']) for r in results]
+
+
+def test_like_hello_cmd(tmp_path):
+    input_file = tmp_path / 'input'
+    input_file.write_text('en\n\nde\n{"language": "de", "path": "sub"}\nfr\n'
+                          '{broken\n' + 'en\n' * 10000)
+    for kwargs in (dict(), dict(language='de'),
+                   dict(input_file=str(input_file))):
+        assert _strip(_collect(**kwargs)) == _strip(hello_cmd(
+            on_failure='ignore', result_renderer='disabled', **kwargs))
+
+
+def test_dataset(tmp_path):
+    ds = Dataset(tmp_path / 'ds').create(annex=False)
+    ds.create('sub', annex=False)
+    res = _collect(dataset=ds.path, recursive=True)
+    assert [r['path'] for r in res] == [ds.path, str(ds.pathobj / 'sub')]
+    assert all(r['refds'] == ds.path for r in res)
+
+
+def test_concurrency_limit(tmp_path):
+    ds = Dataset(tmp_path / 'ds').create(annex=False)
+    limit = None
+
+    async def one(language):
+        return [r['message'] async for r in hello_cmd_async(
+            language=language, dataset=ds.path, limit=limit)]
+
+    async def main():
+        nonlocal limit
+        limit = asyncio.Semaphore(2)
+        return await asyncio.gather(
+            *(one(('en', 'de')[i % 2]) for i in range(100)))
+
+    assert asyncio.run(main()) == [['Hello!'], ['Tachchen!']] * 50
+
+
+def test_cancellation(monkeypatch):
+    rfd, wfd = os.pipe()
+    monkeypatch.setattr('sys.stdin', io.open(rfd, encoding='utf-8'))
+
+    async def main():
+        messages = []
+
+        async def consume():
+            async for r in hello_cmd_async(input_file='-'):
+                messages.append(r['message'])
+
+        task = asyncio.ensure_future(consume())
+        os.write(wfd, b'en\n')
+        while not messages:
+            await asyncio.sleep(0.01)
+        # the loop stays responsive while no further input arrives
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # let the pending read in the executor complete
+        os.close(wfd)
+        return messages
+
+    assert asyncio.run(main()) == ['Hello!']
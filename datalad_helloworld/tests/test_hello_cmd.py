@@ -0,0 +1,146 @@
+import io
+import os.path as op
+import threading
+import time
+
+from datalad.api import (
+    Dataset,
+    hello_cmd,
+)
+from datalad.support.parallel import ProducerConsumer
+from datalad.tests.utils_pytest import assert_result_count
+
+from datalad_helloworld import hello_cmd as hello_cmd_mod
+from datalad_helloworld.hello_cmd import (
+    _iter_ordered,
+    _process_targets,
+    _read_records,
+    hello_cmd_raw,
+)
+
+
+def test_batch(tmp_path):
+    input_file = tmp_path / 'input'
+    input_file.write_text(
+        'en\n'
+        '\n'
+        '{"language": "de", "path": "sub"}\n'
+        'fr\n'
+        '{"language": 1}\n'
+        '{broken\n'
+        'fr, de-CH;q=0.9\n')
+    res = hello_cmd(input_file=str(input_file), on_failure='ignore',
+                    result_renderer='disabled')
+    assert len(res) == 6
+    assert [r['status'] for r in res] == \
+        ['ok', 'ok', 'error', 'error', 'error', 'ok']
+    assert res[0]['message'] == 'Hello!'
+    assert res[1]['message'] == 'Tachchen!'
+    assert res[1]['path'] == op.abspath('sub')
+    assert res[3]['message'].args[0] == 5
+    assert str(res[3]['message']) == \
+        'invalid record in line 5: {"language": 1}'
+    # priority lists are negotiated
+    assert res[5]['message'] == 'Tachchen!'
+
+
+def test_invalid_language(tmp_path):
+    ds = Dataset(tmp_path / 'ds').create(annex=False)
+    # not validated in the Python API
+    for language in (None, ['de']):
+        res = ds.hello_cmd(language=language, cache=True, on_failure='ignore',
+                           result_renderer='disabled')
+        assert_result_count(res, 1, status='error')
+        assert str(res[0]['message']) == \
+            'invalid language: {!r}'.format(language)
+    assert_result_count(
+        hello_cmd(language=None, count_only=True, on_failure='ignore',
+                  result_renderer='disabled'),
+        1, status='error', failures=1)
+
+
+def test_raw(tmp_path):
+    input_file = tmp_path / 'input'
+    input_file.write_text('en\nfr\n{"language": "de", "path": "sub"}\n')
+    res = hello_cmd_raw(input_file=str(input_file))
+    assert not isinstance(res, list)
+    # same results, errors included, but no exception
+    assert list(res) == hello_cmd(
+        input_file=str(input_file), on_failure='ignore',
+        result_renderer='disabled')
+
+
+def test_batch_stdin(monkeypatch):
+    monkeypatch.setattr('sys.stdin', io.StringIO('de\n' * 1000))
+    assert_result_count(
+        hello_cmd(input_file='-', result_renderer='disabled'),
+        1000, status='ok', message='Tachchen!')
+
+
+def test_read_records_is_lazy(tmp_path):
+    input_file = tmp_path / 'input'
+    input_file.write_text('en\nde\n')
+    # records are produced one at a time, as lines are read
+    records = _read_records(str(input_file))
+    assert next(records) == dict(language='en')
+    assert list(records) == [dict(language='de')]
+
+
+def test_recursive(tmp_path):
+    ds = Dataset(tmp_path / 'ds').create(annex=False)
+    for sub in ('c', 'a', 'b'):
+        ds.create(sub, annex=False)
+    Dataset(ds.pathobj / 'a').create('n', annex=False)
+    ds.save(recursive=True)
+    expected = [str(ds.pathobj / p) for p in ('', 'a', 'a/n', 'b', 'c')]
+    expected[0] = ds.path
+    for jobs in (0, 4):
+        res = ds.hello_cmd(recursive=True, jobs=jobs,
+                           result_renderer='disabled')
+        assert [r['path'] for r in res] == expected
+        assert_result_count(res, 5, status='ok', refds=ds.path)
+    res = ds.hello_cmd(recursive=True, recursion_limit=1, jobs=4,
+                       order='completion', result_renderer='disabled')
+    assert sorted(r['path'] for r in res) == \
+        [p for p in expected if not p.endswith('n')]
+    # not recursive, just the dataset
+    assert_result_count(
+        hello_cmd(dataset=ds.path, result_renderer='disabled'),
+        1, path=ds.path)
+
+
+def test_iter_ordered():
+    assert list(_iter_ordered(
+        [(2, 'c'), (0, 'a'), (3, 'd'), (1, 'b')])) == ['a', 'b', 'c', 'd']
+
+
+def test_read_ahead(tmp_path, monkeypatch):
+    monkeypatch.setattr(hello_cmd_mod, 'READ_AHEAD', 3)
+    ds = Dataset(tmp_path / 'ds').create(annex=False)
+    nread = []
+
+    def records():
+        for i in range(1000):
+            nread.append(i)
+            yield dict(language='de')
+
+    # the default number of jobs runs the producer in a thread, too
+    for jobs, order in ((2, 'path'), (2, 'completion'), (None, 'path')):
+        del nread[:]
+        results = _process_targets(
+            records(), ds, False, None, jobs, order, False)
+        try:
+            assert next(results)['message'] == 'Tachchen!'
+            time.sleep(0.2)
+            # the window of 3 requests per job, the reported one, and the
+            # one that waits for the window
+            njobs = ProducerConsumer.get_effective_jobs(jobs)
+            assert len(nread) <= njobs * 3 + 2
+        finally:
+            results.close()
+        # the producer is stopped, and does not read any further
+        for t in threading.enumerate():
+            if t is not threading.current_thread() and not t.daemon:
+                t.join(5)
+                assert not t.is_alive()
+        assert len(nread) <= njobs * 3 + 2
@@ -0,0 +1,80 @@
+import http.client
+import json
+import threading
+
+import pytest
+from datalad.api import Dataset
+
+from datalad_helloworld.http_api import make_server
+
+
+@pytest.fixture
+def server():
+    server = make_server(workers=1)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def connect(server):
+    return http.client.HTTPConnection(*server.server_address, timeout=60)
+
+
+def request(conn, method, path, params=None):
+    conn.request(method, path,
+                 body=None if params is None else json.dumps(params))
+    response = conn.getresponse()
+    return response, response.read()
+
+
+def test_requests(server, tmp_path):
+    ds = Dataset(tmp_path / 'ds').create(annex=False)
+    ds.create('sub', annex=False)
+
+    conn = connect(server)
+    # several requests on a single connection
+    response, body = request(conn, 'GET', '/hello-cmd?language=de')
+    assert response.status == 200
+    assert response.getheader('Transfer-Encoding') == 'chunked'
+    assert response.getheader('Content-Type') == 'application/x-ndjson'
+    assert json.loads(body)['message'] == 'Tachchen!'
+
+    response, body = request(conn, 'POST', '/hello-cmd', dict(
+        language='de', dataset=ds.path, recursive=True))
+    assert response.status == 200
+    results = [json.loads(line) for line in body.splitlines()]
+    assert [(r['status'], r['path']) for r in results] == \
+        [('ok', ds.path), ('ok', str(ds.pathobj / 'sub'))]
+
+    for method, path, params, status in (
+            ('GET', '/hello-cmd?language=xx', None, 400),
+            ('GET', '/hello-cmd?input_file=x', None, 400),
+            ('GET', '/hello-cmd?jobs=1000', None, 400),
+            ('POST', '/hello-cmd', [], 400),
+            ('GET', '/other', None, 404)):
+        response, body = request(conn, method, path, params)
+        assert response.status == status
+        assert 'error' in json.loads(body)
+    conn.close()
+
+
+def test_concurrency_is_bounded(server):
+    first = connect(server)
+    request(first, 'GET', '/hello-cmd')
+    # the only worker serves the first connection, as long as it is open
+    second = connect(server)
+    second.timeout = 0.5
+    second.connect()
+    second.request('GET', '/hello-cmd')
+    with pytest.raises(OSError):
+        second.getresponse()
+    second.close()
+
+    third = connect(server)
+    first.close()
+    response, _ = request(third, 'GET', '/hello-cmd')
+    assert response.status == 200
+    third.close()
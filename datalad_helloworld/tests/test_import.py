@@ -0,0 +1,80 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from datalad_helloworld.tests.utils import (
+    LOAD_COMMAND_SUITE,
+    get_import_times,
+)
+
+# budgets for the cumulative import time of modules in milliseconds, checked
+# only if DATALAD_HELLOWORLD_TESTS_TIMING is set, because wall-clock times
+# depend on the machine and its load. They can be adjusted via
+# DATALAD_HELLOWORLD_TESTS_IMPORT_BUDGETS, e.g.
+# 'datalad_helloworld=5,datalad_helloworld.hello_cmd=300'
+IMPORT_BUDGETS = {
+    'datalad_helloworld': 25,
+    'datalad_helloworld.hello_cmd': 1000,
+}
+
+
+
+def test_entrypoint_load_is_lightweight():
+    # report the modules imported in the process
+    out = subprocess.run(
+        [sys.executable, '-c', LOAD_COMMAND_SUITE + """
+import json
+import sys
+assert suite[1][0][2] == 'hello-cmd'
+print(json.dumps(sorted(sys.modules)))
+"""],
+        check=True, stdout=subprocess.PIPE).stdout
+    modules = json.loads(out)
+    assert 'datalad_helloworld' in modules
+    assert 'datalad_helloworld._version' not in modules
+    assert 'subprocess' not in modules
+
+
+def test_lazy_version():
+    import datalad_helloworld
+    from datalad_helloworld._versioncache import get_versions
+    assert datalad_helloworld.__version__ == get_versions()['version']
+    assert 'datalad_helloworld._version' in sys.modules
+
+
+def test_import_is_lightweight():
+    out = subprocess.run(
+        [sys.executable, '-c',
+         'import json, sys; import datalad_helloworld; '
+         'print(json.dumps(sorted(sys.modules)))'],
+        check=True, stdout=subprocess.PIPE).stdout
+    modules = json.loads(out)
+    for heavy in ('subprocess', 'datalad', 'datalad_helloworld._version',
+                  'datalad_helloworld._gitreader'):
+        assert heavy not in modules
+
+
+def _get_import_budgets():
+    budgets = dict(IMPORT_BUDGETS)
+    spec = os.environ.get('DATALAD_HELLOWORLD_TESTS_IMPORT_BUDGETS')
+    if spec:
+        for item in spec.split(','):
+            module, budget = item.split('=')
+            budgets[module.strip()] = float(budget)
+    return budgets
+
+
+@pytest.mark.skipif(
+    not os.environ.get('DATALAD_HELLOWORLD_TESTS_TIMING'),
+    reason='set DATALAD_HELLOWORLD_TESTS_TIMING to check timings')
+def test_import_budgets():
+    for module, budget in _get_import_budgets().items():
+        # best of three to be robust against noise
+        cumulative = min(
+            get_import_times(module)[module][1] for _ in range(3)) / 1000.
+        assert cumulative <= budget, \
+            'importing {} took {:.1f}ms, budget is {}ms'.format(
+                module, cumulative, budget)
@@ -0,0 +1,81 @@
+import inspect
+import json
+import subprocess
+import sys
+
+import pytest
+
+from datalad_helloworld import _manifest
+from datalad_helloworld.hello_cmd import HelloWorld
+
+# build the parser for the command and render its help, like
+# 'datalad hello-cmd --help' does, and report the modules imported in the
+# process
+BUILD_PARSER = """
+import json
+import sys
+from datalad_helloworld import _manifest
+_manifest.MANIFEST_PATH = sys.argv[1]
+from datalad.cli.parser import setup_parser
+parsers = setup_parser(['datalad', 'hello-cmd'], return_subparsers=True)
+assert '--language' in parsers['hello-cmd'].format_help()
+print(json.dumps(sorted(sys.modules)))
+"""
+
+
+@pytest.fixture
+def manifest(tmp_path, monkeypatch):
+    path = _manifest.write_manifest(str(tmp_path / 'command_manifest.json'))
+    monkeypatch.setattr(_manifest, 'MANIFEST_PATH', path)
+    monkeypatch.setattr(_manifest, '_manifest', None)
+    return path
+
+
+def test_write_manifest(manifest):
+    with open(manifest, encoding='utf-8') as f:
+        assert json.load(f) == json.loads(
+            json.dumps(_manifest.generate_manifest()))
+    spec = _manifest._load_manifest()['HelloWorld']
+    assert spec['source_modules'] == \
+        _manifest.get_source_modules(HelloWorld)
+    # the manifest matches the sources
+    assert _manifest.get_interface('HelloWorld') is not HelloWorld
+
+
+def test_interface_from_manifest(manifest):
+    spec = _manifest._load_manifest()['HelloWorld']
+    intf = _manifest._make_interface('HelloWorld', spec)
+    assert intf is not HelloWorld
+    assert intf.__module__ == HelloWorld.__module__
+    assert intf.__doc__ == HelloWorld.__doc__
+    assert intf.__call__.__doc__ == HelloWorld.__call__.__doc__
+    assert inspect.signature(intf.__call__) == \
+        inspect.signature(HelloWorld.__call__)
+    assert intf.__call__._eval_results
+    for name, param in intf._params_.items():
+        orig = HelloWorld._params_[name]
+        assert param.cmd_args == orig.cmd_args
+        assert param.cmd_kwargs == orig.cmd_kwargs
+        assert param._doc == orig._doc
+        assert type(param.constraints) is type(orig.constraints)
+        assert _manifest._dump_constraint(param.constraints) == \
+            _manifest._dump_constraint(orig.constraints)
+    # executing the stand-in runs the implementation
+    res = intf.__call__(language='de', result_renderer='disabled')
+    assert [r['message'] for r in res] == ['Tachchen!']
+
+
+def test_outdated_manifest(manifest, monkeypatch):
+    spec = dict(_manifest._load_manifest()['HelloWorld'], source_hash='0')
+    monkeypatch.setattr(
+        _manifest, '_manifest', dict(HelloWorld=spec))
+    assert _manifest.get_interface('HelloWorld') is HelloWorld
+
+
+def test_parser_without_implementation(manifest):
+    out = subprocess.run(
+        [sys.executable, '-c', BUILD_PARSER, manifest],
+        check=True, stdout=subprocess.PIPE).stdout
+    modules = json.loads(out)
+    assert 'datalad_helloworld._manifest' in modules
+    assert 'datalad_helloworld.hello_cmd' not in modules
@@ -0,0 +1,59 @@
+import json
+import pickle
+import sys
+
+import pytest
+from datalad.api import hello_cmd
+from datalad.utils import swallow_outputs
+
+from datalad_helloworld.messages import LazyMessage
+from datalad_helloworld.renderers import encode_result
+
+
+def test_lazy_message():
+    msg = LazyMessage("unknown language: '%s'", 'fr')
+    assert str(msg) == "unknown language: 'fr'"
+    assert LazyMessage('Hello!', language='de').template == 'Hello!'
+    assert str(LazyMessage('Hello!', language='de')) == 'Tachchen!'
+    assert str(LazyMessage('100%%')) == '100%'
+    assert pickle.loads(pickle.dumps(msg)) == msg
+    assert msg != LazyMessage("unknown language: '%s'", 'fr', language='de')
+    assert json.loads(encode_result(dict(message=msg)))['message'] \
+        == str(msg)
+
+
+@pytest.fixture
+def expansions(monkeypatch):
+    """Messages converted to strings so far"""
+    expanded = []
+    expand = LazyMessage.__str__
+
+    def counting(self):
+        expanded.append(self)
+        return expand(self)
+
+    monkeypatch.setattr(LazyMessage, '__str__', counting)
+    return expanded
+
+
+def test_expanded_when_rendered(tmp_path, expansions, monkeypatch):
+    input_file = tmp_path / 'input'
+    input_file.write_text('fr\n' * 100)
+    # filtered or not rendered
+    res = hello_cmd(input_file=str(input_file), on_failure='ignore',
+                    result_renderer='disabled',
+                    result_filter=lambda r: r['status'] == 'ok')
+    assert res == []
+    assert expansions == []
+    # only counted, the samples are rendered
+    with swallow_outputs():
+        hello_cmd(input_file=str(input_file), count_only=True,
+                  on_failure='ignore', result_renderer='tailored')
+    assert len(expansions) == 10
+    # similar results are suppressed by the generic renderer, on a terminal
+    del expansions[:]
+    with swallow_outputs():
+        monkeypatch.setattr(sys.stdout, 'isatty', lambda: True)
+        hello_cmd(input_file=str(input_file), on_failure='ignore',
+                  result_renderer='generic')
+    assert 0 < len(expansions) < 100
@@ -0,0 +1,125 @@
+import io
+import json
+
+import pytest
+
+from datalad.api import hello_cmd
+from datalad.support.exceptions import IncompleteResultsError
+from datalad.utils import swallow_outputs
+
+from datalad_helloworld import renderers
+from datalad_helloworld.renderers import (
+    JSONLinesWriter,
+    ResultSummary,
+    encode_result,
+)
+from datalad_helloworld.results import ResultRecord
+
+
+def test_encode_result(monkeypatch):
+    res = dict(action='demo', status='error', path='/ü',
+               message=('unknown language: %s', 'fr'), obj=object())
+    for encoder in (renderers.orjson, None):
+        monkeypatch.setattr(renderers, 'orjson', encoder)
+        line = encode_result(res)
+        assert line.endswith(b'\n')
+        decoded = json.loads(line)
+        assert list(decoded) == sorted(res)
+        assert decoded['message'] == list(res['message'])
+        assert decoded['obj'] == str(res['obj'])
+        assert json.loads(encode_result(
+            ResultRecord(action='demo', status='ok'))) \
+            == dict(action='demo', status='ok')
+
+
+def test_jsonl_writer(monkeypatch):
+    stream = io.BytesIO()
+    res = dict(action='demo', status='ok')
+    line = encode_result(res)
+    writer = JSONLinesWriter(stream, buffer_size=3 * len(line),
+                             flush_interval=3600)
+    writer.write(res)
+    writer.write(res)
+    assert stream.getvalue() == b''
+    # written when the buffer is full
+    writer.write(res)
+    assert stream.getvalue() == 3 * line
+    writer.write(res)
+    writer.flush()
+    assert stream.getvalue() == 4 * line
+    # written after the flush interval
+    writer = JSONLinesWriter(stream, flush_interval=0)
+    writer.write(res)
+    assert stream.getvalue() == 5 * line
+
+
+def test_hello_cmd_jsonl(monkeypatch):
+    monkeypatch.setattr(renderers, '_writer', None)
+    with swallow_outputs() as cmo:
+        hello_cmd(language='de', jsonl=True, result_renderer='tailored')
+        assert json.loads(cmo.out)['message'] == 'Tachchen!'
+    # otherwise, results are rendered like by the generic renderer
+    with swallow_outputs() as cmo:
+        hello_cmd(language='de', result_renderer='tailored')
+        assert cmo.out.startswith('demo(ok):')
+
+
+def test_result_summary():
+    summary = ResultSummary(max_samples=2)
+    summary.add(dict(action='demo', status='ok'))
+    summary.count('demo', 'ok', 1000)
+    summary.count('demo', 'error', 10,
+                  sample=lambda: dict(action='demo', status='error'))
+    summary.add(dict(action='demo', status='error', message='second'))
+    summary.add(dict(action='demo', status='error', message='third'))
+    assert summary.counts == {('demo', 'ok'): 1001, ('demo', 'error'): 12}
+    assert summary.nfailures == 12
+    # samples are bounded
+    assert [r.get('message') for r in summary.samples] == [None, 'second']
+    with swallow_outputs() as cmo:
+        summary.render()
+        assert 'demo (error: 12, ok: 1001)' in cmo.out
+        assert 'failed results (2 of 12)' in cmo.out
+        assert '1013 results in' in cmo.out
+    # a single result needs no summary
+    summary = ResultSummary()
+    summary.add(dict(action='demo', status='ok'))
+    with swallow_outputs() as cmo:
+        summary.render()
+        assert cmo.out == ''
+
+
+def test_hello_cmd_count_only(tmp_path):
+    input_file = tmp_path / 'input'
+    input_file.write_text('en\nde\nfr\n')
+    with swallow_outputs() as cmo:
+        res = hello_cmd(input_file=str(input_file), count_only=True,
+                        on_failure='ignore', result_renderer='tailored')
+        assert 'demo (error: 1, ok: 2)' in cmo.out
+        assert "[unknown language: 'fr']" in cmo.out
+    # the counts are a result
+    assert len(res) == 1
+    assert res[0]['status'] == 'error'
+    assert res[0]['type'] == 'summary'
+    assert res[0]['counts'] == dict(demo=dict(error=1, ok=2))
+    assert res[0]['failures'] == 1
+    assert res[0]['samples'][0]['status'] == 'error'
+    # failures fail the command, like without --count-only
+    with swallow_outputs(), pytest.raises(IncompleteResultsError):
+        hello_cmd(input_file=str(input_file), count_only=True,
+                  result_renderer='disabled')
+    # rendered like any other result
+    with swallow_outputs() as cmo:
+        hello_cmd(input_file=str(input_file), count_only=True,
+                  on_failure='ignore', result_renderer='disabled')
+        assert cmo.out == ''
+    with swallow_outputs() as cmo:
+        hello_cmd(input_file=str(input_file), count_only=True,
+                  on_failure='ignore', result_renderer='json')
+        assert json.loads(cmo.out)['counts'] == dict(
+            demo=dict(error=1, ok=2))
+    with swallow_outputs() as cmo:
+        hello_cmd(input_file=str(input_file), on_failure='ignore',
+                  result_renderer='tailored')
+        assert cmo.out.count('demo(') == 4
+        assert 'demo (error: 1, ok: 2)' in cmo.out
@@ -0,0 +1,122 @@
+import json
+
+import pytest
+
+from datalad.api import (
+    Dataset,
+    hello_cmd,
+)
+
+from datalad_helloworld import resultcache
+from datalad_helloworld.cache import (
+    NAMESPACES,
+    CacheManager,
+)
+from datalad_helloworld.hello_cmd import hello_cmd_raw
+from datalad_helloworld.messages import LazyMessage
+from datalad_helloworld.resultcache import (
+    ResultCache,
+    _dumps,
+    _loads,
+)
+from datalad_helloworld.results import ResultRecord
+
+
+@pytest.fixture
+def result_cache(tmp_path, monkeypatch):
+    cache = ResultCache(CacheManager(str(tmp_path / 'cache')))
+    monkeypatch.setattr(resultcache, '_cache', cache)
+    return cache
+
+
+def test_hello_cmd_cache(tmp_path, result_cache):
+    ds = Dataset(tmp_path / 'ds').create(annex=False)
+    ds.create('sub', annex=False)
+    uncached = hello_cmd(dataset=ds, recursive=True, language='de',
+                         result_renderer='disabled')
+    assert len(uncached) == 2
+
+    res = hello_cmd(dataset=ds, recursive=True, language='de', cache=True,
+                    result_renderer='disabled')
+    assert res == uncached
+    assert result_cache.stats()['misses'] == 1
+    assert result_cache.stats()['hits'] == 0
+    res = hello_cmd(dataset=ds, recursive=True, language='de', cache=True,
+                    result_renderer='disabled')
+    assert res == uncached
+    assert result_cache.stats()['memory_hits'] == 1
+    # other parameters, other results
+    list(hello_cmd_raw(dataset=ds, cache=True, language='en'))
+    assert result_cache.stats()['misses'] == 2
+
+    # a new commit changes the key
+    ds.create('sub2', annex=False)
+    res = list(hello_cmd_raw(dataset=ds, recursive=True, language='de',
+                             cache=True))
+    assert len(res) == 3
+    assert result_cache.stats()['misses'] == 3
+
+
+def test_tiers_and_invalidation(tmp_path, result_cache):
+    ds = Dataset(tmp_path / 'ds').create(annex=False)
+    key = result_cache.make_key(ds, language='de')
+    assert result_cache.get(key) is None
+    results = list(result_cache.record(key, hello_cmd_raw(dataset=ds)))
+    assert result_cache.get(key) == results
+    # results can be modified by a consumer
+    result_cache.get(key)[0]['status'] = 'impossible'
+    assert result_cache.get(key) == results
+
+    # another process, with a cold memory tier
+    other = ResultCache(CacheManager(str(tmp_path / 'cache')))
+    assert other.get(key) == results
+    assert other.stats()['disk_hits'] == 1
+    assert other.stats()['disk_entries'] == 1
+
+    other.invalidate(ds.path)
+    assert other.get(key) is None
+    assert other.stats()['disk_entries'] == 0
+    # dropped from the disk tier, still in the memory tier of this process
+    assert result_cache.get(key) == results
+    result_cache.invalidate()
+    assert result_cache.get(key) is None
+    assert result_cache.stats()['memory_entries'] == 0
+
+
+def test_eviction(tmp_path):
+    cache = ResultCache(
+        CacheManager(str(tmp_path), namespaces=dict(
+            NAMESPACES, results=NAMESPACES['results']._replace(size=1000))),
+        memory_entries=2)
+    ds = Dataset(tmp_path / 'ds').create(annex=False)
+    keys = [cache.make_key(ds, language=lang) for lang in ('en', 'de', '*')]
+    for key in keys:
+        cache.put(key, [dict(path=ds.path, message='x' * 300)])
+    stats = cache.stats()
+    assert stats['memory_entries'] == 2
+    assert stats['disk_entries'] == 2
+    assert stats['disk_size'] <= 1000
+    # the least recently used one is gone from the disk tier, too
+    cache._memory.clear()
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[2]) is not None
+
+
+def test_serialization():
+    results = (
+        dict(action='demo', status='ok', path='/ds', message='Hallo!'),
+        dict(action='demo', status='error', path='/ds',
+             message=LazyMessage("unknown language: '%s'", 'xx',
+                                 language='de')),
+    )
+    value = _dumps(results)
+    # no pickles, plain JSON
+    assert json.loads(value.decode('utf-8'))['results'][1]['message'] == \
+        ["unknown language: '%s'", ['xx'], 'de']
+    assert _loads(value) == results
+    records = tuple(ResultRecord(**res) for res in results)
+    loaded = _loads(_dumps(records))
+    assert all(isinstance(res, ResultRecord) for res in loaded)
+    assert loaded == records
+    with pytest.raises(TypeError):
+        _dumps([dict(path=object())])
@@ -0,0 +1,94 @@
+import json
+import pickle
+
+import pytest
+from datalad.api import hello_cmd
+from datalad.interface.results import get_status_dict
+from datalad.utils import swallow_outputs
+
+from datalad_helloworld.hello_cmd import (
+    hello_cmd_chunks,
+    hello_cmd_raw,
+)
+from datalad_helloworld.results import (
+    ResultRecord,
+    chunked,
+    filter_chunks,
+    flatten,
+    render_chunks,
+)
+
+
+def test_result_record():
+    kwargs = dict(action='demo', path='/some', status='ok', message='Hello!')
+    rec = ResultRecord(**kwargs)
+    # a mapping like the dict created by get_status_dict()
+    assert rec == get_status_dict(**kwargs)
+    assert dict(rec) == kwargs
+    assert list(rec) == ['action', 'path', 'status', 'message']
+    assert len(rec) == 4
+    assert 'status' in rec and 'refds' not in rec and 'other' not in rec
+    assert rec['status'] == 'ok'
+    assert rec.get('refds') is None
+    assert rec.get('refds', 'default') == 'default'
+    with pytest.raises(KeyError):
+        rec['refds']
+    # labels are interned
+    other = ResultRecord(action=''.join(['de', 'mo']))
+    assert rec['action'] is other['action']
+    # read-only, but absent keys can be popped, like eval_results does
+    assert rec.pop('logger', None) is None
+    with pytest.raises(TypeError):
+        rec.pop('status')
+    with pytest.raises(TypeError):
+        rec.status = 'error'
+    with pytest.raises(TypeError):
+        rec['status'] = 'error'
+    assert rec.copy() == kwargs
+    assert pickle.loads(pickle.dumps(rec)) == rec
+    assert not ResultRecord()
+
+
+def test_hello_cmd_compact(tmp_path):
+    input_file = tmp_path / 'input'
+    input_file.write_text('en\nfr\n')
+    kwargs = dict(input_file=str(input_file), on_failure='ignore',
+                  result_renderer='disabled')
+    res = hello_cmd(compact=True, **kwargs)
+    assert all(isinstance(r, ResultRecord) for r in res)
+    assert res == hello_cmd(**kwargs)
+    # works with result filters and renderers
+    kwargs['result_renderer'] = 'json'
+    with swallow_outputs() as cmo:
+        res = hello_cmd(
+            compact=True, result_filter=lambda r: r['status'] == 'ok',
+            **kwargs)
+        assert len(res) == 1
+        assert [json.loads(line)['status']
+                for line in cmo.out.splitlines()] == ['ok', 'error']
+
+
+def test_chunks(tmp_path):
+    assert list(chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(chunked([], 2)) == []
+    # all results would be dropped
+    with pytest.raises(ValueError):
+        chunked(range(5), 0)
+    assert list(flatten([[0, 1], [], [2]])) == [0, 1, 2]
+
+    input_file = tmp_path / 'input'
+    input_file.write_text('en\nfr\nde\n' * 3)
+    chunks = list(hello_cmd_chunks(input_file=str(input_file), chunk_size=4))
+    assert [len(c) for c in chunks] == [4, 4, 1]
+    assert list(flatten(chunks)) == list(
+        hello_cmd_raw(input_file=str(input_file)))
+
+    chunks = list(filter_chunks(
+        chunks, lambda r: r['message'] == 'Tachchen!'))
+    assert [len(c) for c in chunks] == [1, 1, 1]
+    with swallow_outputs() as cmo:
+        assert list(render_chunks(chunks)) == chunks
+        assert [json.loads(line)['message']
+                for line in cmo.out.splitlines()] == ['Tachchen!'] * 3
+    with pytest.raises(ValueError):
+        list(render_chunks(chunks, 'generic'))
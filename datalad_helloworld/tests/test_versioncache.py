@@ -0,0 +1,69 @@
+import subprocess
+
+from datalad_helloworld import _versioncache
+
+
+def _git(repo, *args):
+    subprocess.run(
+        ['git', '-c', 'user.name=Hello', '-c', 'user.email=hello@example.com']
+        + list(args),
+        cwd=str(repo), check=True, stdout=subprocess.DEVNULL)
+
+
+def test_find_gitdirs(tmp_path):
+    assert _versioncache.find_gitdirs(str(tmp_path)) is None
+    _git(tmp_path, 'init', '-q')
+    sub = tmp_path / 'some' / 'sub'
+    sub.mkdir(parents=True)
+    gitdir = str(tmp_path / '.git')
+    assert _versioncache.find_gitdirs(str(sub)) == (gitdir, gitdir)
+
+
+def test_state_key(tmp_path):
+    _git(tmp_path, 'init', '-q')
+    gitdirs = _versioncache.find_gitdirs(str(tmp_path))
+    unborn = _versioncache.get_state_key(*gitdirs)
+    (tmp_path / 'file').write_text('content')
+    _git(tmp_path, 'add', 'file')
+    _git(tmp_path, 'commit', '-q', '-m', 'first')
+    committed = _versioncache.get_state_key(*gitdirs)
+    assert committed != unborn
+    # stable without changes
+    assert _versioncache.get_state_key(*gitdirs) == committed
+    _git(tmp_path, 'tag', '1.0')
+    tagged = _versioncache.get_state_key(*gitdirs)
+    assert tagged != committed
+    _git(tmp_path, 'pack-refs', '--all')
+    packed = _versioncache.get_state_key(*gitdirs)
+    assert packed != tagged
+    _git(tmp_path, 'checkout', '-q', '--detach')
+    assert _versioncache.get_state_key(*gitdirs) != packed
+
+
+def test_get_versions(tmp_path, monkeypatch):
+    repo = tmp_path / 'repo'
+    repo.mkdir()
+    _git(repo, 'init', '-q')
+    _git(repo, 'commit', '-q', '--allow-empty', '-m', 'first')
+    _git(repo, 'tag', '1.0')
+    monkeypatch.setenv('DATALAD_HELLOWORLD_CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setattr(
+        _versioncache, 'get_source_root', lambda: str(repo))
+
+    calls = []
+
+    def compute_versions(root):
+        assert root == str(repo)
+        calls.append(1)
+        return dict(version='1.0', error=None)
+
+    monkeypatch.setattr(_versioncache, 'compute_versions', compute_versions)
+    assert _versioncache.get_versions()['version'] == '1.0'
+    assert len(calls) == 1
+    # warm: served from the cache
+    assert _versioncache.get_versions()['version'] == '1.0'
+    assert len(calls) == 1
+    # a new commit invalidates the cache
+    _git(repo, 'commit', '-q', '--allow-empty', '-m', 'second')
+    _versioncache.get_versions()
+    assert len(calls) == 2
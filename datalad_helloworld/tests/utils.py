@@ -0,0 +1,79 @@
+"""Helpers for measuring the startup cost of the extension"""
+
+import os.path as op
+import shutil
+import subprocess
+import sys
+import time
+
+# load the command suite exactly like datalad does it when it discovers
+# extensions
+LOAD_COMMAND_SUITE = """
+try:
+    from importlib.metadata import entry_points
+except ImportError:
+    from importlib_metadata import entry_points
+eps = entry_points()
+eps = eps.select(group='datalad.extensions') \\
+    if hasattr(eps, 'select') else eps.get('datalad.extensions', [])
+suite = [ep for ep in eps if ep.name == 'helloworld'][0].load()
+"""
+
+
+def get_import_times(module):
+    """Import a module in a fresh interpreter and report ``-X importtime``
+
+    Returns
+    -------
+    dict
+      Mapping of the names of all modules imported in the process to a
+      tuple with the self and the cumulative import time in microseconds.
+    """
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import ' + module],
+        check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        universal_newlines=True).stderr
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        selftime, cumulative, name = line[len('import time:'):].split('|')
+        if not selftime.strip().isdigit():
+            # the header line
+            continue
+        times[name.strip()] = (int(selftime), int(cumulative))
+    return times
+
+
+def get_extension_import_time(times):
+    """Return the summed self time of all modules of this extension
+
+    `times` is a mapping as returned by :func:`get_import_times`.
+    """
+    return sum(
+        selftime for name, (selftime, _) in times.items()
+        if name == 'datalad_helloworld'
+        or name.startswith('datalad_helloworld.'))
+
+
+def get_datalad_cmd():
+    """Return the path of the ``datalad`` executable matching this Python"""
+    return get_script('datalad')
+
+
+def get_script(name):
+    """Return the path of an executable matching this Python"""
+    cmd = op.join(op.dirname(sys.executable), name)
+    return cmd if op.exists(cmd) else shutil.which(name)
+
+
+def time_command(cmd, repeat=3, **kwargs):
+    """Return the shortest wall-clock time of running a command, in seconds
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, **kwargs)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
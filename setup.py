@@ -1,15 +1,62 @@
 #!/usr/bin/env python
 
 import sys
+from os.path import join as opj
+from subprocess import CalledProcessError
 from setuptools import setup
 import versioneer
 
 from _datalad_buildsupport.setup import (
+    BuildCatalogs,
+    BuildCommandManifest,
+    BuildDocstrings,
     BuildManPage,
 )
 
 cmdclass = versioneer.get_cmdclass()
-cmdclass.update(build_manpage=BuildManPage)
+
+
+# generated files that are regenerated whenever the package is built, by the
+# command that generates them
+GENERATED = (
+    ('build_docstrings', opj('datalad_helloworld', '_docstrings.py')),
+    ('build_manifest', opj('datalad_helloworld', 'command_manifest.json')),
+)
+
+
+def regenerate(command, base_dir):
+    """Regenerate the generated files of the package in `base_dir`"""
+    for name, path in GENERATED:
+        cmd = command.distribution.get_command_obj(name)
+        cmd.output = opj(base_dir, path)
+        try:
+            command.run_command(name)
+        except CalledProcessError as e:
+            # e.g. datalad is not installed in an isolated build
+            command.warn('cannot run {} ({}), the copy in the source tree is '
+                         'used'.format(name, e))
+
+
+class BuildPy(cmdclass['build_py']):
+    def run(self):
+        super().run()
+        regenerate(self, self.build_lib)
+
+
+class SDist(cmdclass['sdist']):
+    def make_release_tree(self, base_dir, files):
+        super().make_release_tree(base_dir, files)
+        regenerate(self, base_dir)
+
+
+cmdclass.update(
+    build_py=BuildPy,
+    sdist=SDist,
+    build_manpage=BuildManPage,
+    build_manifest=BuildCommandManifest,
+    build_docstrings=BuildDocstrings,
+    build_catalogs=BuildCatalogs,
+)
 
 if __name__ == '__main__':
     setup(name='datalad_helloworld',
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+"""Load test of the HTTP API of hello-cmd
+
+Sends requests from a number of concurrent clients, each with a keep-alive
+connection, and reports the latency percentiles and the throughput. Unless a
+URL is given, a server is started in a separate process for the duration of
+the test.
+
+    python tools/http_loadtest.py --clients 16 --requests 200
+"""
+
+import argparse
+import http.client
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument(
+        '--url', help='URL of a running server, like '
+        'http://127.0.0.1:8080/hello-cmd?language=de')
+    parser.add_argument(
+        '--clients', type=int, default=8,
+        help='number of concurrent clients [Default: %(default)s]')
+    parser.add_argument(
+        '--requests', type=int, default=100,
+        help='number of requests per client [Default: %(default)s]')
+    parser.add_argument(
+        '--workers', type=int, default=8,
+        help='worker threads of a started server [Default: %(default)s]')
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        port = _get_free_port()
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'datalad_helloworld.http_api',
+             '--port', str(port), '--workers', str(args.workers)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        url = 'http://127.0.0.1:{}/hello-cmd?language=de'.format(port)
+        _wait_for(port, server)
+    try:
+        latencies, duration = run(url, args.clients, args.requests)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    latencies.sort()
+    print('{} requests by {} clients in {:.2f} s'.format(
+        len(latencies), args.clients, duration))
+    print('p50: {:.2f} ms'.format(_percentile(latencies, 50) * 1000))
+    print('p99: {:.2f} ms'.format(_percentile(latencies, 99) * 1000))
+    print('{:.0f} requests/s'.format(len(latencies) / duration))
+
+
+def run(url, clients, requests):
+    """Return the latencies of all requests, and the total duration"""
+    url = urlsplit(url)
+    path = url.path + ('?' + url.query if url.query else '')
+    latencies = []
+    errors = []
+    barrier = threading.Barrier(clients + 1)
+
+    def client():
+        conn = http.client.HTTPConnection(url.hostname, url.port)
+        times = []
+        try:
+            barrier.wait()
+            for _ in range(requests):
+                start = time.perf_counter()
+                conn.request('GET', path)
+                response = conn.getresponse()
+                response.read()
+                times.append(time.perf_counter() - start)
+                if response.status != 200:
+                    errors.append(response.status)
+        finally:
+            conn.close()
+            latencies.extend(times)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in threads:
+        t.join()
+    duration = time.perf_counter() - start
+    if errors:
+        print('{} failed requests'.format(len(errors)), file=sys.stderr)
+    return latencies, duration
+
+
+def _percentile(values, p):
+    # nearest rank of sorted values
+    return values[max(0, -(-len(values) * p // 100) - 1)]
+
+
+def _get_free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _wait_for(port, server, timeout=60):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            socket.create_connection(('127.0.0.1', port)).close()
+            return
+        except OSError:
+            if server.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError('server failed to start')
+            time.sleep(0.1)
+
+
+if __name__ == '__main__':
+    main()